@@ -1,5 +1,5 @@
 from django.contrib import admin
-from reviews.models import User
+from reviews.models import OutgoingEmail, User
 
 
 class AdminUser(admin.ModelAdmin):
@@ -26,3 +26,26 @@ class AdminUser(admin.ModelAdmin):
 
 
 admin.site.register(User, AdminUser)
+
+
+class AdminOutgoingEmail(admin.ModelAdmin):
+    """Класс администрирования очереди писем."""
+
+    list_display = (
+        'subject',
+        'recipients',
+        'created',
+        'attempts',
+        'sent_at',
+    )
+
+    list_filter = (
+        'sent_at',
+    )
+
+    search_fields = (
+        'recipients',
+    )
+
+
+admin.site.register(OutgoingEmail, AdminOutgoingEmail)
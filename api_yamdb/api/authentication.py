@@ -0,0 +1,141 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+from . import cache
+
+# Поля пользователя, которые передаются в токене и достаточны
+# для проверки прав в api/permissions.py.
+USER_CLAIMS = ('username', 'role', 'is_superuser')
+VERSION_CLAIM = 'token_version'
+
+# Версии токенов пользователей: user_id -> (истекает, версия).
+# None вместо версии означает, что пользователь удалён или заблокирован.
+_versions = {}
+_versions_lock = threading.Lock()
+_missing = object()
+
+
+def _version_key(user_id):
+    return f'{cache.KEY_PREFIX}:token_version:{user_id}'
+
+
+def access_token_for_user(user):
+    """Access-токен с ролью пользователя и версией токенов в claims."""
+
+    token = AccessToken.for_user(user)
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[VERSION_CLAIM] = user.token_version
+    return token
+
+
+def _query_version(user_id):
+    return (
+        User.objects
+        .filter(pk=user_id, is_active=True)
+        .values_list('token_version', flat=True)
+        .first()
+    )
+
+
+def _load_version(user_id):
+    # Кэш в памяти процесса не сбрасывается из других процессов,
+    # поэтому вторым уровнем служит только общий кэш.
+    if not cache.is_shared():
+        return _query_version(user_id)
+    shared = cache.get_cache()
+    key = _version_key(user_id)
+    version = shared.get(key, _missing)
+    if version is not _missing:
+        return version
+    version = _query_version(user_id)
+    shared.set(key, version, settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя.
+
+    Сначала ищется в памяти процесса, затем в общем кэше, если он
+    настроен, и только потом в таблице пользователей.
+    """
+
+    now = time.monotonic()
+    with _versions_lock:
+        cached = _versions.get(user_id)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    version = _load_version(user_id)
+    with _versions_lock:
+        _versions[user_id] = (
+            now + settings.TOKEN_VERSION_LOCAL_TIMEOUT, version
+        )
+    return version
+
+
+def forget_token_version(user_id):
+    """Сбрасывает закэшированную версию после изменения пользователя."""
+
+    def forget():
+        with _versions_lock:
+            _versions.pop(user_id, None)
+        cache.get_cache().delete(_version_key(user_id))
+
+    forget()
+    transaction.on_commit(forget)
+
+
+def user_from_token(validated_token):
+    """Пользователь из claims токена без обращения к базе.
+
+    Экземпляр модели нужен, чтобы работали свойства ролей,
+    сравнение с автором объекта и присваивание внешних ключей.
+    """
+
+    user = User(
+        pk=validated_token[api_settings.USER_ID_CLAIM],
+        is_active=True,
+        **{claim: validated_token[claim] for claim in USER_CLAIMS},
+    )
+    user._state.adding = False
+    user._state.db = User.objects.db
+    return user
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация по claims токена без загрузки пользователя.
+
+    Вместо строки пользователя проверяется версия его токенов,
+    которая кэшируется в процессе на TOKEN_VERSION_LOCAL_TIMEOUT
+    секунд. Смена роли или блокировка увеличивает версию, и старые
+    токены перестают приниматься не позже, чем истечёт этот срок.
+    Токены без claims роли проверяются по базе, как раньше.
+    """
+
+    def get_user(self, validated_token):
+        claims = (api_settings.USER_ID_CLAIM, VERSION_CLAIM) + USER_CLAIMS
+        if any(claim not in validated_token for claim in claims):
+            return super().get_user(validated_token)
+
+        version = get_token_version(
+            validated_token[api_settings.USER_ID_CLAIM]
+        )
+        if version is None:
+            raise AuthenticationFailed(
+                _('User not found'), code='user_not_found'
+            )
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                'Токен отозван, получите новый', code='token_revoked'
+            )
+        return user_from_token(validated_token)
@@ -0,0 +1,251 @@
+"""Пакетная запись каталога: произведения, жанры и категории.
+
+Элементы пакета проверяются по отдельности, а к базе запросы идут
+для всего пакета сразу: slug жанров и категорий находятся одним
+запросом, объекты пишутся bulk_create/bulk_update, связи с жанрами -
+одной вставкой в промежуточную таблицу. Все изменения пакета
+выполняются в одной транзакции; элементы с ошибками пропускаются,
+а результат возвращается для каждого элемента.
+"""
+
+from collections import Counter, namedtuple
+from functools import partial
+
+from django.db import connection, transaction
+from django.db.models import CharField, Value
+from django.utils import timezone
+from reviews import search
+from reviews.models import Category, Genre, Title
+
+from . import cache
+from .serializers import (CategoryBulkSerializer, GenreBulkSerializer,
+                          TitleBulkSerializer)
+
+CREATE = 'create'
+UPDATE = 'update'
+UPSERT = 'upsert'
+# Режим записи по методу запроса.
+METHOD_MODES = {'POST': CREATE, 'PATCH': UPDATE, 'PUT': UPSERT}
+
+# Элемент пакета, готовый к записи: номер в запросе, объект
+# и id жанров произведения (None, если жанры не передавались).
+Item = namedtuple('Item', 'index obj genre_ids', defaults=(None,))
+
+
+def result(index, status, errors=None, **fields):
+    item = {'index': index, 'status': status, **fields}
+    if errors:
+        item['errors'] = errors
+    return item
+
+
+def validate(serializer_class, items, partial):
+    """Проверяет элементы без обращений к базе.
+
+    Возвращает список пар (номер, данные) и ошибки по номерам.
+    """
+
+    valid, results = [], {}
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item, partial=partial)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = result(index, 'error', serializer.errors)
+    return valid, results
+
+
+def repeated(keys):
+    counts = Counter(key for key in keys if key is not None)
+    return {key for key, count in counts.items() if count > 1}
+
+
+def resolve_slugs(genre_slugs, category_slugs):
+    """Находит id жанров и категорий по slug одним запросом."""
+
+    found = {'genre': {}, 'category': {}}
+    parts = [
+        model.objects
+        .filter(slug__in=slugs)
+        .annotate(kind=Value(kind, CharField()))
+        .values_list('kind', 'slug', 'pk')
+        for model, kind, slugs in (
+            (Genre, 'genre', genre_slugs),
+            (Category, 'category', category_slugs),
+        )
+        if slugs
+    ]
+    if parts:
+        for kind, slug, pk in parts[0].union(*parts[1:], all=True):
+            found[kind][slug] = pk
+    return found['genre'], found['category']
+
+
+def finish(results, created, updated, key):
+    for status, items in (('created', created), ('updated', updated)):
+        for item in items:
+            results[item.index] = result(
+                item.index, status, **{key: getattr(item.obj, key)}
+            )
+    return [results[index] for index in sorted(results)]
+
+
+def title_errors(data, mode, existing, duplicates, genres, categories):
+    errors = {}
+    title_id = data.get('id')
+    if mode == CREATE and title_id is not None:
+        errors['id'] = ['Не передаётся при создании.']
+    elif mode == UPDATE and title_id is None:
+        errors['id'] = ['Обязательное поле.']
+    elif title_id is not None and title_id not in existing:
+        errors['id'] = [f'Произведение {title_id} не найдено.']
+    elif title_id in duplicates:
+        errors['id'] = ['Повторяется в пакете.']
+
+    missing = [slug for slug in data.get('genre', ()) if slug not in genres]
+    if missing:
+        errors['genre'] = [f'Жанры не найдены: {", ".join(missing)}.']
+    if 'category' in data and data['category'] not in categories:
+        errors['category'] = [f'Категория {data["category"]} не найдена.']
+    return errors
+
+
+def create_titles(titles):
+    if connection.features.can_return_ids_from_bulk_insert:
+        Title.objects.bulk_create(titles)
+        return
+    # Без RETURNING массовая вставка не заполняет id, а они нужны
+    # для связей с жанрами.
+    for title in titles:
+        title.save()
+
+
+def set_genres(items):
+    """Заменяет жанры произведений одной вставкой связей.
+
+    m2m_changed здесь не отправляется; updated_at, по которому рейтинги
+    находят изменённые произведения, выставляется при их создании
+    и в prepare_title.
+    """
+
+    through = Title.genre.through
+    through.objects.filter(
+        title_id__in=[item.obj.pk for item in items]
+    ).delete()
+    through.objects.bulk_create(
+        through(title_id=item.obj.pk, genre_id=genre_id)
+        for item in items
+        for genre_id in dict.fromkeys(item.genre_ids)
+    )
+
+
+def prepare_title(index, data, existing, genres, categories, now):
+    data = dict(data)
+    genre_ids = None
+    if 'genre' in data:
+        genre_ids = [genres[slug] for slug in data.pop('genre')]
+    if 'category' in data:
+        data['category_id'] = categories[data.pop('category')]
+    title_id = data.pop('id', None)
+    if title_id is None:
+        return Item(index, Title(**data), genre_ids)
+    title = existing[title_id]
+    for name, value in data.items():
+        setattr(title, name, value)
+    title.updated_at = now
+    return Item(index, title, genre_ids)
+
+
+def write_titles(items, mode):
+    valid, results = validate(TitleBulkSerializer, items, mode == UPDATE)
+    genres, categories = resolve_slugs(
+        {slug for _, data in valid for slug in data.get('genre', ())},
+        {data['category'] for _, data in valid if 'category' in data},
+    )
+    existing = Title.objects.in_bulk(
+        {data['id'] for _, data in valid if 'id' in data}
+    )
+    duplicates = repeated(data.get('id') for _, data in valid)
+
+    now = timezone.now()
+    created, updated, fields = [], [], {'updated_at'}
+    for index, data in valid:
+        errors = title_errors(
+            data, mode, existing, duplicates, genres, categories
+        )
+        if errors:
+            results[index] = result(index, 'error', errors)
+            continue
+        item = prepare_title(index, data, existing, genres, categories, now)
+        if item.obj.pk is None:
+            created.append(item)
+        else:
+            updated.append(item)
+            fields.update(
+                name for name in data if name not in ('id', 'genre')
+            )
+
+    with transaction.atomic():
+        create_titles([item.obj for item in created])
+        if updated:
+            Title.objects.bulk_update(
+                [item.obj for item in updated], sorted(fields)
+            )
+        set_genres([
+            item for item in created + updated if item.genre_ids is not None
+        ])
+        title_ids = [item.obj.pk for item in created + updated]
+        search.update_titles(title_ids)
+        cache.invalidate('titles', *map(cache.title_namespace, title_ids))
+    return finish(results, created, updated, 'id')
+
+
+def slug_errors(data, mode, existing, duplicates):
+    slug = data.get('slug')
+    if slug is None:
+        return {'slug': ['Обязательное поле.']}
+    if slug in duplicates:
+        return {'slug': ['Повторяется в пакете.']}
+    if mode == CREATE and slug in existing:
+        return {'slug': [f'{slug} уже существует.']}
+    if mode == UPDATE and slug not in existing:
+        return {'slug': [f'{slug} не найден.']}
+    return {}
+
+
+def write_slugged(model, serializer_class, namespace, items, mode):
+    """Пакетная запись категорий или жанров, ключ элемента - slug."""
+
+    valid, results = validate(serializer_class, items, mode == UPDATE)
+    existing = model.objects.in_bulk(
+        {data['slug'] for _, data in valid if 'slug' in data},
+        field_name='slug',
+    )
+    duplicates = repeated(data.get('slug') for _, data in valid)
+
+    created, updated = [], []
+    for index, data in valid:
+        errors = slug_errors(data, mode, existing, duplicates)
+        if errors:
+            results[index] = result(index, 'error', errors)
+            continue
+        obj = existing.get(data['slug'])
+        if obj is None:
+            created.append(Item(index, model(**data)))
+            continue
+        for name, value in data.items():
+            setattr(obj, name, value)
+        updated.append(Item(index, obj))
+
+    with transaction.atomic():
+        model.objects.bulk_create([item.obj for item in created])
+        if updated:
+            model.objects.bulk_update([item.obj for item in updated], ['name'])
+        cache.invalidate(namespace)
+    return finish(results, created, updated, 'slug')
+
+
+write_categories = partial(
+    write_slugged, Category, CategoryBulkSerializer, 'categories'
+)
+write_genres = partial(write_slugged, Genre, GenreBulkSerializer, 'genres')
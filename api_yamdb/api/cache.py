@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+KEY_PREFIX = 'api'
+
+# Пространство имён, общее для всех кэшированных ответов.
+# Сбрасывается массовыми операциями, после которых неизвестно,
+# какие именно записи изменились.
+CATALOG = 'catalog'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+# Бэкенды, которые хранят данные в памяти одного процесса.
+LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def is_shared():
+    """Видят ли кэш все процессы приложения, а не только текущий."""
+
+    backend = settings.CACHES[settings.API_CACHE_ALIAS]['BACKEND']
+    return backend not in LOCAL_BACKENDS
+
+
+def local_timeout(timeout):
+    """Срок хранения с учётом кэша в памяти процесса.
+
+    Сдвиг версии виден только процессу, который изменил данные,
+    поэтому в памяти процесса ответы и версии хранятся не дольше
+    API_LOCAL_CACHE_TIMEOUT секунд.
+    """
+
+    if is_shared():
+        return timeout
+    if timeout is None:
+        return settings.API_LOCAL_CACHE_TIMEOUT
+    return min(timeout, settings.API_LOCAL_CACHE_TIMEOUT)
+
+
+def title_namespace(title_id):
+    return f'titles:{title_id}'
+
+
+def _version_key(namespace):
+    return f'{KEY_PREFIX}:version:{namespace}'
+
+
+def _new_version():
+    # Версия по времени не повторяет старую после вытеснения ключа.
+    return time.time_ns()
+
+
+def get_versions(namespaces):
+    """Возвращает текущие версии пространств имён одним запросом."""
+
+    cache = get_cache()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), local_timeout(None))
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*namespaces):
+    cache = get_cache()
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), local_timeout(None))
+
+
+def invalidate(*namespaces):
+    """Делает устаревшими ответы, зависящие от пространств имён.
+
+    Версии сдвигаются сразу и ещё раз после фиксации транзакции,
+    чтобы ответ, закэшированный до коммита, не пережил изменение.
+    """
+
+    bump(*namespaces)
+    transaction.on_commit(lambda: bump(*namespaces))
+
+
+def response_key(request, namespaces):
+    """Ключ ответа по адресу, параметрам запроса и версиям данных."""
+
+    namespaces = (CATALOG, *namespaces)
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    raw = '|'.join((
+        request.get_host(),
+        request.path,
+        query,
+        *map(str, get_versions(namespaces)),
+    ))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'{KEY_PREFIX}:response:{digest}'
+
+
+def record(hit):
+    with _stats_lock:
+        _stats['hits' if hit else 'misses'] += 1
+
+
+def stats():
+    """Счётчики попаданий и промахов кэша в текущем процессе."""
+
+    with _stats_lock:
+        return {'hits': _stats['hits'], 'misses': _stats['misses']}
@@ -0,0 +1,190 @@
+"""Потоковая выгрузка каталога, отзывов и комментариев в NDJSON и CSV.
+
+Строки читаются через queryset.iterator(chunk_size), на PostgreSQL -
+серверным курсором, и сразу кодируются, поэтому расход памяти
+не зависит от размера таблиц. CSV-файлы совпадают по именам,
+колонкам, кодировке и разделителю с файлами, которые загружает
+команда csv_to_db; дополнительные колонки она пропускает. Рейтинг
+произведений выгружается для справки: при загрузке он пересчитывается
+по отзывам.
+"""
+
+import csv
+import datetime as dt
+import json
+from collections import defaultdict, namedtuple
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from .management.commands._common import CSV_FILES
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+}
+BUFFER_SIZE = 65536
+
+# Выгрузка: колонки и функция, которая отдаёт строки словарями.
+Export = namedtuple('Export', 'fields rows')
+
+
+def chunks(queryset, chunk_size):
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def values(model, fields, **expressions):
+    """Выгрузка полей модели и выражений в порядке первичного ключа."""
+
+    def rows(chunk_size):
+        return (
+            model.objects
+            .order_by('pk')
+            .values(*fields, **expressions)
+            .iterator(chunk_size=chunk_size)
+        )
+    return Export(fields + tuple(expressions), rows)
+
+
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'category', 'description', 'rating',
+    'review_count',
+)
+
+
+def title_rows(chunk_size):
+    """Произведения с категорией, slug жанров и рейтингом.
+
+    Жанры выбираются одним запросом на каждую пачку произведений.
+    """
+
+    titles = Title.objects.order_by('pk').values(
+        *TITLE_FIELDS, category_slug=F('category__slug')
+    )
+    through = Title.genre.through
+    for chunk in chunks(titles, chunk_size):
+        genres = defaultdict(list)
+        for title_id, slug in (
+            through.objects
+            .filter(title_id__in=[row['id'] for row in chunk])
+            .order_by('title_id', 'genre__slug')
+            .values_list('title_id', 'genre__slug')
+        ):
+            genres[title_id].append(slug)
+        for row in chunk:
+            row['genre'] = genres[row['id']]
+            yield row
+
+
+# Выгрузки по именам CSV-файлов csv_to_db.
+EXPORTS = {
+    'category': values(Category, ('id', 'name', 'slug')),
+    'genre': values(Genre, ('id', 'name', 'slug')),
+    'users': values(
+        User,
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+    ),
+    'titles': Export(
+        TITLE_FIELDS + ('category_slug', 'genre'), title_rows
+    ),
+    'genre_title': values(
+        Title.genre.through, ('id', 'title_id', 'genre_id')
+    ),
+    'review': values(
+        Review,
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        author_username=F('author__username'),
+    ),
+    'comments': values(
+        Comment,
+        ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+        author_username=F('author__username'),
+    ),
+}
+# Выгрузки, доступные через API, и соответствующие им файлы.
+DATASETS = {
+    'titles': 'titles',
+    'reviews': 'review',
+    'comments': 'comments',
+}
+CSV_DIALECTS = {
+    csv_file.name: (csv_file.encoding, csv_file.separator)
+    for csv_file in CSV_FILES
+}
+
+
+class Echo:
+    """Буфер для csv.writer, который сразу возвращает строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ' '.join(value)
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows, fields, separator):
+    writer = csv.writer(Echo(), delimiter=separator)
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([csv_value(row[field]) for field in fields])
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, cls=DjangoJSONEncoder)
+        yield '\n'
+
+
+def buffered(lines, encoding, size=BUFFER_SIZE):
+    """Собирает строки в блоки байтов, чтобы не писать их по одной."""
+
+    buffer, length = [], 0
+    for line in lines:
+        data = line.encode(encoding, errors='replace')
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def content_type(name, file_format):
+    if file_format == NDJSON:
+        return f'{CONTENT_TYPES[NDJSON]}; charset=utf-8'
+    encoding, _ = CSV_DIALECTS[name]
+    return f'{CONTENT_TYPES[CSV]}; charset={encoding}'
+
+
+def stream(name, file_format, chunk_size=None):
+    """Выгрузка name в формате file_format блоками байтов.
+
+    CSV кодируется так же, как файл csv_to_db; символы, которых
+    нет в его кодировке, заменяются на «?».
+    """
+
+    export = EXPORTS[name]
+    rows = export.rows(chunk_size or settings.EXPORT_CHUNK_SIZE)
+    if file_format == NDJSON:
+        return buffered(ndjson_lines(rows), 'UTF-8')
+    encoding, separator = CSV_DIALECTS[name]
+    return buffered(csv_lines(rows, export.fields, separator), encoding)
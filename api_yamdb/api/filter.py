@@ -1,4 +1,6 @@
 import django_filters
+from rest_framework import filters
+from reviews import search
 from reviews.models import Title
 
 
@@ -14,3 +16,19 @@ class TitleFilter(django_filters.FilterSet):
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+
+class TitleSearchFilter(filters.BaseFilterBackend):
+    """Полнотекстовый поиск ?search= с сортировкой по релевантности.
+
+    Курсорная пагинация задаёт собственный порядок, поэтому
+    ранжирование действует в режиме limit/offset.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search.search_titles(queryset, query)
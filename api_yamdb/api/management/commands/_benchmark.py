@@ -0,0 +1,141 @@
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+import requests
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+STARTUP_TIMEOUT = 30
+# gunicorn 20.0 не запускается через python -m.
+GUNICORN = os.path.join(os.path.dirname(sys.executable), 'gunicorn')
+
+# Результат одного запроса: время в секундах, число SQL-запросов
+# (None, если не измерялось) и размер ответа в байтах.
+Sample = namedtuple('Sample', 'seconds queries size status')
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга, values отсортированы."""
+
+    if not values:
+        return None
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank, 1) - 1]
+
+
+def summarize(samples, elapsed=None):
+    """Сводка по запросам: задержки в миллисекундах и пропускная способность.
+
+    elapsed - общее время прогона; без него пропускная способность
+    считается по сумме задержек, то есть для одного клиента.
+    """
+
+    times = sorted(sample.seconds for sample in samples)
+    queries = [
+        sample.queries for sample in samples if sample.queries is not None
+    ]
+    if elapsed is None:
+        elapsed = sum(times)
+    count = len(times)
+    return {
+        'requests': count,
+        'errors': sum(sample.status >= 400 for sample in samples),
+        'p50_ms': round(percentile(times, 50) * 1000, 3),
+        'p95_ms': round(percentile(times, 95) * 1000, 3),
+        'p99_ms': round(percentile(times, 99) * 1000, 3),
+        'mean_ms': round(sum(times) / count * 1000, 3),
+        'queries_per_request': (
+            round(sum(queries) / len(queries), 2) if queries else None
+        ),
+        'bytes_per_request': round(
+            sum(sample.size for sample in samples) / count
+        ),
+        'requests_per_second': round(count / elapsed, 1) if elapsed else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_result(path, result):
+    """Сохраняет результат замера с коммитом и временем запуска."""
+
+    result = {
+        'commit': git_commit(),
+        'created': timezone.now().isoformat(),
+        **result,
+    }
+    with open(path, 'w', encoding='UTF-8') as file:
+        json.dump(result, file, ensure_ascii=False, indent=2)
+    return result
+
+
+def load_result(path):
+    with open(path, encoding='UTF-8') as file:
+        return json.load(file)
+
+
+COMPARED = ('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')
+
+
+def compare(baseline, current):
+    """Строки с изменением метрик относительно прошлого замера."""
+
+    lines = []
+    for name, summary in current['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if previous is None:
+            continue
+        changes = []
+        for metric in COMPARED:
+            old, new = previous.get(metric), summary.get(metric)
+            if old is None or new is None:
+                continue
+            change = f'{(new - old) / old * 100:+.0f}%' if old else 'n/a'
+            changes.append(f'{metric} {old} -> {new} ({change})')
+        lines.append(f'{name}: ' + ', '.join(changes))
+    return lines
+
+
+def start_gunicorn(args, port, env=None, probe='/api/v1/genres/'):
+    """Запускает gunicorn и ждёт первого ответа приложения.
+
+    Возвращает процесс, адрес сервера и время запуска в секундах.
+    """
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [GUNICORN, *args, '--bind', f'127.0.0.1:{port}'],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f'gunicorn {" ".join(args)} не запустился')
+        try:
+            requests.get(url + probe, timeout=1)
+            return process, url, time.perf_counter() - started
+        except requests.RequestException:
+            time.sleep(0.05)
+    process.terminate()
+    raise CommandError(f'gunicorn {" ".join(args)} не ответил вовремя')
@@ -1,72 +1,377 @@
 import csv
+import io
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from reviews import models
+from reviews.ratings import recalculate_ratings
+from reviews.stats import replace_stats
 
 DEFAULT_SEPARATOR = ','
+DEFAULT_ENCODING = 'UTF-8'
+DEFAULT_BATCH_SIZE = 1000
+
+# Описание CSV-файла: модель, переименования колонок в поля модели,
+# кодировка и разделитель.
+CsvFile = namedtuple(
+    'CsvFile',
+    'name model columns encoding separator',
+    defaults=({}, DEFAULT_ENCODING, DEFAULT_SEPARATOR),
+)
+
+CSV_FILES = (
+    CsvFile('category', models.Category),
+    CsvFile('genre', models.Genre),
+    CsvFile('users', models.User),
+    CsvFile('titles', models.Title, {'category': 'category_id'}),
+    CsvFile('genre_title', models.Title.genre.through),
+    CsvFile('review', models.Review, {'author': 'author_id'}),
+    CsvFile('comments', models.Comment, {}, 'cp1251', ';'),
+)
+
+
+def read_rows(file_name, csv_file):
+    """Построчно читает CSV-файл и отдаёт строки словарями."""
+
+    with open(
+            file_name, mode='r', encoding=csv_file.encoding,
+            newline='') as file:
+        yield from csv.DictReader(file, delimiter=csv_file.separator)
+
+
+def write_rows(file_name, csv_file, fieldnames, rows):
+    """Записывает строки в CSV-файл в формате, который читает импорт."""
+
+    with open(
+            file_name, mode='w', encoding=csv_file.encoding,
+            newline='') as file:
+        writer = csv.DictWriter(
+            file, fieldnames, delimiter=csv_file.separator
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def chunked(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_id_map(model):
+    """Загружает соответствие идентификаторов из CSV ключам таблицы."""
+
+    return {
+        str(pk): pk
+        for pk in model.objects.values_list('pk', flat=True).iterator()
+    }
 
 
-def find_relation(err_message):
+class RowConverter:
+    """Преобразует строки CSV в объекты модели.
+
+    Внешние ключи разрешаются по заранее загруженным картам
+    идентификаторов, без запроса к БД на каждую строку.
     """
-    ValueError: Cannot assign "'1'":
-    "Title.category" must be a "Category" instance.
+
+    def __init__(self, csv_file):
+        self.model = csv_file.model
+        self.columns = csv_file.columns
+        self.fields = {
+            field.attname: field
+            for field in self.model._meta.concrete_fields
+        }
+        self.id_maps = {
+            field.attname: load_id_map(field.related_model)
+            for field in self.fields.values()
+            if field.is_relation
+        }
+        # Обязательные даты без значения по умолчанию (pub_date)
+        # заполняются текущим временем, если в файле их нет.
+        self.timestamp_fields = [
+            field.attname
+            for field in self.fields.values()
+            if field.get_internal_type() == 'DateTimeField'
+            and not field.null
+            and not field.has_default()
+        ]
+        self.skipped = 0
+
+    def convert(self, row):
+        values = {}
+        for column, value in row.items():
+            name = self.columns.get(column, column)
+            field = self.fields.get(name)
+            if field is None:
+                continue
+            if value == '' and field.null:
+                value = None
+            elif name in self.id_maps:
+                value = self.id_maps[name].get(value)
+                if value is None:
+                    return None
+            else:
+                value = field.to_python(value)
+                if field.get_internal_type() == 'DateTimeField':
+                    value = self.naive_datetime(value)
+            values[name] = value
+
+        for name in self.timestamp_fields:
+            if values.get(name) is None:
+                values[name] = self.naive_datetime(timezone.now())
+        return self.model(**values)
+
+    def convert_chunk(self, rows):
+        objs = []
+        for row in rows:
+            obj = self.convert(row)
+            if obj is None:
+                self.skipped += 1
+            else:
+                objs.append(obj)
+        return objs
+
+    @staticmethod
+    def naive_datetime(value):
+        if (
+            value is not None
+            and not settings.USE_TZ
+            and timezone.is_aware(value)
+        ):
+            return timezone.make_naive(value, timezone.utc)
+        return value
+
+
+def copy_escape(value):
+    """Экранирует значение для текстового формата COPY."""
+
+    if value is None:
+        return '\\N'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_objects(model, objs):
+    """Записывает объекты в таблицу через COPY PostgreSQL.
+
+    Строки копируются во временную таблицу и переносятся
+    в основную с пропуском уже существующих ключей.
     """
 
-    msg = err_message.split(':')
+    fields = model._meta.concrete_fields
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    temp_table = quote(f'import_{model._meta.db_table}')
+    columns = ', '.join(quote(field.column) for field in fields)
+
+    buffer = io.StringIO()
+    for obj in objs:
+        buffer.write('\t'.join(
+            copy_escape(
+                field.get_db_prep_save(getattr(obj, field.attname), connection)
+            )
+            for field in fields
+        ))
+        buffer.write('\n')
+    buffer.seek(0)
 
-    relation_id = msg[0].replace('Cannot assign ', '')
-    relation_id = relation_id.replace('"', '')
-    relation_id = relation_id.replace("'", '')
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TEMP TABLE {temp_table} (LIKE {table})')
+        cursor.copy_expert(f'COPY {temp_table} ({columns}) FROM STDIN', buffer)
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) '
+            f'SELECT {columns} FROM {temp_table} ON CONFLICT DO NOTHING'
+        )
+        cursor.execute(f'DROP TABLE {temp_table}')
 
-    msg = msg[1].split('"')
 
-    field_name = msg[1].split('.')[1]
+def can_copy():
+    return connection.vendor == 'postgresql'
 
-    model_name = msg[3]
 
-    exec(f'from reviews.models import {model_name}')
-    exec('from django.shortcuts import get_object_or_404')
-    item = eval(f'get_object_or_404({model_name}, id={relation_id})')
+def write_objects(model, objs, use_copy):
+    if use_copy:
+        copy_objects(model, objs)
+    else:
+        model.objects.bulk_create(objs, ignore_conflicts=True)
+    # Рейтинги из файла не используются: они пересчитываются
+    # по отзывам, которые есть в базе.
+    if model is models.Title:
+        title_ids = {obj.pk for obj in objs}
+    elif model is models.Review:
+        title_ids = {obj.title_id for obj in objs}
+    else:
+        return
+    recalculate_ratings(models.Title.objects.filter(pk__in=title_ids))
+    replace_stats(title_ids)
 
-    return item, field_name
 
+def reset_sequences(model_list):
+    """Сдвигает счётчики ключей после вставки явных id."""
 
-def create_item(queryset, item):
-    item, created = queryset.get_or_create(**item)
-    if created:
-        print(f'Создан элемент: {item}')
+    statements = connection.ops.sequence_reset_sql(no_style(), model_list)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
 
 
-def format_list(list_item, separator):
-    list_item = ''.join(list_item)
-    return list_item.split(separator)
+@contextmanager
+def original_pub_dates(model_list):
+    """Сохраняет даты из файла вместо текущего времени.
+
+    Поля с auto_now_add при массовой вставке затирают значение,
+    поэтому на время импорта этот признак отключается.
+    """
+
+    fields = [
+        field
+        for model in model_list
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
 
 
 def create_items(
         file_name,
-        queryset,
-        encoding='UTF-8',
-        separator=DEFAULT_SEPARATOR):
-    """Читает из файла и сохраняет в таблице элементы."""
-
-    with (open(file_name, mode='r', encoding=encoding)) as file_csv:
-
-        print(f'Обработка файла {file_name}')
-
-        reader = csv.reader(file_csv)
-        keys = next(reader)  # Advance past the header
-        if separator != DEFAULT_SEPARATOR:
-            keys = format_list(keys, separator)
-        print(keys)
-
-        for row in reader:
-            if separator != DEFAULT_SEPARATOR:
-                row = format_list(row, separator)
-
-            item = dict(zip(keys, row))
-
-            try:
-                print(row)
-                create_item(queryset, item)
-            except ValueError as err:
-                relation, field_name = find_relation(str(err))
-                if relation:
-                    item[field_name] = relation
-                    create_item(queryset, item)
+        csv_file,
+        report,
+        batch_size=DEFAULT_BATCH_SIZE,
+        use_copy=False):
+    """Читает из файла и сохраняет в таблице элементы.
+
+    О ходе загрузки сообщает report, обычно self.stdout.write команды.
+    Возвращает количество прочитанных и пропущенных строк.
+    """
+
+    return import_rows(
+        read_rows(file_name, csv_file),
+        csv_file,
+        report,
+        batch_size,
+        use_copy,
+    )
+
+
+def import_rows(
+        rows,
+        csv_file,
+        report,
+        batch_size=DEFAULT_BATCH_SIZE,
+        use_copy=False):
+    """Сохраняет строки в формате CSV-файла в таблице.
+
+    Каждая пачка строк записывается одной вставкой в своей транзакции.
+    Возвращает количество полученных и пропущенных строк.
+    """
+
+    converter = RowConverter(csv_file)
+    total = 0
+    started = time.monotonic()
+
+    for rows in chunked(rows, batch_size):
+        objs = converter.convert_chunk(rows)
+        if objs:
+            with transaction.atomic():
+                write_objects(csv_file.model, objs, use_copy)
+        total += len(rows)
+        elapsed = time.monotonic() - started
+        report(
+            f'{csv_file.name}: {total} строк, '
+            f'{total / elapsed if elapsed else 0:.0f} строк/с'
+        )
+
+    reset_sequences([csv_file.model])
+    return total, converter.skipped
+
+
+def dependencies(csv_files):
+    """Строит граф зависимостей файлов по внешним ключам моделей.
+
+    Возвращает словарь: имя файла - множество имён файлов,
+    которые должны быть загружены раньше.
+    """
+
+    names = {csv_file.model: csv_file.name for csv_file in csv_files}
+    return {
+        csv_file.name: {
+            names[field.related_model]
+            for field in csv_file.model._meta.concrete_fields
+            if field.is_relation and field.related_model in names
+        }
+        for csv_file in csv_files
+    }
+
+
+def _load_in_thread(load, csv_file):
+    try:
+        return load(csv_file)
+    finally:
+        # У каждого потока своё соединение с БД, его нужно закрыть.
+        connections.close_all()
+
+
+def run_ordered(csv_files, load, workers):
+    """Загружает файлы параллельно с соблюдением зависимостей.
+
+    Файл передаётся в пул, как только загружены все его родители;
+    независимые файлы загружаются одновременно. При ошибке новые
+    файлы не запускаются, а исключение пробрасывается после
+    завершения уже начатых загрузок.
+    """
+
+    waiting = dependencies(csv_files)
+    by_name = {csv_file.name: csv_file for csv_file in csv_files}
+    done = set()
+    results = {}
+    error = None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        running = {}
+        while True:
+            if error is None:
+                for name in [
+                    name for name, parents in waiting.items()
+                    if parents <= done
+                ]:
+                    del waiting[name]
+                    future = executor.submit(
+                        _load_in_thread, load, by_name[name]
+                    )
+                    running[future] = name
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                results[name] = future.result()
+                done.add(name)
+
+    if error is not None:
+        raise error
+    return results
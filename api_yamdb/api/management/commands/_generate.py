@@ -0,0 +1,209 @@
+import random
+import uuid
+from collections import Counter, namedtuple
+from datetime import timedelta
+from itertools import accumulate
+
+from django.db.models import Max
+from django.utils import timezone
+
+from ._common import CSV_FILES
+
+# Размеры генерируемого набора данных.
+Sizes = namedtuple(
+    'Sizes',
+    'users titles genres categories reviews comments',
+    defaults=(100, 1000, 20, 5, 10000, 10000),
+)
+
+# Колонки генерируемых файлов совпадают с колонками project_static/data.
+FIELDNAMES = {
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'users': (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    ),
+    'titles': ('id', 'name', 'year', 'category', 'description'),
+    'genre_title': ('id', 'title_id', 'genre_id'),
+    'review': ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    'comments': ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+}
+
+WORDS = (
+    'побег', 'отец', 'война', 'мир', 'дорога', 'тайна', 'город', 'море',
+    'звезда', 'история', 'ночь', 'песня', 'мечта', 'остров', 'король',
+    'время', 'зима', 'дом', 'свет', 'тень', 'сердце', 'огонь', 'путь',
+)
+
+PUB_DATE_DAYS = 365
+
+
+def next_pk(model):
+    return (model.objects.aggregate(pk=Max('pk'))['pk'] or 0) + 1
+
+
+def zipf_weights(count, skew, rnd):
+    """Веса популярности по закону Ципфа в случайном порядке.
+
+    Небольшая доля элементов получает большую часть обращений,
+    как популярные произведения на реальном сайте.
+    """
+
+    weights = [1 / rank ** skew for rank in range(1, count + 1)]
+    rnd.shuffle(weights)
+    return weights
+
+
+class DataGenerator:
+    """Генерирует строки CSV-файлов для импорта через csv_to_db.
+
+    Идентификаторы продолжают уже существующие в таблицах,
+    а имена и slug получают общий случайный префикс, поэтому
+    сгенерированные данные можно добавлять к загруженным.
+    """
+
+    def __init__(self, sizes, skew=1.0, seed=0):
+        self.sizes = sizes
+        self.skew = skew
+        self.rnd = random.Random(seed)
+        self.prefix = uuid.uuid4().hex[:8]
+        self.now = timezone.now()
+        self.start = {
+            csv_file.name: next_pk(csv_file.model) for csv_file in CSV_FILES
+        }
+        self.review_count = 0
+
+    def ids(self, name, count):
+        start = self.start[name]
+        return range(start, start + count)
+
+    def text(self, words):
+        return ' '.join(self.rnd.choices(WORDS, k=words)).capitalize()
+
+    def pub_date(self):
+        seconds = self.rnd.randrange(PUB_DATE_DAYS * 24 * 60 * 60)
+        return (self.now - timedelta(seconds=seconds)).isoformat()
+
+    def category(self):
+        for i, pk in enumerate(self.ids('category', self.sizes.categories)):
+            yield {
+                'id': pk,
+                'name': f'Категория {i}',
+                'slug': f'{self.prefix}-c{i}',
+            }
+
+    def genre(self):
+        for i, pk in enumerate(self.ids('genre', self.sizes.genres)):
+            yield {
+                'id': pk,
+                'name': f'Жанр {i}',
+                'slug': f'{self.prefix}-g{i}',
+            }
+
+    def users(self):
+        for i, pk in enumerate(self.ids('users', self.sizes.users)):
+            username = f'{self.prefix}-u{i}'
+            yield {
+                'id': pk,
+                'username': username,
+                'email': f'{username}@yamdb.fake',
+                'role': 'moderator' if i % 50 == 1 else 'user',
+                'bio': '',
+                'first_name': '',
+                'last_name': '',
+            }
+
+    def titles(self):
+        categories = self.ids('category', self.sizes.categories)
+        for pk in self.ids('titles', self.sizes.titles):
+            yield {
+                'id': pk,
+                'name': f'{self.text(2)} {pk}',
+                'year': self.rnd.randint(1900, 2022),
+                'category': self.rnd.choice(categories) if categories else '',
+                'description': self.text(12),
+            }
+
+    def genre_title(self):
+        genres = self.ids('genre', self.sizes.genres)
+        if not genres:
+            return
+        pks = iter(self.ids('genre_title', self.sizes.titles * 3))
+        for title_id in self.ids('titles', self.sizes.titles):
+            count = self.rnd.randint(1, min(3, len(genres)))
+            for genre_id in self.rnd.sample(genres, count):
+                yield {
+                    'id': next(pks),
+                    'title_id': title_id,
+                    'genre_id': genre_id,
+                }
+
+    def review_counts(self, titles, limit):
+        """Количество отзывов на произведения с учётом популярности.
+
+        Пользователь оставляет не больше одного отзыва на произведение,
+        поэтому отзывы сверх limit перераспределяются между остальными.
+        """
+
+        weights = dict(zip(
+            titles, zipf_weights(len(titles), self.skew, self.rnd)
+        ))
+        counts = Counter()
+        remaining = min(self.sizes.reviews, len(titles) * limit)
+        while remaining:
+            open_titles = [pk for pk in titles if counts[pk] < limit]
+            cum_weights = list(accumulate(weights[pk] for pk in open_titles))
+            counts.update(self.rnd.choices(
+                open_titles, cum_weights=cum_weights, k=remaining
+            ))
+            remaining = 0
+            for pk, count in counts.items():
+                if count > limit:
+                    remaining += count - limit
+                    counts[pk] = limit
+        return counts
+
+    def review(self):
+        titles = self.ids('titles', self.sizes.titles)
+        users = self.ids('users', self.sizes.users)
+        if not titles or not users:
+            return
+
+        counts = self.review_counts(titles, len(users))
+        pk = self.start['review']
+        for title_id in titles:
+            count = counts[title_id]
+            for author in self.rnd.sample(users, count):
+                yield {
+                    'id': pk,
+                    'title_id': title_id,
+                    'text': self.text(20),
+                    'author': author,
+                    'score': self.rnd.randint(1, 10),
+                    'pub_date': self.pub_date(),
+                }
+                pk += 1
+        self.review_count = pk - self.start['review']
+
+    def comments(self):
+        if not self.review_count:
+            return
+        reviews = self.ids('review', self.review_count)
+        users = self.ids('users', self.sizes.users)
+        weights = list(accumulate(
+            zipf_weights(len(reviews), self.skew, self.rnd)
+        ))
+        for pk in self.ids('comments', self.sizes.comments):
+            yield {
+                'id': pk,
+                'review_id': self.rnd.choices(reviews, cum_weights=weights)[0],
+                'text': self.text(10),
+                'author_id': self.rnd.choice(users),
+                'pub_date': self.pub_date(),
+            }
+
+    def rows(self, csv_file):
+        """Строки файла в виде словарей, как их отдаёт csv.DictReader."""
+
+        for row in getattr(self, csv_file.name)():
+            yield {key: str(value) for key, value in row.items()}
@@ -0,0 +1,258 @@
+import random
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+
+import requests
+from api.cache import get_cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Comment, Genre, Title
+
+from . import _benchmark
+from ._generate import WORDS
+
+# Доля запросов к каждому адресу в смеси нагрузки.
+Endpoint = namedtuple('Endpoint', 'name weight')
+
+ENDPOINTS = (
+    Endpoint('titles', 30),
+    Endpoint('title', 20),
+    Endpoint('reviews', 20),
+    Endpoint('comments', 10),
+    Endpoint('categories', 5),
+    Endpoint('genres', 5),
+    Endpoint('titles?genre=', 5),
+    Endpoint('titles?search=', 5),
+)
+
+API = '/api/v1'
+TARGETS = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и число SQL-запросов на смеси запросов '
+        'к /api/v1/, похожей на реальную нагрузку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Количество замеряемых запросов.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=50,
+            help='Количество запросов прогрева, не входящих в замер.',
+        )
+        parser.add_argument(
+            '--url',
+            help=(
+                'Адрес запущенного сервера, например http://127.0.0.1:8000. '
+                'Без него запросы выполняются тестовым клиентом Django '
+                'в этом процессе.'
+            ),
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=1,
+            help='Количество параллельных клиентов, только вместе с --url.',
+        )
+        parser.add_argument(
+            '--clear-cache',
+            action='store_true',
+            help='Очистить кэш ответов API перед замером.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.',
+        )
+        parser.add_argument(
+            '--label',
+            default='',
+            help='Метка замера в сохранённом результате.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результат в JSON-файл.',
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON-файл прошлого замера для сравнения.',
+        )
+
+    def load_targets(self):
+        # Популярные произведения и обсуждаемые отзывы запрашиваются
+        # чаще, поэтому веса берутся из количества отзывов и комментариев.
+        self.titles = list(
+            Title.objects
+            .order_by('-review_count')
+            .values_list('id', 'review_count')[:TARGETS]
+        )
+        self.reviews = list(
+            Comment.objects
+            .values('review_id', 'review__title_id')
+            .annotate(comments=Count('id'))
+            .order_by('-comments')
+            .values_list('review__title_id', 'review_id', 'comments')[:TARGETS]
+        )
+        self.title_weights = list(accumulate(
+            count + 1 for _, count in self.titles
+        ))
+        self.review_weights = list(accumulate(
+            count + 1 for _, _, count in self.reviews
+        ))
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        if not self.titles or not self.genres:
+            raise CommandError(
+                'Недостаточно данных: загрузите их командой generate_data'
+            )
+
+    def path(self, rnd, name):
+        page = f'?offset={rnd.choice((0, 0, 0, 5, 10))}'
+        if name == 'titles':
+            return f'{API}/titles/{page}'
+        if name == 'categories':
+            return f'{API}/categories/'
+        if name == 'genres':
+            return f'{API}/genres/'
+        if name == 'titles?genre=':
+            return f'{API}/titles/?genre={rnd.choice(self.genres)}'
+        if name == 'titles?search=':
+            return f'{API}/titles/?search={rnd.choice(WORDS)}'
+
+        title_id, _ = rnd.choices(
+            self.titles, cum_weights=self.title_weights
+        )[0]
+        if name == 'title':
+            return f'{API}/titles/{title_id}/'
+        if name == 'reviews':
+            return f'{API}/titles/{title_id}/reviews/{page}'
+        if not self.reviews:
+            return f'{API}/titles/{title_id}/reviews/'
+        title_id, review_id, _ = rnd.choices(
+            self.reviews, cum_weights=self.review_weights
+        )[0]
+        return f'{API}/titles/{title_id}/reviews/{review_id}/comments/'
+
+    def plan(self, count, rnd):
+        names = rnd.choices(
+            [endpoint.name for endpoint in ENDPOINTS],
+            [endpoint.weight for endpoint in ENDPOINTS],
+            k=count,
+        )
+        return [(name, self.path(rnd, name)) for name in names]
+
+    def local_request(self, client, path):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path)
+            seconds = time.perf_counter() - started
+        return _benchmark.Sample(
+            seconds, len(queries), len(response.content), response.status_code
+        )
+
+    def remote_request(self, session, url, path):
+        started = time.perf_counter()
+        response = session.get(url + path)
+        seconds = time.perf_counter() - started
+        return _benchmark.Sample(
+            seconds, None, len(response.content), response.status_code
+        )
+
+    def run(self, plan, url, concurrency):
+        if not url:
+            client = Client(HTTP_HOST='localhost')
+            return [
+                (name, self.local_request(client, path))
+                for name, path in plan
+            ]
+        session = requests.Session()
+        session.mount(url, requests.adapters.HTTPAdapter(
+            pool_maxsize=concurrency
+        ))
+        with ThreadPoolExecutor(concurrency) as executor:
+            samples = executor.map(
+                lambda item: self.remote_request(session, url, item[1]), plan
+            )
+            return list(zip((name for name, _ in plan), samples))
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('Количество запросов должно быть положительным')
+        if options['concurrency'] > 1 and not options['url']:
+            raise CommandError('Параллельные клиенты доступны только с --url')
+        url = options['url'] and options['url'].rstrip('/')
+
+        self.load_targets()
+        rnd = random.Random(options['seed'])
+        warmup = self.plan(options['warmup'], rnd)
+        plan = self.plan(options['requests'], rnd)
+
+        if options['clear_cache']:
+            get_cache().clear()
+        self.run(warmup, url, options['concurrency'])
+        started = time.perf_counter()
+        results = self.run(plan, url, options['concurrency'])
+        elapsed = time.perf_counter() - started
+
+        by_endpoint = defaultdict(list)
+        for name, sample in results:
+            by_endpoint[name].append(sample)
+        result = {
+            'label': options['label'],
+            'mode': url or 'in-process',
+            'concurrency': options['concurrency'],
+            'database': connection.vendor,
+            'endpoints': {
+                name: _benchmark.summarize(samples)
+                for name, samples in sorted(by_endpoint.items())
+            },
+            'total': _benchmark.summarize(
+                [sample for _, sample in results], elapsed
+            ),
+        }
+        self.report(result)
+
+        if options['output']:
+            _benchmark.save_result(options['output'], result)
+            self.stdout.write(f'Результат сохранён в {options["output"]}')
+        if options['compare']:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'Сравнение с {options["compare"]}'
+            ))
+            baseline = _benchmark.load_result(options['compare'])
+            for line in _benchmark.compare(baseline, result):
+                self.stdout.write(f'  {line}')
+
+    def report(self, result):
+        columns = (
+            'requests', 'p50_ms', 'p95_ms', 'p99_ms',
+            'queries_per_request', 'requests_per_second',
+        )
+        header = ['endpoint', 'n', 'p50', 'p95', 'p99', 'queries', 'req/s']
+        rows = [
+            [name] + [summary[column] for column in columns]
+            for name, summary in result['endpoints'].items()
+        ]
+        rows.append(['total'] + [result['total'][c] for c in columns])
+        self.stdout.write(''.join(f'{cell:>16}' for cell in header))
+        for row in rows:
+            self.stdout.write(''.join(
+                f'{"-" if cell is None else cell:>16}' for cell in row
+            ))
+        if result['total']['errors']:
+            self.stderr.write(
+                f'Ответов с ошибкой: {result["total"]["errors"]}'
+            )
@@ -0,0 +1,143 @@
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client, override_settings
+from reviews.models import Review, Title
+
+from api_yamdb import compression
+
+from . import _benchmark
+
+IDENTITY = 'identity'
+API = '/api/v1/'
+
+
+def transfer_ms(size, bandwidth_mbit):
+    return round(size * 8 / (bandwidth_mbit * 1000), 3)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает размер и время ответов API без сжатия, с gzip '
+        'и Brotli, оценивает время передачи по каналу заданной '
+        'скорости и считает выигрыш от сжатых копий статических файлов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Количество замеряемых запросов для каждого варианта.',
+        )
+        parser.add_argument(
+            '--bandwidth-mbit',
+            type=float,
+            default=10,
+            help='Скорость канала клиента в Мбит/с для оценки передачи.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результат в JSON-файл.',
+        )
+
+    def urls(self):
+        title = Title.objects.order_by('-review_count').first()
+        review = (
+            Review.objects.annotate(comment_count=Count('comments'))
+            .filter(comment_count__gt=0)
+            .order_by('-comment_count')
+            .values_list('title_id', 'pk').first()
+        )
+        if title is None or review is None:
+            raise CommandError(
+                'Недостаточно данных: загрузите их командой generate_data'
+            )
+        return {
+            'titles': f'{API}titles/?limit=100',
+            'title': f'{API}titles/{title.pk}/',
+            'reviews': f'{API}titles/{title.pk}/reviews/?limit=200',
+            'comments': (
+                f'{API}titles/{review[0]}/reviews/{review[1]}/comments/'
+                '?limit=200'
+            ),
+            'genres': f'{API}genres/?limit=1000',
+        }
+
+    def measure(self, url, encoding, count):
+        client = Client(HTTP_HOST='localhost', HTTP_ACCEPT_ENCODING=encoding)
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = client.get(url)
+            seconds = time.perf_counter() - started
+            samples.append(_benchmark.Sample(
+                seconds, None, len(response.content), response.status_code
+            ))
+        return _benchmark.summarize(samples)
+
+    def static_sizes(self):
+        sizes = {IDENTITY: 0, **dict.fromkeys(compression.encodings(), 0)}
+        for finder in finders.get_finders():
+            for path, storage in finder.list(['data']):
+                extension = os.path.splitext(path)[1].lower()
+                if extension not in settings.STATIC_COMPRESS_EXTENSIONS:
+                    continue
+                with storage.open(path) as file:
+                    content = file.read()
+                sizes[IDENTITY] += len(content)
+                for encoding in compression.encodings():
+                    compressed = compression.compress(
+                        content, encoding, compression.BEST
+                    )
+                    sizes[encoding] += min(len(compressed), len(content))
+        return sizes
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['bandwidth_mbit'] <= 0:
+            raise CommandError(
+                'Количество запросов и скорость канала должны быть '
+                'положительными'
+            )
+        bandwidth = options['bandwidth_mbit']
+        variants = (IDENTITY, *compression.encodings())
+
+        endpoints = {}
+        with override_settings(API_CACHE_TIMEOUT=0):
+            for name, url in self.urls().items():
+                for encoding in variants:
+                    self.measure(url, encoding, 3)
+                    summary = self.measure(url, encoding, options['requests'])
+                    summary['transfer_ms'] = transfer_ms(
+                        summary['bytes_per_request'], bandwidth
+                    )
+                    summary['total_ms'] = round(
+                        summary['p50_ms'] + summary['transfer_ms'], 3
+                    )
+                    endpoints[f'{name}:{encoding}'] = summary
+
+        header = ('response', 'bytes', 'p50', 'transfer', 'total')
+        self.stdout.write(''.join(f'{cell:>20}' for cell in header))
+        for name, summary in endpoints.items():
+            row = (
+                name, summary['bytes_per_request'], summary['p50_ms'],
+                summary['transfer_ms'], summary['total_ms'],
+            )
+            self.stdout.write(''.join(f'{cell:>20}' for cell in row))
+
+        static = self.static_sizes()
+        self.stdout.write('Статические файлы, байт: ' + ', '.join(
+            f'{encoding} {size}' for encoding, size in static.items()
+        ))
+
+        if options['output']:
+            _benchmark.save_result(options['output'], {
+                'bandwidth_mbit': bandwidth,
+                'endpoints': endpoints,
+                'static_bytes': static,
+            })
+            self.stdout.write(f'Результат сохранён в {options["output"]}')
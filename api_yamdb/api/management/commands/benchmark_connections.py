@@ -0,0 +1,112 @@
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from . import _benchmark
+
+# Переменные окружения сравниваемых режимов работы с соединениями.
+MODES = {
+    'per-request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL_SIZE': '0'},
+    'persistent': {'DB_CONN_MAX_AGE': '600', 'DB_POOL_SIZE': '0'},
+    'pool': {'DB_POOL_SIZE': None},
+}
+# Ответы не кэшируются, чтобы каждый запрос обращался к базе.
+COMMON_ENV = {'API_CACHE_TIMEOUT': '0'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает приложение под gunicorn с новым соединением с базой '
+        'на каждый запрос, с постоянными соединениями и с пулом '
+        'и сравнивает задержку запросов командой benchmark_api.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Количество процессов gunicorn.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Количество потоков в процессе.',
+        )
+        parser.add_argument(
+            '--pool-size',
+            type=int,
+            default=4,
+            help='Размер пула соединений процесса в режиме pool.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Количество параллельных клиентов.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Количество замеряемых запросов в каждом режиме.',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8100,
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Каталог для JSON-результатов <режим>.json.',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        previous = None
+        for mode, env in MODES.items():
+            env = {
+                name: value or str(options['pool_size'])
+                for name, value in env.items()
+            }
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{mode}: {options["workers"]} процессов по '
+                f'{options["threads"]} потоков, {options["concurrency"]} '
+                f'клиентов, ' + ', '.join(
+                    f'{name}={value}' for name, value in env.items()
+                )
+            ))
+            process, url, _ = _benchmark.start_gunicorn(
+                [
+                    'api_yamdb.wsgi:application',
+                    '--workers', str(options['workers']),
+                    '--threads', str(options['threads']),
+                ],
+                options['port'],
+                env={**COMMON_ENV, **env},
+            )
+            output = (
+                os.path.join(output_dir, f'{mode}.json') if output_dir
+                else None
+            )
+            try:
+                call_command(
+                    'benchmark_api',
+                    url=url,
+                    concurrency=options['concurrency'],
+                    requests=options['requests'],
+                    label=mode,
+                    output=output,
+                    compare=previous,
+                    stdout=self.stdout,
+                    stderr=self.stderr,
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            previous = output
@@ -0,0 +1,111 @@
+import time
+from collections import namedtuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Title
+
+from . import _benchmark
+
+# Сравниваемый набор полей: имя, адрес относительно /api/v1/
+# и параметры ?fields= или ?exclude=.
+Subset = namedtuple('Subset', 'name path query')
+
+SUBSETS = (
+    Subset('titles', 'titles/', ''),
+    Subset('titles:names', 'titles/', 'fields=id,name,rating'),
+    Subset('titles:cards', 'titles/', 'fields=id,name,year,rating,category'),
+    Subset('titles:no-description', 'titles/', 'exclude=description'),
+    Subset('reviews', 'titles/{title}/reviews/', ''),
+    Subset('reviews:scores', 'titles/{title}/reviews/', 'fields=id,score'),
+    Subset(
+        'reviews:no-text', 'titles/{title}/reviews/', 'exclude=text,title'
+    ),
+)
+API = '/api/v1/'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает размер ответа, задержку и число SQL-запросов '
+        'при разных ?fields= и ?exclude= для списков произведений '
+        'и отзывов. Ответы не кэшируются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Количество замеряемых запросов для каждого набора полей.',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=50,
+            help='Значение параметра limit.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результат в JSON-файл.',
+        )
+
+    def measure(self, client, url, count):
+        samples = []
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(url)
+                seconds = time.perf_counter() - started
+            samples.append(_benchmark.Sample(
+                seconds, len(queries), len(response.content),
+                response.status_code,
+            ))
+        return _benchmark.summarize(samples)
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['page_size'] < 1:
+            raise CommandError(
+                'Количество запросов и размер страницы должны быть '
+                'положительными'
+            )
+        title = (
+            Title.objects.order_by('-review_count')
+            .values_list('pk', flat=True).first()
+        )
+        if title is None:
+            raise CommandError(
+                'Недостаточно данных: загрузите их командой generate_data'
+            )
+
+        client = Client(HTTP_HOST='localhost')
+        endpoints = {}
+        with override_settings(API_CACHE_TIMEOUT=0):
+            for subset in SUBSETS:
+                query = f'limit={options["page_size"]}'
+                if subset.query:
+                    query = f'{query}&{subset.query}'
+                url = f'{API}{subset.path.format(title=title)}?{query}'
+                self.measure(client, url, 5)
+                endpoints[subset.name] = self.measure(
+                    client, url, options['requests']
+                )
+
+        header = ('subset', 'bytes', 'p50', 'p95', 'queries')
+        self.stdout.write(''.join(f'{cell:>24}' for cell in header))
+        for name, summary in endpoints.items():
+            row = (
+                name, summary['bytes_per_request'], summary['p50_ms'],
+                summary['p95_ms'], summary['queries_per_request'],
+            )
+            self.stdout.write(''.join(f'{cell:>24}' for cell in row))
+
+        if options['output']:
+            _benchmark.save_result(options['output'], {
+                'page_size': options['page_size'],
+                'database': connection.vendor,
+                'endpoints': endpoints,
+            })
+            self.stdout.write(f'Результат сохранён в {options["output"]}')
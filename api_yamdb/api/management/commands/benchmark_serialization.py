@@ -0,0 +1,133 @@
+import time
+from collections import namedtuple
+
+from api.renderers import FastJSONRenderer, fast_json_enabled
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleReadSerializer)
+from api.values import (CommentValuesReader, ReviewValuesReader,
+                        TitleValuesReader)
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from reviews.models import Comment, Review, Title
+
+from . import _benchmark
+
+# Сравниваемый список: queryset для сериализатора, сериализатор
+# и читатель .values() с тем же ответом.
+Listing = namedtuple('Listing', 'name queryset serializer reader')
+
+LISTINGS = (
+    Listing(
+        'titles',
+        lambda: Title.objects.order_by('id')
+        .select_related('category').prefetch_related('genre'),
+        TitleReadSerializer,
+        TitleValuesReader,
+    ),
+    Listing(
+        'reviews',
+        lambda: Review.objects.order_by('pub_date', 'id')
+        .select_related('author', 'title'),
+        ReviewSerializer,
+        ReviewValuesReader,
+    ),
+    Listing(
+        'comments',
+        lambda: Comment.objects.order_by('pub_date', 'id')
+        .select_related('author'),
+        CommentSerializer,
+        CommentValuesReader,
+    ),
+)
+RENDERERS = {'json': JSONRenderer(), 'orjson': FastJSONRenderer()}
+
+
+def serializer_page(listing, size):
+    queryset = listing.queryset()[:size]
+    return listing.serializer(queryset, many=True).data
+
+
+def values_page(listing, size):
+    reader = listing.reader(listing.serializer.Meta.fields)
+    return reader.represent(reader.values(listing.queryset())[:size])
+
+
+PATHS = {'serializer': serializer_page, 'values': values_page}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает построение страницы сериализатором и из .values() '
+        'и кодирование ответа стандартным json и orjson.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=1000,
+            help='Количество строк на странице.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество замеров каждого варианта.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Сохранить результат в JSON-файл.',
+        )
+
+    def measure(self, listing, path, renderer, size, repeat):
+        samples = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                content = renderer.render(PATHS[path](listing, size))
+                seconds = time.perf_counter() - started
+            samples.append(
+                _benchmark.Sample(seconds, len(queries), len(content), 200)
+            )
+        return _benchmark.summarize(samples)
+
+    def handle(self, *args, **options):
+        size, repeat = options['page_size'], options['repeat']
+        if size < 1 or repeat < 1:
+            raise CommandError(
+                'Размер страницы и количество замеров должны быть '
+                'положительными'
+            )
+        if not fast_json_enabled():
+            self.stderr.write(
+                'orjson не установлен или отключён API_JSON_BACKEND'
+            )
+
+        endpoints = {}
+        for listing in LISTINGS:
+            for path in PATHS:
+                for name, renderer in RENDERERS.items():
+                    self.measure(listing, path, renderer, size, 1)
+                    endpoints[f'{listing.name}:{path}:{name}'] = self.measure(
+                        listing, path, renderer, size, repeat
+                    )
+
+        header = ('variant', 'rows', 'bytes', 'p50', 'p95', 'queries')
+        self.stdout.write(''.join(f'{cell:>28}' for cell in header))
+        for variant, summary in endpoints.items():
+            row = (
+                variant, size, summary['bytes_per_request'],
+                summary['p50_ms'], summary['p95_ms'],
+                summary['queries_per_request'],
+            )
+            self.stdout.write(''.join(f'{cell:>28}' for cell in row))
+
+        if options['output']:
+            _benchmark.save_result(options['output'], {
+                'page_size': size,
+                'database': connection.vendor,
+                'endpoints': endpoints,
+            })
+            self.stdout.write(f'Результат сохранён в {options["output"]}')
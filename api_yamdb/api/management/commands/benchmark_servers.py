@@ -0,0 +1,88 @@
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from . import _benchmark
+
+# Команды gunicorn для сравниваемых режимов при равном числе процессов.
+SERVERS = {
+    'wsgi': ['api_yamdb.wsgi:application'],
+    'asgi': [
+        'api_yamdb.asgi:application',
+        '--worker-class', 'uvicorn.workers.UvicornH11Worker',
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает приложение под gunicorn в режимах WSGI и ASGI '
+        'с одинаковым числом процессов и сравнивает их командой '
+        'benchmark_api.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов gunicorn в каждом режиме.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Количество параллельных клиентов.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Количество замеряемых запросов в каждом режиме.',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8100,
+        )
+        parser.add_argument(
+            '--output-dir',
+            help='Каталог для JSON-результатов <режим>.json.',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        previous = None
+        for mode in SERVERS:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{mode}: {options["workers"]} процессов, '
+                f'{options["concurrency"]} клиентов'
+            ))
+            process, url, _ = _benchmark.start_gunicorn(
+                SERVERS[mode] + ['--workers', str(options['workers'])],
+                options['port'],
+            )
+            output = (
+                os.path.join(output_dir, f'{mode}.json') if output_dir
+                else None
+            )
+            try:
+                call_command(
+                    'benchmark_api',
+                    url=url,
+                    concurrency=options['concurrency'],
+                    requests=options['requests'],
+                    label=mode,
+                    output=output,
+                    compare=previous,
+                    stdout=self.stdout,
+                    stderr=self.stderr,
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            previous = output
@@ -1,44 +1,102 @@
-from django.core.management.base import BaseCommand
-from reviews import models
+import os
+from functools import partial
+
+from api import cache
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from reviews import search
 
 from . import _common
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в базу данных.'
 
-    def get_path(self, file_name):
-        return f'C:/Dev/api_yamdb/api_yamdb/static/data/{file_name}.csv'
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=os.path.join(settings.BASE_DIR, 'project_static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=_common.DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной вставке.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество потоков загрузки. Независимые файлы '
+                'загружаются одновременно, каждый в своём соединении.'
+            ),
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.',
+        )
 
-    def handle(self, *args, **options):
+    def get_path(self, data_dir, file_name):
+        return os.path.join(data_dir, f'{file_name}.csv')
 
-        _common.create_items(
-            self.get_path('category'),
-            models.Category.objects,
+    def load(self, csv_file, data_dir, batch_size, use_copy):
+        total, skipped = _common.create_items(
+            self.get_path(data_dir, csv_file.name),
+            csv_file,
+            self.stdout.write,
+            batch_size,
+            use_copy,
         )
+        if skipped:
+            self.stderr.write(
+                f'{csv_file.name}: пропущено {skipped} из {total} '
+                'строк без связанных записей'
+            )
 
-        _common.create_items(
-            self.get_path('genre'),
-            models.Genre.objects,
-        )
+    def handle(self, *args, **options):
+        data_dir = options['data_dir']
+        if not os.path.isdir(data_dir):
+            raise CommandError(f'Каталог {data_dir} не найден')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+        if options['workers'] < 1:
+            raise CommandError('Количество потоков должно быть положительным')
 
-        _common.create_items(
-            self.get_path('users'),
-            models.User.objects,
-        )
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(
+                'SQLite не поддерживает параллельную запись, '
+                'файлы будут загружены последовательно'
+            )
+            workers = 1
 
-        _common.create_items(
-            self.get_path('titles'),
-            models.Title.objects,
-        )
+        csv_files = []
+        for csv_file in _common.CSV_FILES:
+            path = self.get_path(data_dir, csv_file.name)
+            if os.path.exists(path):
+                csv_files.append(csv_file)
+            else:
+                self.stdout.write(f'Файл {path} не найден, пропущен')
 
-        _common.create_items(
-            self.get_path('review'),
-            models.Review.objects,
+        load = partial(
+            self.load,
+            data_dir=data_dir,
+            batch_size=options['batch_size'],
+            use_copy=_common.can_copy() and not options['no_copy'],
         )
+        model_list = [csv_file.model for csv_file in csv_files]
 
-        _common.create_items(
-            self.get_path('comments'),
-            models.Comment.objects,
-            None,
-            ';'
-        )
+        with _common.original_pub_dates(model_list):
+            if workers == 1:
+                for csv_file in csv_files:
+                    load(csv_file)
+            else:
+                _common.run_ordered(csv_files, load, workers)
+
+        # Массовая вставка не отправляет сигналы моделей.
+        search.rebuild()
+        cache.invalidate(cache.CATALOG)
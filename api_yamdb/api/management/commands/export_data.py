@@ -0,0 +1,52 @@
+import os
+
+from api import export
+from django.core.management.base import BaseCommand, CommandError
+
+from ._common import CSV_FILES
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает данные в каталог. CSV-выгрузку можно '
+        'загрузить обратно командой csv_to_db --data-dir.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            required=True,
+            help='Каталог для файлов выгрузки.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=(export.CSV, export.NDJSON),
+            default=export.CSV,
+            help='csv - все таблицы в формате csv_to_db, ndjson - '
+                 'произведения, отзывы и комментарии.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Строк в одной выборке из базы.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size is not None and chunk_size < 1:
+            raise CommandError('Размер выборки должен быть положительным')
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+
+        file_format = options['format']
+        if file_format == export.CSV:
+            files = [(csv_file.name, csv_file.name) for csv_file in CSV_FILES]
+        else:
+            files = list(export.DATASETS.items())
+        for file_name, name in files:
+            path = os.path.join(output_dir, f'{file_name}.{file_format}')
+            with open(path, 'wb') as file:
+                for block in export.stream(name, file_format, chunk_size):
+                    file.write(block)
+            self.stdout.write(f'Записан файл {path}')
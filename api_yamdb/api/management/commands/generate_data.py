@@ -0,0 +1,117 @@
+import os
+
+from api import cache
+from django.core.management.base import BaseCommand, CommandError
+from reviews import search
+
+from . import _common
+from ._generate import FIELDNAMES, DataGenerator, Sizes
+
+SIZE_HELP = {
+    'users': 'Количество пользователей.',
+    'titles': 'Количество произведений.',
+    'genres': 'Количество жанров.',
+    'categories': 'Количество категорий.',
+    'reviews': 'Количество отзывов.',
+    'comments': 'Количество комментариев.',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетические данные заданного размера '
+        'с неравномерной популярностью произведений.'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in Sizes._field_defaults.items():
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                default=default,
+                help=SIZE_HELP[name],
+            )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help=(
+                'Показатель закона Ципфа для популярности произведений: '
+                '0 - равномерно, чем больше, тем сильнее перекос.'
+            ),
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.',
+        )
+        parser.add_argument(
+            '--output-dir',
+            help=(
+                'Записать CSV-файлы в каталог вместо загрузки в базу. '
+                'Файлы читаются командой csv_to_db.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=_common.DEFAULT_BATCH_SIZE,
+            help='Количество строк в одной вставке.',
+        )
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Не использовать COPY даже на PostgreSQL.',
+        )
+
+    def write(self, generator, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        for csv_file in _common.CSV_FILES:
+            path = os.path.join(output_dir, f'{csv_file.name}.csv')
+            _common.write_rows(
+                path,
+                csv_file,
+                FIELDNAMES[csv_file.name],
+                generator.rows(csv_file),
+            )
+            self.stdout.write(f'{csv_file.name}: записан {path}')
+
+    def load(self, generator, batch_size, use_copy):
+        model_list = [csv_file.model for csv_file in _common.CSV_FILES]
+        with _common.original_pub_dates(model_list):
+            for csv_file in _common.CSV_FILES:
+                _common.import_rows(
+                    generator.rows(csv_file),
+                    csv_file,
+                    self.stdout.write,
+                    batch_size,
+                    use_copy,
+                )
+
+        # Массовая вставка не отправляет сигналы моделей.
+        search.rebuild()
+        cache.invalidate(cache.CATALOG)
+
+    def handle(self, *args, **options):
+        sizes = Sizes(**{name: options[name] for name in Sizes._fields})
+        if min(sizes) < 0:
+            raise CommandError('Размеры не могут быть отрицательными')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+
+        generator = DataGenerator(sizes, options['skew'], options['seed'])
+        if options['output_dir']:
+            self.write(generator, options['output_dir'])
+        else:
+            self.load(
+                generator,
+                options['batch_size'],
+                _common.can_copy() and not options['no_copy'],
+            )
+        if generator.review_count < sizes.reviews:
+            self.stderr.write(
+                f'Создано {generator.review_count} отзывов из {sizes.reviews}'
+                ': на произведение приходится не больше одного отзыва '
+                'от пользователя'
+            )
@@ -0,0 +1,136 @@
+import os
+import time
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from . import _benchmark
+
+# Режимы загрузки приложения: переменные окружения для gunicorn.conf.py.
+MODES = {
+    'preload': {'GUNICORN_PRELOAD': 'True'},
+    'no-preload': {'GUNICORN_PRELOAD': 'False'},
+}
+WORKERS_TIMEOUT = 30
+
+
+def children(pid):
+    """Дочерние процессы по /proc, без сторонних библиотек."""
+
+    pids = []
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as file:
+                # Имя процесса в скобках может содержать пробелы.
+                fields = file.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            pids.append(int(name))
+    return sorted(pids)
+
+
+def memory_kb(pid):
+    """RSS и PSS процесса в килобайтах.
+
+    PSS делит общие страницы между процессами, поэтому
+    показывает выигрыш от загрузки приложения до fork.
+    """
+
+    values = {}
+    for path, key in (
+            (f'/proc/{pid}/status', 'VmRSS:'),
+            (f'/proc/{pid}/smaps_rollup', 'Pss:')):
+        try:
+            with open(path) as file:
+                for line in file:
+                    if line.startswith(key):
+                        values[key] = int(line.split()[1])
+                        break
+        except OSError:
+            pass
+    return values.get('VmRSS:'), values.get('Pss:')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время запуска gunicorn и память каждого процесса '
+        'с загрузкой приложения до fork и без неё.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Количество процессов gunicorn.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Запросов прогрева перед замером памяти.',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8100,
+        )
+
+    def wait_workers(self, process, workers):
+        deadline = time.monotonic() + _benchmark.STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            pids = children(process.pid)
+            if len(pids) >= workers:
+                return pids
+            time.sleep(0.05)
+        raise CommandError('Не все процессы gunicorn запустились вовремя')
+
+    def measure(self, mode, options):
+        started = time.perf_counter()
+        process, url, first_response = _benchmark.start_gunicorn(
+            [
+                'api_yamdb.wsgi:application',
+                '--workers', str(options['workers']),
+                '--threads', '1',
+            ],
+            options['port'],
+            env=MODES[mode],
+        )
+        try:
+            pids = self.wait_workers(process, options['workers'])
+            all_workers = time.perf_counter() - started
+            with requests.Session() as session:
+                for _ in range(options['requests']):
+                    session.get(f'{url}/api/v1/titles/')
+
+            self.stdout.write(self.style.MIGRATE_HEADING(mode))
+            self.stdout.write(
+                f'  первый ответ: {first_response:.2f} с, '
+                f'все процессы: {all_workers:.2f} с'
+            )
+            total_rss = total_pss = 0
+            for role, pid in [('master', process.pid)] + [
+                    ('worker', pid) for pid in pids]:
+                rss, pss = memory_kb(pid)
+                total_rss += rss or 0
+                total_pss += pss or 0
+                self.stdout.write(
+                    f'  {role:<8}{pid:>8}  RSS {rss or 0:>8} КБ'
+                    f'  PSS {pss if pss is not None else "-":>8} КБ'
+                )
+            self.stdout.write(
+                f'  всего{"":>11}RSS {total_rss:>8} КБ'
+                f'  PSS {total_pss:>8} КБ'
+            )
+        finally:
+            process.terminate()
+            process.wait()
+
+    def handle(self, *args, **options):
+        if not os.path.isdir('/proc'):
+            raise CommandError('Для замера памяти нужна файловая система proc')
+        for mode in MODES:
+            self.measure(mode, options)
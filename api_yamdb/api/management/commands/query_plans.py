@@ -0,0 +1,127 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from reviews.models import Category, Comment, Genre, Review, Title
+
+from ._common import CSV_FILES, import_rows, original_pub_dates
+from ._generate import DataGenerator, Sizes
+
+# Индексы горячих путей, добавленные миграциями 0005 и 0006.
+LOOKUP_INDEXES = (
+    'review_title_pub_date_idx',
+    'comment_review_pub_date_idx',
+    'title_year_idx',
+    'title_name_search_idx',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы выполнения горячих запросов API '
+        'с индексами и без них. Все изменения откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Сколько произведений сгенерировать перед замером.',
+        )
+        parser.add_argument(
+            '--reviews',
+            type=int,
+            default=20,
+            help='Отзывов и комментариев на произведение (в среднем).',
+        )
+
+    def seed(self, titles, reviews):
+        sizes = Sizes(
+            users=reviews,
+            titles=titles,
+            genres=30,
+            categories=10,
+            reviews=titles * reviews,
+            comments=titles * reviews,
+        )
+        generator = DataGenerator(sizes, skew=0)
+        with original_pub_dates([csv_file.model for csv_file in CSV_FILES]):
+            for csv_file in CSV_FILES:
+                # Ход загрузки не выводится, чтобы не смешивать его с планами.
+                import_rows(generator.rows(csv_file), csv_file, lambda _: None)
+
+    def hot_queries(self):
+        title = Title.objects.order_by('-pk').first()
+        review = Review.objects.order_by('-pk').first()
+        genre = Genre.objects.order_by('-pk').first()
+        category = Category.objects.order_by('-pk').first()
+        if None in (title, review, genre, category):
+            raise CommandError(
+                'Недостаточно данных: загрузите их или укажите --seed'
+            )
+
+        return {
+            'titles?year=': Title.objects.filter(year=title.year),
+            'titles?genre=': Title.objects.filter(genre__slug=genre.slug),
+            'titles?category=': Title.objects.filter(
+                category__slug=category.slug
+            ),
+            'titles?name=': Title.objects.filter(
+                name__icontains=title.name[-6:]
+            ),
+            'titles/{id}/reviews/': Review.objects.filter(
+                title=title
+            ).order_by('pub_date', 'id')[:5],
+            'titles/{id}/reviews/{id}/comments/': Comment.objects.filter(
+                review=review
+            ).order_by('pub_date', 'id')[:5],
+        }
+
+    def explain(self, queryset, phase):
+        # Комментарий делает текст запроса уникальным для каждого замера,
+        # иначе SQLite вернёт план из кэша подготовленных выражений.
+        sql, params = queryset.query.sql_with_params()
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'/* {phase} */ {prefix} {sql}', params)
+            return '\n'.join(
+                ' '.join(map(str, row)) for row in cursor.fetchall()
+            )
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for name in LOOKUP_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'], options['reviews'])
+            self.analyze()
+
+            queries = self.hot_queries()
+            after = {
+                name: self.explain(qs, 'after')
+                for name, qs in queries.items()
+            }
+            self.drop_indexes()
+            before = {
+                name: self.explain(qs, 'before')
+                for name, qs in queries.items()
+            }
+
+            transaction.set_rollback(True)
+
+        for name in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write('  без индексов:')
+            self.stdout.write(self.indent(before[name]))
+            self.stdout.write('  с индексами:')
+            self.stdout.write(self.indent(after[name]))
+
+    @staticmethod
+    def indent(plan):
+        return '\n'.join(f'    {line}' for line in plan.splitlines())
@@ -0,0 +1,20 @@
+from api import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковые документы всех произведений.'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            self.stdout.write(
+                'Поисковый индекс не поддерживается этой СУБД, '
+                'используется поиск по подстроке.'
+            )
+            return
+        with transaction.atomic():
+            search.rebuild()
+        cache.invalidate('titles')
+        self.stdout.write('Поисковый индекс пересобран.')
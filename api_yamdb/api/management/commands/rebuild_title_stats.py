@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Title
+from reviews.stats import DEFAULT_BATCH_SIZE, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику отзывов всех произведений '
+        'пачками по первичному ключу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество произведений в одной пачке.',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+
+        total = Title.objects.count()
+        done = 0
+        for count in rebuild_stats(batch_size=options['batch_size']):
+            done += count
+            self.stdout.write(f'Обработано произведений: {done} из {total}')
+        self.stdout.write(f'Статистика пересчитана: {done}')
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.ratings import find_rating_mismatches, recalculate_ratings
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает и проверяет сохранённые рейтинги произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить рейтинги, не изменяя их.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = find_rating_mismatches()
+            for title_id, stored, actual in mismatches:
+                self.stderr.write(
+                    f'Произведение {title_id}: сохранено {stored}, '
+                    f'фактически {actual}'
+                )
+            if mismatches:
+                raise CommandError(
+                    f'Устаревших рейтингов: {len(mismatches)}'
+                )
+            self.stdout.write('Рейтинги актуальны.')
+            return
+
+        with transaction.atomic():
+            updated = recalculate_ratings()
+            mismatches = find_rating_mismatches()
+        if mismatches:
+            raise CommandError(
+                f'После пересчёта остались расхождения: {len(mismatches)}'
+            )
+        self.stdout.write(f'Пересчитано произведений: {updated}')
@@ -0,0 +1,55 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает материализованные рейтинги произведений: общий, '
+        'по жанрам, по категориям и популярное за последние дни.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Пересчитать все рейтинги, а не только затронутые.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а пересчитывать рейтинги по расписанию.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.LEADERBOARD_REFRESH_INTERVAL,
+            help='Пауза в секундах между пересчётами.',
+        )
+
+    def refresh(self, full):
+        started = time.perf_counter()
+        count = refresh_leaderboards(full=full)
+        self.stdout.write(
+            f'Обновлено рейтингов: {count} '
+            f'за {time.perf_counter() - started:.2f} с'
+        )
+
+    def handle(self, *args, **options):
+        if not options['loop']:
+            self.refresh(options['full'])
+            return
+
+        full = options['full']
+        while True:
+            try:
+                self.refresh(full)
+            except Exception as error:
+                # Недоступная база не должна останавливать обработчик:
+                # рейтинги пересчитаются в следующий раз.
+                self.stderr.write(f'Ошибка пересчёта рейтингов: {error}')
+            else:
+                full = False
+            time.sleep(options['interval'])
@@ -0,0 +1,65 @@
+import time
+
+from api import outbox
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.MAIL_QUEUE_BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новые письма.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+
+    def send_all(self, batch_size):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = outbox.send_batch(batch_size)
+            total_sent += sent
+            total_failed += failed
+            # Неудачные письма откладываются, поэтому пачка
+            # без отправленных писем означает, что очередь пуста.
+            if not sent:
+                return total_sent, total_failed
+
+    def report(self, sent, failed):
+        if sent:
+            self.stdout.write(f'Отправлено писем: {sent}')
+        if failed:
+            self.stderr.write(f'Не удалось отправить писем: {failed}')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть положительным')
+
+        if not options['loop']:
+            self.report(*self.send_all(options['batch_size']))
+            return
+
+        while True:
+            try:
+                sent, failed = self.send_all(options['batch_size'])
+            except Exception as error:
+                # Недоступный почтовый сервер не должен останавливать
+                # обработчик: письма останутся в очереди.
+                self.stderr.write(f'Ошибка отправки: {error}')
+                sent = failed = 0
+            self.report(sent, failed)
+            if not sent:
+                time.sleep(options['interval'])
@@ -0,0 +1,227 @@
+import bisect
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from api_yamdb.db.pool import pool_stats
+
+from . import cache
+
+logger = logging.getLogger(__name__)
+
+# Границы корзин гистограммы задержек в секундах, как в клиентах Prometheus.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Сколько разных повторяющихся запросов хранить для одного адреса,
+# чтобы число меток в выдаче оставалось ограниченным.
+MAX_REPEATED_QUERIES = 10
+QUERY_LABEL_LENGTH = 200
+
+UNMATCHED = '<unmatched>'
+
+
+class RequestMetrics:
+    """Счётчики SQL-запросов одного HTTP-запроса.
+
+    Подключается через connection.execute_wrapper и хранит
+    число повторов каждого текста запроса для поиска N+1.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def repeated(self):
+        """Запросы, выполненные не меньше порога раз с разными параметрами."""
+
+        threshold = settings.METRICS_REPEATED_QUERY_THRESHOLD
+        return [
+            sql for sql, count in self.statements.items()
+            if count >= threshold
+        ]
+
+
+class RouteMetrics:
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+        self.repeated = 0
+        self.repeated_queries = Counter()
+
+    def observe(self, status, seconds, size, request_metrics, repeated):
+        self.statuses[status] += 1
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.buckets[index] += 1
+        self.count += 1
+        self.seconds += seconds
+        self.queries += request_metrics.queries
+        self.db_seconds += request_metrics.db_seconds
+        self.response_bytes += size
+        if repeated:
+            self.repeated += 1
+        for sql in repeated:
+            sql = ' '.join(sql.split())[:QUERY_LABEL_LENGTH]
+            if (
+                sql in self.repeated_queries
+                or len(self.repeated_queries) < MAX_REPEATED_QUERIES
+            ):
+                self.repeated_queries[sql] += 1
+
+
+class Registry:
+    """Метрики по адресам в пределах одного процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = defaultdict(RouteMetrics)
+
+    def observe(self, route, method, status, seconds, size, request_metrics):
+        repeated = request_metrics.repeated()
+        with self.lock:
+            self.routes[route, method].observe(
+                status, seconds, size, request_metrics, repeated
+            )
+        if repeated:
+            logger.warning(
+                'Повторяющиеся SQL-запросы в %s %s: %s',
+                method, route, '; '.join(sql[:100] for sql in repeated),
+            )
+
+    def reset(self):
+        with self.lock:
+            self.routes.clear()
+
+    def export(self):
+        """Метрики в текстовом формате Prometheus."""
+
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = []
+            for name, kind, text, values in self.families(routes):
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+                for suffix, labels, value in values:
+                    lines.append(f'{name}{suffix}{{{labels}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def families(self, routes):
+        def labels(route, method, **extra):
+            pairs = {'route': route, 'method': method, **extra}
+            return ','.join(
+                f'{key}="{escape(value)}"' for key, value in pairs.items()
+            )
+
+        yield (
+            'yamdb_http_requests_total', 'counter',
+            'Количество запросов по адресу и статусу.',
+            [
+                ('', labels(route, method, status=str(status)), count)
+                for (route, method), metrics in routes
+                for status, count in sorted(metrics.statuses.items())
+            ],
+        )
+
+        def histogram():
+            for (route, method), metrics in routes:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, metrics.buckets):
+                    cumulative += count
+                    yield (
+                        '_bucket', labels(route, method, le=str(bound)),
+                        cumulative,
+                    )
+                yield ('_bucket', labels(route, method, le='+Inf'),
+                       metrics.count)
+                yield ('_sum', labels(route, method), metrics.seconds)
+                yield ('_count', labels(route, method), metrics.count)
+
+        yield (
+            'yamdb_http_request_duration_seconds', 'histogram',
+            'Время обработки запроса.',
+            list(histogram()),
+        )
+        for name, attr, text in (
+            ('yamdb_db_queries_total', 'queries',
+             'Количество SQL-запросов.'),
+            ('yamdb_db_duration_seconds_total', 'db_seconds',
+             'Время выполнения SQL-запросов.'),
+            ('yamdb_http_response_bytes_total', 'response_bytes',
+             'Размер тел ответов.'),
+            ('yamdb_repeated_query_requests_total', 'repeated',
+             'Запросы с повторяющимися SQL-запросами (N+1).'),
+        ):
+            yield (name, 'counter', text, [
+                ('', labels(route, method), getattr(metrics, attr))
+                for (route, method), metrics in routes
+            ])
+        yield (
+            'yamdb_repeated_queries_total', 'counter',
+            'Запросы, в которых повторялся этот SQL-запрос.',
+            [
+                ('', labels(route, method, query=sql), count)
+                for (route, method), metrics in routes
+                for sql, count in metrics.repeated_queries.most_common()
+            ],
+        )
+        stats = cache.stats()
+        yield (
+            'yamdb_api_cache_requests_total', 'counter',
+            'Обращения к кэшу ответов API.',
+            [
+                ('', f'result="{result}"', stats[key])
+                for result, key in (('hit', 'hits'), ('miss', 'misses'))
+            ],
+        )
+        pools = pool_stats()
+        for name, kind, key, text in (
+            ('yamdb_db_pool_size', 'gauge', 'size',
+             'Наибольшее число соединений в пуле.'),
+            ('yamdb_db_pool_open', 'gauge', 'open',
+             'Открытые соединения пула.'),
+            ('yamdb_db_pool_in_use', 'gauge', 'in_use',
+             'Соединения пула, занятые запросами.'),
+            ('yamdb_db_pool_connects_total', 'counter', 'connects',
+             'Новые соединения, открытые пулом.'),
+            ('yamdb_db_pool_waits_total', 'counter', 'waits',
+             'Ожидания свободного соединения.'),
+            ('yamdb_db_pool_wait_seconds_total', 'counter', 'wait_seconds',
+             'Время ожидания свободного соединения.'),
+            ('yamdb_db_pool_timeouts_total', 'counter', 'timeouts',
+             'Ожидания соединения, прерванные по таймауту.'),
+        ):
+            yield (name, kind, text, [
+                ('', f'alias="{escape(alias)}"', stats[key])
+                for alias, stats in pools.items()
+            ])
+
+
+def escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+registry = Registry()
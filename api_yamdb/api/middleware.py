@@ -0,0 +1,87 @@
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+
+from api_yamdb import compression
+
+from .metrics import UNMATCHED, RequestMetrics, registry
+
+
+class MetricsMiddleware:
+    """Собирает метрики запросов по адресам для /api/v1/metrics/.
+
+    Адрес определяется именем маршрута, например api:title-list,
+    поэтому запросы к разным объектам попадают в одну серию.
+    SQL-запросы считаются обёрткой курсора без записи текста
+    в connection.queries, поэтому накладные расходы невелики.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        request_metrics = RequestMetrics()
+        started = time.perf_counter()
+        with connection.execute_wrapper(request_metrics):
+            response = self.get_response(request)
+        seconds = time.perf_counter() - started
+
+        registry.observe(
+            getattr(request, 'metrics_route', UNMATCHED),
+            request.method,
+            response.status_code,
+            seconds,
+            0 if response.streaming else len(response.content),
+            request_metrics,
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_route = request.resolver_match.view_name
+
+
+class CompressionMiddleware:
+    """Сжимает ответы JSON от COMPRESSION_MIN_SIZE байт gzip или Brotli.
+
+    Небольшие ответы не сжимаются: выигрыш в размере меньше
+    затрат на сжатие. ETag сжатого ответа становится слабым,
+    как в GZipMiddleware, и условные запросы продолжают работать.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if (
+            not settings.COMPRESSION_ENABLED
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or content_type not in settings.COMPRESSION_CONTENT_TYPES
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = compression.negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+        content = compression.compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -1,4 +1,19 @@
-from rest_framework import mixins, viewsets
+import hashlib
+from calendar import timegm
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, response, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from . import bulk, cache
+from .permissions import IsAdmin
+from .serializers import sparse_fields
 
 
 class CreateDestroyListViewSet(
@@ -8,3 +23,288 @@ class CreateDestroyListViewSet(
     viewsets.GenericViewSet
 ):
     pass
+
+
+class SparseQuerysetMixin:
+    """Загружает из базы только поля, запрошенные ?fields= и ?exclude=.
+
+    Колонки остальных полей откладываются через only(), а связи
+    неиспользуемых полей не присоединяются и не загружаются.
+    """
+
+    # Поля модели для полей сериализатора, которые называются иначе
+    # или читаются через внешний ключ (author -> author__username).
+    sparse_columns = {}
+    # Связи многие-ко-многим, которые загружаются prefetch_related.
+    sparse_prefetch = {}
+
+    def get_sparse_fields(self):
+        names = self.get_serializer_class().Meta.fields
+        if self.request is None or self.request.method != 'GET':
+            return names
+        return sparse_fields(self.request.query_params, names)
+
+    def sparse_queryset(self, queryset, *columns):
+        """Queryset для запрошенных полей и колонок columns.
+
+        В columns передаются поля, которые нужны всегда, например
+        внешний ключ на родителя у queryset связанного менеджера.
+        """
+
+        columns, related, prefetch = set(columns), set(), []
+        for name in self.get_sparse_fields():
+            if name in self.sparse_prefetch:
+                prefetch.append(self.sparse_prefetch[name])
+                continue
+            for column in self.sparse_columns.get(name, (name,)):
+                columns.add(column)
+                if '__' in column:
+                    related.add(column.split('__', 1)[0])
+        if self.request is not None and self.request.method == 'GET':
+            # Объекты для изменения загружаются целиком.
+            queryset = queryset.only(*columns | related)
+        if related:
+            queryset = queryset.select_related(*related)
+        # Без аргументов prefetch_related ничего не добавляет.
+        return queryset.prefetch_related(*prefetch)
+
+
+class ValuesListMixin:
+    """Список для GET строится из строк .values() читателем values_reader.
+
+    Включается настройкой API_VALUES_LIST. Колонки упорядочения
+    cursor_ordering загружаются всегда: по ним курсорная пагинация
+    строит ссылки на соседние страницы, а несортированный список
+    упорядочивается.
+    """
+
+    values_reader = None
+
+    def list(self, request, *args, **kwargs):
+        if self.values_reader is None or not settings.API_VALUES_LIST:
+            return super().list(request, *args, **kwargs)
+        ordering = getattr(self, 'cursor_ordering', None) or ()
+        reader = self.values_reader(self.get_sparse_fields())
+        queryset = reader.values(
+            self.filter_queryset(self.get_queryset()), *ordering
+        )
+        if not queryset.ordered:
+            # Без сортировки порядок строк .values() зависит от плана
+            # запроса и может отличаться от порядка объектов.
+            queryset = queryset.order_by(*ordering)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reader.represent(page))
+        return response.Response(reader.represent(queryset))
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на условные GET-запросы к list и retrieve.
+
+    Валидаторы ETag и Last-Modified вычисляются до сериализации,
+    поэтому для неизменившихся данных ответ не строится.
+    """
+
+    def get_etag(self, request):
+        return None
+
+    def get_last_modified(self, request):
+        return None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        etag = quote_etag(etag) if etag is not None else None
+        last_modified = self.get_last_modified(request)
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+
+        result = handler(request, *args, **kwargs)
+        if result.status_code == status.HTTP_200_OK:
+            if etag is not None:
+                result['ETag'] = etag
+            if last_modified is not None:
+                result['Last-Modified'] = http_date(last_modified)
+        return result
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class UpdatedAtConditionalMixin(ConditionalGetMixin):
+    """Валидаторы по числу записей и времени последнего изменения.
+
+    Для списка выполняется один агрегирующий запрос по отфильтрованному
+    queryset, для объекта - выборка одного поля updated_at. Если ответ
+    содержит поля родительского объекта, его updated_at из
+    get_parent_modified() тоже учитывается в валидаторах.
+
+    Список отдаётся только с ETag: удаление записи, которая не была
+    изменена последней, не меняет наибольший updated_at, и по одному
+    If-Modified-Since клиент получил бы устаревший список.
+    """
+
+    def get_parent_modified(self):
+        return None
+
+    def get_validators(self):
+        if not hasattr(self, '_validators'):
+            queryset = self.filter_queryset(self.get_queryset())
+            lookup = self.lookup_url_kwarg or self.lookup_field
+            if lookup in self.kwargs:
+                queryset = queryset.filter(
+                    **{self.lookup_field: self.kwargs[lookup]}
+                )
+            validators = queryset.aggregate(
+                count=Count('pk'), last_modified=Max('updated_at')
+            )
+            parent_modified = self.get_parent_modified()
+            if None not in (parent_modified, validators['last_modified']):
+                validators['last_modified'] = max(
+                    validators['last_modified'], parent_modified
+                )
+            self._validators = validators
+        return self._validators
+
+    def get_etag(self, request):
+        validators = self.get_validators()
+        if validators['last_modified'] is None:
+            return None
+        raw = '|'.join((
+            request.get_full_path(),
+            str(validators['count']),
+            validators['last_modified'].isoformat(),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def get_last_modified(self, request):
+        if self.action != 'retrieve':
+            return None
+        return self.get_validators()['last_modified']
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """Кэширует сериализованные ответы list и retrieve.
+
+    Ключ зависит от параметров запроса и версий пространств имён
+    из get_cache_namespaces(), которые сдвигаются при изменении данных.
+    Тот же ключ служит ETag, так что условный запрос
+    не обращается ни к БД, ни к сохранённому ответу.
+    """
+
+    cache_namespaces = ()
+    # Сколько секунд nginx хранит анонимный ответ; None - EDGE_CACHE_TIMEOUT.
+    edge_cache_timeout = None
+
+    def get_cache_namespaces(self):
+        return self.cache_namespaces
+
+    def get_response_key(self, request):
+        if not hasattr(self, '_response_key'):
+            self._response_key = cache.response_key(
+                request, self.get_cache_namespaces()
+            )
+        return self._response_key
+
+    def get_etag(self, request):
+        return self.get_response_key(request).rsplit(':', 1)[-1]
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_key(request)
+        data = cache.get_cache().get(key)
+        if data is not None:
+            cache.record(hit=True)
+            return response.Response(data, headers={'X-Cache': 'HIT'})
+
+        cache.record(hit=False)
+        result = handler(request, *args, **kwargs)
+        if result.status_code == status.HTTP_200_OK:
+            cache.get_cache().set(
+                key, result.data,
+                cache.local_timeout(settings.API_CACHE_TIMEOUT),
+            )
+        result['X-Cache'] = 'MISS'
+        return result
+
+    def patch_edge_cache(self, request, result):
+        """Заголовки для микрокэша nginx.
+
+        Анонимный ответ хранится edge_cache_timeout секунд:
+        X-Accel-Expires задаёт срок nginx, Cache-Control - клиентам.
+        Ответы пользователям с токеном помечаются как private.
+        """
+
+        if result.status_code not in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            return
+        if request.user.is_authenticated:
+            patch_cache_control(result, private=True)
+            return
+        timeout = self.edge_cache_timeout
+        if timeout is None:
+            timeout = settings.EDGE_CACHE_TIMEOUT
+        if timeout > 0:
+            patch_cache_control(result, public=True, max_age=timeout)
+            result['X-Accel-Expires'] = str(timeout)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        result = super().conditional_response(
+            partial(self.cached_response, handler),
+            request,
+            *args,
+            **kwargs,
+        )
+        self.patch_edge_cache(request, result)
+        return result
+
+
+class BulkWriteMixin:
+    """Пакетная запись по адресу bulk/, только для администратора.
+
+    POST создаёт объекты, PATCH изменяет существующие, PUT создаёт
+    или изменяет. Тело запроса - список объектов, ответ - результат
+    для каждого элемента в порядке запроса.
+    """
+
+    bulk_writer = None
+
+    @action(
+        detail=False,
+        methods=('post', 'put', 'patch'),
+        permission_classes=(IsAdmin,),
+    )
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError('Ожидается непустой список объектов.')
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError(
+                f'В пакете не больше {settings.BULK_MAX_ITEMS} объектов.'
+            )
+
+        results = self.bulk_writer(items, bulk.METHOD_MODES[request.method])
+        counts = Counter(item['status'] for item in results)
+        return response.Response(
+            {
+                'created': counts['created'],
+                'updated': counts['updated'],
+                'errors': counts['error'],
+                'results': results,
+            },
+            status=(
+                status.HTTP_400_BAD_REQUEST
+                if counts['error'] == len(results) else status.HTTP_200_OK
+            ),
+        )
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from reviews.models import OutgoingEmail
+
+
+def enqueue(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь вместо отправки в запросе."""
+
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email,
+        recipients=','.join(recipient_list),
+    )
+
+
+def pending():
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=timezone.now(),
+        attempts__lt=settings.MAIL_QUEUE_MAX_ATTEMPTS,
+    ).order_by('send_after', 'id')
+
+
+def retry_delay(attempts):
+    """Задержка перед следующей попыткой растёт вдвое с каждой неудачей."""
+
+    return timedelta(
+        seconds=settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def send_batch(batch_size):
+    """Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Выбранные письма блокируются до конца транзакции, поэтому
+    несколько обработчиков очереди не отправят одно письмо дважды.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+
+    sent = failed = 0
+    with transaction.atomic():
+        queryset = pending()
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        emails = list(queryset[:batch_size])
+        if not emails:
+            return sent, failed
+
+        now = timezone.now()
+        with get_connection() as mail_connection:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    email.recipients.split(','),
+                    connection=mail_connection,
+                )
+                email.attempts += 1
+                try:
+                    message.send()
+                except Exception as error:
+                    email.last_error = f'{type(error).__name__}: {error}'
+                    email.send_after = now + retry_delay(email.attempts)
+                    failed += 1
+                else:
+                    email.sent_at = now
+                    email.last_error = ''
+                    sent += 1
+
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'sent_at', 'send_after', 'last_error')
+        )
+    return sent, failed
@@ -0,0 +1,70 @@
+from django.conf import settings
+from rest_framework import pagination
+
+
+class KeysetPagination(pagination.CursorPagination):
+    """Курсорная пагинация по упорядочению вьюсета.
+
+    Страница выбирается условием по ключу сортировки, без OFFSET
+    и без подсчёта общего числа записей, поэтому любая страница
+    обходится так же дёшево, как первая.
+    """
+
+    page_size_query_param = 'limit'
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+
+class OptionalCursorPagination(pagination.BasePagination):
+    """Limit/offset по умолчанию, курсор - по запросу клиента.
+
+    Курсорный режим включается параметром ?pagination=cursor
+    или переданным курсором из ссылок next/previous. Параметр limit
+    ограничивается атрибутом вьюсета max_page_size или MAX_PAGE_SIZE.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+
+    def __init__(self):
+        self.paginator = pagination.LimitOffsetPagination()
+
+    def use_cursor(self, request, view):
+        if getattr(view, 'cursor_ordering', None) is None:
+            return False
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        max_page_size = getattr(
+            view, 'max_page_size', settings.MAX_PAGE_SIZE
+        )
+        if self.use_cursor(request, view):
+            self.paginator = KeysetPagination()
+            self.paginator.max_page_size = max_page_size
+        else:
+            self.paginator.max_limit = max_page_size
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def get_schema_fields(self, view):
+        return self.paginator.get_schema_fields(view)
+
+    def get_schema_operation_parameters(self, view):
+        return self.paginator.get_schema_operation_parameters(view)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, 'display_page_controls', False)
+
+    def to_html(self):
+        return self.paginator.to_html()
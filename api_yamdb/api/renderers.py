@@ -0,0 +1,45 @@
+"""JSON-рендерер на orjson с откатом на стандартный json.
+
+orjson используется, если он установлен и API_JSON_BACKEND равен
+'orjson'; иначе, а также для ответов с отступами и для значений,
+которые orjson не сериализует, работает обычный JSONRenderer.
+Даты и время форматируются кодировщиком DRF, поэтому ответ
+совпадает с ответом стандартного рендерера.
+"""
+
+from django.conf import settings
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON = 'orjson'
+
+
+def fast_json_enabled():
+    return orjson is not None and settings.API_JSON_BACKEND == ORJSON
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer, который кодирует ответ через orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not fast_json_enabled() or self.get_indent(
+                accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и JSONRenderer, экранирует разделители строк для JavaScript.
+        return content.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
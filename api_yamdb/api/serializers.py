@@ -3,7 +3,54 @@ import re
 
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers, validators
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title, TitleStats, User)
+from reviews.stats import SCORES, score_field
+
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def split_names(query_params, param, names):
+    value = query_params.get(param)
+    if value is None:
+        return None
+    requested = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in names]
+    if unknown:
+        raise serializers.ValidationError({
+            param: f'Неизвестные поля: {", ".join(unknown)}. '
+                   f'Доступны: {", ".join(names)}.'
+        })
+    return requested
+
+
+def sparse_fields(query_params, names):
+    """Поля из names, оставленные параметрами ?fields= и ?exclude=.
+
+    Порядок полей сохраняется; без параметров возвращаются все поля.
+    """
+
+    names = tuple(names)
+    keep = split_names(query_params, FIELDS_PARAM, names)
+    drop = split_names(query_params, EXCLUDE_PARAM, names) or ()
+    return tuple(
+        name for name in names
+        if (keep is None or name in keep) and name not in drop
+    )
+
+
+class SparseFieldsetMixin:
+    """Оставляет в ответе на GET только поля из ?fields= и ?exclude=."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        keep = sparse_fields(request.query_params, self.fields)
+        for name in set(self.fields) - set(keep):
+            self.fields.pop(name)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -74,7 +121,7 @@ class AuthetificationSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор категории."""
 
     class Meta:
@@ -86,7 +133,7 @@ class CategorySerializer(serializers.ModelSerializer):
         }
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор жанров."""
 
     class Meta:
@@ -122,7 +169,41 @@ class TitleWriteSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class CategoryBulkSerializer(serializers.ModelSerializer):
+    """Категория в пакетном запросе.
+
+    Уникальность slug проверяется для всего пакета одним запросом,
+    а не валидатором на каждый элемент.
+    """
+
+    class Meta:
+        fields = ('name', 'slug')
+        model = Category
+        extra_kwargs = {
+            'slug': {'validators': []}
+        }
+
+
+class GenreBulkSerializer(CategoryBulkSerializer):
+    """Жанр в пакетном запросе."""
+
+    class Meta(CategoryBulkSerializer.Meta):
+        model = Genre
+
+
+class TitleBulkSerializer(TitleWriteSerializer):
+    """Произведение в пакетном запросе.
+
+    Жанры и категории передаются slug и находятся для всего пакета
+    одним запросом.
+    """
+
+    id = serializers.IntegerField(required=False)
+    genre = serializers.ListField(child=serializers.SlugField())
+    category = serializers.SlugField()
+
+
+class TitleReadSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор произведений метод GET."""
 
     genre = GenreSerializer(read_only=True, many=True,)
@@ -142,7 +223,36 @@ class TitleReadSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики отзывов произведения."""
+
+    scores = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('title', 'review_count', 'scores', 'latest_review_date',)
+        model = TitleStats
+
+    def get_scores(self, obj):
+        return {
+            str(score): getattr(obj, score_field(score)) for score in SCORES
+        }
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Сериализатор места произведения в рейтинге."""
+
+    name = serializers.CharField(source='title.name', read_only=True)
+    year = serializers.IntegerField(source='title.year', read_only=True)
+
+    class Meta:
+        fields = (
+            'position', 'title', 'name', 'year', 'score', 'rating',
+            'review_count',
+        )
+        model = LeaderboardEntry
+
+
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор модели Review."""
 
     author = serializers.SlugRelatedField(
@@ -170,7 +280,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор модели Comment."""
 
     author = serializers.SlugRelatedField(
@@ -0,0 +1,101 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from reviews import search
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.ratings import rating_changed
+
+from . import cache
+from .authentication import USER_CLAIMS, forget_token_version
+
+# Поля, при изменении которых выданные пользователю токены отзываются.
+TOKEN_FIELDS = USER_CLAIMS + ('is_active',)
+
+
+def invalidate_titles(title_ids):
+    cache.invalidate('titles', *map(cache.title_namespace, title_ids))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    invalidate_titles([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_titles([instance.pk])
+    elif pk_set:
+        invalidate_titles(pk_set)
+    else:
+        cache.invalidate(cache.CATALOG)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, **kwargs):
+    cache.invalidate('categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, **kwargs):
+    cache.invalidate('genres')
+
+
+@receiver(rating_changed)
+def invalidate_rating(sender, title_ids, **kwargs):
+    if title_ids is None:
+        cache.invalidate(cache.CATALOG)
+    else:
+        invalidate_titles(title_ids)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_search(sender, instance, **kwargs):
+    # Текст отзыва попадает в выдачу поиска по произведениям.
+    if search.include_reviews():
+        cache.invalidate('titles')
+
+
+@receiver(pre_save, sender=User)
+def remember_token_fields(sender, instance, raw, **kwargs):
+    instance._previous_token_fields = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_token_fields = (
+        User.objects
+        .filter(pk=instance.pk)
+        .values_list('token_version', *TOKEN_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens_on_change(sender, instance, raw, **kwargs):
+    """Отзывает токены пользователя при смене роли, имени или блокировке."""
+
+    previous = getattr(instance, '_previous_token_fields', None)
+    if raw or previous is None:
+        return
+    version, *fields = previous
+    if fields == [getattr(instance, field) for field in TOKEN_FIELDS]:
+        return
+
+    # Версия увеличивается отдельным запросом, чтобы её не потерял
+    # save(update_fields=...), и от значения в базе, а не в памяти.
+    instance.token_version = version + 1
+    User.objects.filter(pk=instance.pk).update(
+        token_version=instance.token_version
+    )
+    forget_token_version(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_delete(sender, instance, **kwargs):
+    forget_token_version(instance.pk)
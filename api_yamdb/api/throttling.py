@@ -0,0 +1,148 @@
+"""Ограничение частоты запросов к регистрации и получению токена.
+
+Счётчик - скользящее окно на двух фиксированных окнах: число запросов
+в текущем окне плюс число в предыдущем, взвешенное долей предыдущего
+окна, которая ещё попадает в скользящее. На запрос приходится
+три операции с кэшем (add, incr, get) независимо от лимита, а incr
+атомарен в LocMemCache и в общих бэкендах вроде memcached и Redis.
+Проверка выполняется до тела view, то есть до обращений к базе.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+from .cache import KEY_PREFIX
+
+
+def get_cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Не больше rate запросов за окно для каждого идентификатора.
+
+    Частота задаётся в DEFAULT_THROTTLE_RATES по scope, как
+    у ScopedRateThrottle. Запросы сверх лимита тоже считаются,
+    поэтому непрерывный поток остаётся заблокированным.
+    """
+
+    scope = None
+    parse_rate = SimpleRateThrottle.parse_rate
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_rate(self):
+        return settings.REST_FRAMEWORK.get(
+            'DEFAULT_THROTTLE_RATES', {}
+        ).get(self.scope)
+
+    def get_idents(self, request):
+        """Идентификаторы, у каждого из которых свой счётчик.
+
+        Без идентификаторов запрос не ограничивается.
+        """
+
+        return []
+
+    def counter_key(self, ident, window):
+        digest = hashlib.md5(ident.encode()).hexdigest()
+        return f'{KEY_PREFIX}:throttle:{self.scope}:{digest}:{window}'
+
+    def hit(self, ident, limit, duration, now):
+        """Считает запрос и возвращает оценку числа запросов в окне."""
+
+        cache = get_cache()
+        window = int(now // duration)
+        key = self.counter_key(ident, window)
+        # Счётчик нужен ещё одно окно как предыдущий.
+        cache.add(key, 0, duration * 2)
+        try:
+            current = cache.incr(key)
+        except ValueError:
+            # Ключ вытеснен между add и incr.
+            cache.set(key, 1, duration * 2)
+            current = 1
+        previous = cache.get(self.counter_key(ident, window - 1), 0)
+
+        elapsed = now - window * duration
+        estimate = previous * (duration - elapsed) / duration + current
+        if estimate > limit:
+            self.wait_seconds = max(
+                self.wait_seconds or 0,
+                self.retry_after(limit, duration, elapsed, current, previous),
+            )
+        return estimate
+
+    @staticmethod
+    def retry_after(limit, duration, elapsed, current, previous):
+        if current >= limit:
+            # Ждать конца окна и, пока вес текущего счётчика
+            # как предыдущего не опустится ниже лимита.
+            return duration - elapsed + duration * (1 - limit / current)
+        return max(
+            duration - elapsed - (limit - current) * duration / previous, 0
+        )
+
+    def allow_request(self, request, view):
+        rate = self.get_rate()
+        if rate is None:
+            return True
+        limit, duration = self.parse_rate(rate)
+        now = time.time()
+        allowed = True
+        for ident in self.get_idents(request):
+            if self.hit(ident, limit, duration, now) > limit:
+                allowed = False
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """Счётчик по адресу клиента с учётом NUM_PROXIES."""
+
+    def get_idents(self, request):
+        # Без адреса клиента, например в ASGI без client, счётчика нет.
+        ident = self.get_ident(request)
+        return [ident] if ident else []
+
+
+class IdentityThrottle(SlidingWindowThrottle):
+    """Счётчики по значениям полей fields из тела запроса."""
+
+    fields = ()
+
+    def get_idents(self, request):
+        data = request.data
+        if not hasattr(data, 'get'):
+            return []
+        idents = []
+        for field in self.fields:
+            value = data.get(field)
+            if isinstance(value, str) and value.strip():
+                idents.append(f'{field}:{value.strip().lower()}')
+        return idents
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupThrottle(IdentityThrottle):
+    scope = 'signup'
+    fields = ('username', 'email')
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenThrottle(IdentityThrottle):
+    scope = 'token'
+    fields = ('username',)
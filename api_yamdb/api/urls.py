@@ -1,5 +1,6 @@
 from django.urls import include, path
 from rest_framework import routers
+from reviews.models import Leaderboard
 
 from . import views
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
@@ -28,4 +29,25 @@ urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/token/', views.get_token, name='token'),
     path('v1/auth/signup/', views.send_confirmation_code, name='confirm'),
+    path('v1/metrics/', views.metrics, name='metrics'),
+    path(
+        'v1/export/<slug:dataset>.<slug:file_format>', views.export_data,
+        name='export',
+    ),
+    path(
+        'v1/leaderboards/titles/', views.leaderboard,
+        {'kind': Leaderboard.GLOBAL}, name='leaderboard',
+    ),
+    path(
+        'v1/leaderboards/trending/', views.leaderboard,
+        {'kind': Leaderboard.TRENDING}, name='leaderboard-trending',
+    ),
+    path(
+        'v1/leaderboards/genres/<slug:slug>/', views.leaderboard,
+        {'kind': Leaderboard.GENRE}, name='leaderboard-genre',
+    ),
+    path(
+        'v1/leaderboards/categories/<slug:slug>/', views.leaderboard,
+        {'kind': Leaderboard.CATEGORY}, name='leaderboard-category',
+    ),
 ]
@@ -1,32 +1,48 @@
 import uuid
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db.models import Subquery
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, response, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view,
+                                       authentication_classes,
+                                       permission_classes, throttle_classes)
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import (Category, Genre, Leaderboard, LeaderboardEntry,
+                            Review, Title, TitleStats, User)
 
 from api_yamdb.settings import EMAIL_FROM_DEFAULT
 
-from .filter import TitleFilter
-from .mixins import CreateDestroyListViewSet
+from . import bulk, export, outbox
+from .authentication import access_token_for_user
+from .cache import title_namespace
+from .filter import TitleFilter, TitleSearchFilter
+from .metrics import registry
+from .mixins import (BulkWriteMixin, CachedResponseMixin,
+                     CreateDestroyListViewSet, SparseQuerysetMixin,
+                     UpdatedAtConditionalMixin, ValuesListMixin)
 from .permissions import (IsAdmin, IsAdminOrReadOnly,
                           IsAuthorAdminModeratorOrReadOnly)
 from .serializers import (AuthetificationSerializer, CategorySerializer,
                           CommentSerializer, GenreSerializer,
-                          RegistrationSerializer, ReviewSerializer,
-                          TitleReadSerializer, TitleWriteSerializer,
+                          LeaderboardEntrySerializer, RegistrationSerializer,
+                          ReviewSerializer, TitleReadSerializer,
+                          TitleStatsSerializer, TitleWriteSerializer,
                           UserSerializer)
+from .throttling import (SignupIPThrottle, SignupThrottle, TokenIPThrottle,
+                         TokenThrottle)
+from .values import CommentValuesReader, ReviewValuesReader, TitleValuesReader
 
 
 @api_view(['POST'])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([SignupIPThrottle, SignupThrottle])
 def send_confirmation_code(request):
     """View-функция url auth/signup/."""
 
@@ -63,12 +79,11 @@ def send_confirmation_code(request):
         )
         data = serializer.data
 
-    send_mail(
+    outbox.enqueue(
         username,
         confirmation_code,
         EMAIL_FROM_DEFAULT,
         (email,),
-        fail_silently=False,
     )
 
     return response.Response(
@@ -78,7 +93,9 @@ def send_confirmation_code(request):
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([TokenIPThrottle, TokenThrottle])
 def get_token(request):
     """View-функция url auth/token/."""
 
@@ -102,11 +119,103 @@ def get_token(request):
         )
 
     return response.Response(
-        {'token': str(RefreshToken.for_user(user).access_token)},
+        {'token': str(access_token_for_user(user))},
         status=status.HTTP_200_OK,
     )
 
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    """View-функция url metrics/: метрики в формате Prometheus."""
+
+    return HttpResponse(
+        registry.export(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_data(request, dataset, file_format):
+    """View-функция url export/: потоковая выгрузка NDJSON или CSV."""
+
+    if dataset not in export.DATASETS or file_format not in (
+            export.NDJSON, export.CSV):
+        raise NotFound()
+    name = export.DATASETS[dataset]
+    response = StreamingHttpResponse(
+        export.stream(name, file_format),
+        content_type=export.content_type(name, file_format),
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{dataset}.{file_format}"'
+    )
+    return response
+
+
+DEFAULT_LEADERBOARD_LIMIT = 10
+# Рейтинги, область которых задаётся slug жанра или категории.
+LEADERBOARD_SCOPES = {
+    Leaderboard.GENRE: Genre,
+    Leaderboard.CATEGORY: Category,
+}
+
+
+def query_choice(request, name, default, choices):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        value = None
+    if value not in choices:
+        raise ValidationError({name: f'Допустимые значения: {choices}'})
+    return value
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def leaderboard(request, kind, slug=None):
+    """View-функция url leaderboards/: лучшие произведения рейтинга.
+
+    Места читаются из материализованного рейтинга одним запросом
+    по индексу (рейтинг, место), поэтому время ответа не зависит
+    от размера каталога.
+    """
+
+    limit = query_choice(
+        request, 'limit', DEFAULT_LEADERBOARD_LIMIT,
+        range(1, settings.LEADERBOARD_SIZE + 1),
+    )
+    model = LEADERBOARD_SCOPES.get(kind)
+    if model is not None:
+        scope = Subquery(model.objects.filter(slug=slug).values('pk'))
+    elif kind == Leaderboard.TRENDING:
+        days = settings.LEADERBOARD_TRENDING_DAYS
+        scope = query_choice(request, 'days', days[0], days)
+    else:
+        scope = 0
+
+    entries = list(
+        LeaderboardEntry.objects
+        .filter(
+            leaderboard__kind=kind,
+            leaderboard__scope=scope,
+            position__lte=limit,
+        )
+        .select_related('leaderboard', 'title')
+    )
+    if not entries and model is not None:
+        get_object_or_404(model, slug=slug)
+    return response.Response({
+        'refreshed_at': entries[0].leaderboard.refreshed_at if entries
+        else None,
+        'results': LeaderboardEntrySerializer(entries, many=True).data,
+    })
+
+
 class UsersViewSet(viewsets.ModelViewSet):
     """Класс вьюсета модели User."""
 
@@ -148,9 +257,13 @@ class UsersViewSet(viewsets.ModelViewSet):
         )
 
 
-class CategoryViewSet(CreateDestroyListViewSet):
+class CategoryViewSet(BulkWriteMixin, CachedResponseMixin,
+                      CreateDestroyListViewSet):
     """Класс вьюсета модели Category."""
 
+    bulk_writer = staticmethod(bulk.write_categories)
+    cache_namespaces = ('categories',)
+    max_page_size = settings.CATALOG_MAX_PAGE_SIZE
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
@@ -159,9 +272,13 @@ class CategoryViewSet(CreateDestroyListViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdminOrReadOnly,)
 
 
-class GenreViewSet(CreateDestroyListViewSet):
+class GenreViewSet(BulkWriteMixin, CachedResponseMixin,
+                   CreateDestroyListViewSet):
     """Класс вьюсета модели Genre."""
 
+    bulk_writer = staticmethod(bulk.write_genres)
+    cache_namespaces = ('genres',)
+    max_page_size = settings.CATALOG_MAX_PAGE_SIZE
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter,)
@@ -170,59 +287,118 @@ class GenreViewSet(CreateDestroyListViewSet):
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(BulkWriteMixin, CachedResponseMixin, SparseQuerysetMixin,
+                   ValuesListMixin, viewsets.ModelViewSet):
     """Класс вьюсета модели Title."""
 
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
-    filter_backends = (DjangoFilterBackend,)
+    bulk_writer = staticmethod(bulk.write_titles)
+    # Порядок страниц не должен зависеть от плана запроса.
+    queryset = Title.objects.order_by('id')
+    cursor_ordering = ('id',)
+    max_page_size = settings.TITLES_MAX_PAGE_SIZE
+    sparse_columns = {'category': ('category__name', 'category__slug')}
+    sparse_prefetch = {'genre': 'genre'}
+    values_reader = TitleValuesReader
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilter
     permission_classes = (IsAuthenticatedOrReadOnly, IsAdminOrReadOnly,)
 
+    def get_cache_namespaces(self):
+        # Произведение содержит вложенные категорию и жанры.
+        if self.lookup_field in self.kwargs:
+            title = title_namespace(self.kwargs[self.lookup_field])
+        else:
+            title = 'titles'
+        return (title, 'categories', 'genres')
+
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleReadSerializer
         return TitleWriteSerializer
 
-
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is not TitleReadSerializer:
+            return queryset
+        # Вложенные жанры и категория загружаются фиксированным
+        # числом запросов на страницу и только если запрошены.
+        return self.sparse_queryset(queryset)
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        """Распределение оценок, число отзывов и дата последнего."""
+
+        stats = TitleStats.objects.filter(title_id=pk).first()
+        if stats is None:
+            # Статистика ещё не собрана: у произведения нет отзывов.
+            stats = TitleStats(title=get_object_or_404(Title, pk=pk))
+        return response.Response(TitleStatsSerializer(stats).data)
+
+
+class ReviewViewSet(UpdatedAtConditionalMixin, SparseQuerysetMixin,
+                    ValuesListMixin, viewsets.ModelViewSet):
     """Класс вьюсета модели Review с определением queryset`а."""
 
     serializer_class = ReviewSerializer
+    cursor_ordering = ('pub_date', 'id')
+    max_page_size = settings.REVIEWS_MAX_PAGE_SIZE
+    sparse_columns = {
+        'author': ('author__username',),
+        'title': ('title__name',),
+    }
+    values_reader = ReviewValuesReader
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorAdminModeratorOrReadOnly
     )
 
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, pk=self.kwargs.get('title_id')
+            )
+        return self._title
+
+    def get_parent_modified(self):
+        return self.get_title().updated_at
+
     def get_queryset(self):
-        title = get_object_or_404(
-            Title, pk=self.kwargs.get('title_id')
+        return self.sparse_queryset(
+            self.get_title().reviews.all(), 'title'
         )
-        return title.reviews.all()
 
     def perform_create(self, serializer):
-        title = get_object_or_404(
-            Title, pk=self.kwargs.get('title_id')
-        )
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(UpdatedAtConditionalMixin, SparseQuerysetMixin,
+                     ValuesListMixin, viewsets.ModelViewSet):
     """Класс вьюсета модели Comment с определением queryset`а."""
 
     serializer_class = CommentSerializer
+    cursor_ordering = ('pub_date', 'id')
+    max_page_size = settings.REVIEWS_MAX_PAGE_SIZE
+    sparse_columns = {'author': ('author__username',)}
+    values_reader = CommentValuesReader
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAuthorAdminModeratorOrReadOnly
     )
 
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, pk=self.kwargs.get('review_id')
+            )
+        return self._review
+
+    def get_parent_modified(self):
+        return self.get_review().updated_at
+
     def get_queryset(self):
-        review = get_object_or_404(
-            Review, pk=self.kwargs.get('review_id')
+        return self.sparse_queryset(
+            self.get_review().comments.all(), 'review'
         )
-        return review.comments.all()
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review, pk=self.kwargs.get('review_id')
-        )
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
@@ -1,7 +1,222 @@
+"""ASGI-приложение для запуска под uvicorn.
+
+В Django 2.2 нет ни ASGI-обработчика, ни асинхронных представлений,
+поэтому запросы обрабатываются WSGI-приложением в пуле потоков,
+а приём тела запроса и отправка ответа выполняются в цикле событий.
+Поток занят только на время работы Django, и медленные клиенты
+не держат его, пока читают ответ. Частые запросы на чтение
+выполняются в отдельном пуле, чтобы их не вытесняли остальные.
+
+asgiref.wsgi.WsgiToAsgi из asgiref 3.2.10 для этого не подходит:
+все запросы идут в общий пул цикла событий, поток остаётся занят,
+пока каждая часть ответа отправляется клиенту, а у ответа не
+вызывается close(), поэтому не срабатывает request_finished
+и соединение с базой не закрывается и не возвращается в пул.
+
+    gunicorn api_yamdb.asgi:application -k uvicorn.workers.UvicornH11Worker
+
+Размеры пулов (ASGI_READ_THREADS, ASGI_THREADS) подбирает
+gunicorn.conf.py по числу доступных соединений с базой.
+"""
+
+import asyncio
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 
-from django.core.asgi import get_asgi_application
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.urls import Resolver404, resolve
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
-application = get_asgi_application()
+wsgi_application = get_wsgi_application()
+
+# Маршруты, запросы GET к которым выполняются в пуле чтения.
+HOT_READ_VIEWS = frozenset((
+    'api:title-list',
+    'api:title-detail',
+    'api:reviews-list',
+    'api:comments-list',
+))
+BODY_MEMORY_SIZE = 65536
+
+
+def get_path_info(scope):
+    """Путь запроса без префикса, под которым смонтировано приложение."""
+
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        return path[len(root_path):] or '/'
+    return path
+
+
+def build_environ(scope, body):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': get_path_info(scope),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_PROTOCOL': f'HTTP/{scope["http_version"]}',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': BytesIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('server'):
+        environ['SERVER_NAME'] = scope['server'][0]
+        environ['SERVER_PORT'] = str(scope['server'][1])
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin1').upper().replace('-', '_')
+        if name not in ('CONTENT_LENGTH', 'CONTENT_TYPE'):
+            name = f'HTTP_{name}'
+        value = value.decode('latin1')
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+def is_hot_read(scope):
+    if scope['method'] not in ('GET', 'HEAD'):
+        return False
+    try:
+        return resolve(get_path_info(scope)).view_name in HOT_READ_VIEWS
+    except Resolver404:
+        return False
+
+
+class Response:
+    """Ответ WSGI-приложения, собранный в потоке обработчика."""
+
+    def __init__(self):
+        self.status = None
+        self.headers = None
+        self.body = None
+
+    def start_response(self, status, headers, exc_info=None):
+        self.status = int(status.split(' ', 1)[0])
+        self.headers = [
+            (name.lower().encode('latin1'), value.encode('latin1'))
+            for name, value in headers
+        ]
+
+    def start_message(self):
+        return {
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': self.headers,
+        }
+
+
+class ASGIHandler:
+
+    def __init__(self, application):
+        self.application = application
+        self.read_executor = None
+        self.executor = None
+
+    def start(self):
+        self.read_executor = ThreadPoolExecutor(
+            settings.ASGI_READ_THREADS, thread_name_prefix='asgi-read'
+        )
+        self.executor = ThreadPoolExecutor(
+            settings.ASGI_THREADS, thread_name_prefix='asgi'
+        )
+
+    def stop(self):
+        for executor in (self.read_executor, self.executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f'Неподдерживаемый тип ASGI: {scope["type"]}')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.stop()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        if self.executor is None:
+            # Сервер без поддержки lifespan.
+            self.start()
+
+        loop = asyncio.get_running_loop()
+        with tempfile.SpooledTemporaryFile(BODY_MEMORY_SIZE) as body:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+
+            executor = (
+                self.read_executor if is_hot_read(scope) else self.executor
+            )
+            response = Response()
+            streaming = await loop.run_in_executor(
+                executor, self.run, scope, body, response, loop, send
+            )
+
+        if not streaming:
+            await send(response.start_message())
+            await send({'type': 'http.response.body', 'body': response.body})
+
+    def run(self, scope, body, response, loop, send):
+        """Выполняет запрос в потоке пула.
+
+        Обычный ответ целиком собирается в памяти и отправляется
+        из цикла событий. Потоковый ответ отправляется по частям
+        из этого же потока: закрывать ответ, а с ним и соединение
+        с базой, нужно в потоке, где он был создан.
+        """
+
+        result = self.application(build_environ(scope, body),
+                                  response.start_response)
+        try:
+            if not getattr(result, 'streaming', False):
+                response.body = b''.join(result)
+                return False
+
+            def send_sync(message):
+                asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+            send_sync(response.start_message())
+            for chunk in result:
+                send_sync({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+            send_sync({'type': 'http.response.body', 'body': b''})
+            return True
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+
+application = ASGIHandler(wsgi_application)
@@ -0,0 +1,66 @@
+"""Сжатие gzip и Brotli для ответов API и статических файлов.
+
+Brotli используется, если установлен пакет brotli; иначе доступен
+только gzip. Сжатые данные не зависят от времени сжатия, поэтому
+повторный collectstatic даёт те же файлы.
+"""
+
+import gzip
+import io
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP = 'gzip'
+BROTLI = 'br'
+# Расширения предварительно сжатых файлов для gzip_static и brotli_static.
+EXTENSIONS = {GZIP: '.gz', BROTLI: '.br'}
+# Уровни сжатия: ответы сжимаются на каждый запрос, статика - один раз.
+FAST = {GZIP: 6, BROTLI: 5}
+BEST = {GZIP: 9, BROTLI: 11}
+
+
+def encodings():
+    """Доступные кодировки в порядке предпочтения."""
+
+    return (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+
+def accepted(accept_encoding):
+    """Кодировки из Accept-Encoding, которые клиент не запретил q=0."""
+
+    result = set()
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        result.add(name.strip().lower())
+    return result
+
+
+def negotiate(accept_encoding):
+    """Лучшая доступная кодировка для Accept-Encoding или None."""
+
+    names = accepted(accept_encoding)
+    for encoding in encodings():
+        if encoding in names or '*' in names:
+            return encoding
+    return None
+
+
+def compress(content, encoding, levels=FAST):
+    if encoding == BROTLI:
+        return brotli.compress(content, quality=levels[BROTLI])
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+            mode='wb', compresslevel=levels[GZIP], fileobj=buffer,
+            mtime=0) as file:
+        file.write(content)
+    return buffer.getvalue()
@@ -0,0 +1,37 @@
+import time
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+@receiver(request_finished)
+def remember_last_use(**kwargs):
+    for connection in connections.all():
+        if connection.connection is not None:
+            connection.idle_since = time.monotonic()
+
+
+@receiver(request_started)
+def check_connections(**kwargs):
+    """Закрывает сохранённые соединения, которые перестали работать.
+
+    Постоянное соединение (CONN_MAX_AGE) может быть разорвано сервером
+    или сетью между запросами. Проверяются только соединения,
+    простоявшие без запросов не меньше PING_AFTER_IDLE секунд, поэтому
+    при частых запросах проверка не добавляет обращений к базе.
+    Соединения с ошибками Django закрывает сам по окончании запроса.
+    """
+
+    now = time.monotonic()
+    for connection in connections.all():
+        ping_after = connection.settings_dict.get('PING_AFTER_IDLE')
+        idle_since = getattr(connection, 'idle_since', None)
+        if (
+            connection.connection is not None
+            and ping_after
+            and idle_since is not None
+            and now - idle_since >= ping_after
+            and not connection.is_usable()
+        ):
+            connection.close()
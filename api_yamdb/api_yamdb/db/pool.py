@@ -0,0 +1,221 @@
+"""Пул соединений с базой для многопоточных развёртываний.
+
+Без пула каждый поток gunicorn (gthread) или ASGI-пула держит своё
+постоянное соединение, и при большом числе потоков их становится
+больше, чем допускает сервер базы. В режиме пула поток берёт
+соединение на время запроса и возвращает его при закрытии, а число
+открытых соединений в процессе не превышает POOL_SIZE. Поток, которому
+не хватило соединения, ждёт не дольше POOL_TIMEOUT секунд.
+
+Пул включается переменной окружения DB_POOL_SIZE, см. settings.py.
+"""
+
+import os
+import threading
+import time
+
+WAIT_TIMEOUT_MESSAGE = (
+    'Нет свободного соединения с базой в пуле за {timeout} с '
+    '(размер пула {size}).'
+)
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Ограниченный набор соединений одного процесса.
+
+    Свободные соединения выдаются в обратном порядке (LIFO), чтобы
+    при небольшой нагрузке работали одни и те же соединения, а лишние
+    закрывались сервером по простою и отсеивались проверкой.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.condition = threading.Condition()
+        self.idle = []
+        self.open = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+
+    @property
+    def in_use(self):
+        return self.open - len(self.idle)
+
+    def acquire(self, connect, check=None, check_after=0):
+        """Возвращает свободное соединение или открывает новое.
+
+        connect открывает соединение, check проверяет, что свободное
+        соединение ещё работает; неработающее закрывается. Проверяются
+        только соединения, простоявшие в пуле не меньше check_after
+        секунд.
+        """
+
+        while True:
+            item = self.take()
+            if item is None:
+                break
+            raw, released_at = item
+            if (
+                check is None
+                or time.monotonic() - released_at < check_after
+                or check(raw)
+            ):
+                return raw
+            self.discard(raw)
+        try:
+            raw = connect()
+        except Exception:
+            with self.condition:
+                self.open -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.connects += 1
+        return raw
+
+    def take(self):
+        """Свободное соединение и время возврата в пул или None.
+
+        None означает, что можно открыть новое соединение.
+        """
+
+        with self.condition:
+            started = None
+            while not self.idle and self.open >= self.size:
+                if started is None:
+                    started = time.monotonic()
+                    self.waits += 1
+                remaining = started + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self.wait_seconds += time.monotonic() - started
+                    self.timeouts += 1
+                    raise PoolTimeoutError(WAIT_TIMEOUT_MESSAGE.format(
+                        timeout=self.timeout, size=self.size
+                    ))
+                self.condition.wait(remaining)
+            if started is not None:
+                self.wait_seconds += time.monotonic() - started
+            if self.idle:
+                return self.idle.pop()
+            self.open += 1
+            return None
+
+    def release(self, raw):
+        with self.condition:
+            self.idle.append((raw, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, raw):
+        with self.condition:
+            self.open -= 1
+            self.condition.notify()
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self.condition:
+            return {
+                'size': self.size,
+                'open': self.open,
+                'in_use': self.in_use,
+                'waits': self.waits,
+                'wait_seconds': self.wait_seconds,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+            }
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(alias, size, timeout):
+    """Пул для псевдонима базы в текущем процессе.
+
+    Соединения, открытые до fork, в дочернем процессе не используются:
+    у него появляется свой пустой пул.
+    """
+
+    with pools_lock:
+        pool = pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            pools[alias] = ConnectionPool(size, timeout)
+        return pools[alias]
+
+
+def pool_stats():
+    """Счётчики пулов текущего процесса по псевдонимам баз."""
+
+    with pools_lock:
+        items = sorted(pools.items())
+    return {
+        alias: pool.stats() for alias, pool in items
+        if pool.pid == os.getpid()
+    }
+
+
+def ping(raw):
+    cursor = raw.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+class PooledDatabaseWrapperMixin:
+    """Берёт соединения из пула и возвращает их туда при закрытии.
+
+    Соединение возвращается в пул только без открытой транзакции
+    и без ошибок; иначе оно закрывается.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(
+            self.alias,
+            self.settings_dict['POOL_SIZE'],
+            self.settings_dict['POOL_TIMEOUT'],
+        )
+
+    def get_new_connection(self, conn_params):
+        ping_after = self.settings_dict.get('PING_AFTER_IDLE')
+        try:
+            return self.pool.acquire(
+                lambda: super(PooledDatabaseWrapperMixin, self)
+                .get_new_connection(conn_params),
+                self.check_pooled if ping_after else None,
+                ping_after,
+            )
+        except PoolTimeoutError as error:
+            raise self.Database.OperationalError(str(error)) from error
+
+    def check_pooled(self, raw):
+        try:
+            ping(raw)
+        except self.Database.Error:
+            return False
+        return True
+
+    def _close(self):
+        if self.connection is None:
+            return
+        raw = self.connection
+        with self.wrap_database_errors:
+            if self.in_atomic_block or self.errors_occurred:
+                self.pool.discard(raw)
+                return
+            try:
+                raw.rollback()
+            except self.Database.Error:
+                self.pool.discard(raw)
+                raise
+            self.pool.release(raw)
@@ -30,7 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'api_yamdb.staticfiles.StaticFilesAppConfig',
     'rest_framework',
     'rest_framework_simplejwt',
     'api.apps.ApiConfig',
@@ -39,6 +39,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,17 +81,87 @@ if DEBUG:
         }
     }
 else:
+    DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.postgresql')
+    # Размер пула соединений процесса; 0 - без пула, у каждого потока
+    # своё постоянное соединение.
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+    if DB_POOL_SIZE:
+        DB_ENGINE = DB_ENGINE.replace(
+            'django.db.backends.', 'api_yamdb.db.'
+        )
     DATABASES = {
         'default': {
-            'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.postgresql'),
+            'ENGINE': DB_ENGINE,
             'NAME': os.getenv('DB_NAME', 'postgresql'),
             'USER': os.getenv('POSTGRES_USER', 'postgres'),
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
             'HOST': os.getenv('DB_HOST', 'db'),
-            'PORT': os.getenv('DB_PORT', '5432')
+            'PORT': os.getenv('DB_PORT', '5432'),
+            # Сколько секунд соединение живёт между запросами; в режиме
+            # пула оно возвращается в пул после каждого запроса.
+            'CONN_MAX_AGE': (
+                0 if DB_POOL_SIZE
+                else int(os.getenv('DB_CONN_MAX_AGE', 60))
+            ),
+            # Через сколько секунд простоя сохранённое соединение
+            # проверяется перед повторным использованием; 0 - никогда.
+            'PING_AFTER_IDLE': float(
+                os.getenv('DB_CONN_PING_AFTER_IDLE', 30)
+            ),
+            'POOL_SIZE': DB_POOL_SIZE,
+            # Сколько секунд ждать свободного соединения из пула.
+            'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
         }
     }
 
+# Cache
+# LocMemCache виден только своему процессу; для нескольких воркеров
+# gunicorn нужен общий бэкенд, например memcached (см. docker-compose).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'yamdb'),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+# Срок хранения ответов и версий данных в кэше одного процесса.
+API_LOCAL_CACHE_TIMEOUT = int(os.getenv('API_LOCAL_CACHE_TIMEOUT', 5))
+# Сколько секунд nginx хранит анонимные ответы каталога; 0 - не хранит.
+EDGE_CACHE_TIMEOUT = int(os.getenv('EDGE_CACHE_TIMEOUT', 5))
+
+# Наибольшее число элементов в одном пакетном запросе на запись.
+BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 1000))
+# Строк в одной выборке серверного курсора при выгрузке данных.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+
+# ASGI: размеры пулов потоков для частых запросов на чтение и остальных.
+ASGI_READ_THREADS = int(os.getenv('ASGI_READ_THREADS') or 16)
+ASGI_THREADS = int(os.getenv('ASGI_THREADS') or 4)
+
+# Request metrics
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+# Сколько раз один SQL-запрос должен выполниться за HTTP-запрос,
+# чтобы считаться признаком N+1.
+METRICS_REPEATED_QUERY_THRESHOLD = int(
+    os.getenv('METRICS_REPEATED_QUERY_THRESHOLD', 5)
+)
+
+# Full-text search
+# После смены TITLE_SEARCH_CONFIG индекс пересобирается командой
+# rebuild_search_index.
+
+TITLE_SEARCH_CONFIG = os.getenv('TITLE_SEARCH_CONFIG', 'russian')
+TITLE_SEARCH_INCLUDE_REVIEWS = (
+    os.getenv('TITLE_SEARCH_INCLUDE_REVIEWS', 'False') == 'True'
+)
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -109,13 +181,61 @@ AUTH_PASSWORD_VALIDATORS = [
 
 # Rest Framework
 
+# Без обращения к таблице пользователей на каждый запрос: роль
+# берётся из токена, а отзыв проверяется по версии токенов.
+JWT_STATELESS = os.getenv('JWT_STATELESS', 'True') == 'True'
+# Сколько секунд версия токенов хранится в памяти процесса и в общем кэше.
+TOKEN_VERSION_LOCAL_TIMEOUT = int(os.getenv('TOKEN_VERSION_LOCAL_TIMEOUT', 5))
+TOKEN_VERSION_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_VERSION_CACHE_TIMEOUT', 300)
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication'
+        if JWT_STATELESS
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
-    'PAGE_SIZE': 5,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OptionalCursorPagination',
+    'PAGE_SIZE': int(os.getenv('PAGE_SIZE', 5)),
+    # Частота запросов к регистрации и получению токена: по адресу
+    # клиента и по username/email из запроса.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', '20/hour'),
+        'signup': os.getenv('THROTTLE_SIGNUP', '5/hour'),
+        'token_ip': os.getenv('THROTTLE_TOKEN_IP', '60/min'),
+        'token': os.getenv('THROTTLE_TOKEN', '10/min'),
+    },
+    # Число прокси перед приложением, адрес клиента берётся
+    # из X-Forwarded-For; 0 - из REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
+# Кэш счётчиков ограничения частоты; для нескольких процессов
+# нужен общий бэкенд, например memcached.
+THROTTLE_CACHE_ALIAS = 'default'
+# orjson - быстрый JSON, если пакет установлен; json - только стандартный.
+API_JSON_BACKEND = os.getenv('API_JSON_BACKEND', 'orjson')
+# Списки произведений, отзывов и комментариев строятся из .values().
+API_VALUES_LIST = os.getenv('API_VALUES_LIST', 'True') == 'True'
+# Ответы JSON сжимаются gzip или Brotli, начиная с этого размера.
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True') == 'True'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+# Наибольшее значение ?limit= по умолчанию и для отдельных адресов.
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 100))
+TITLES_MAX_PAGE_SIZE = int(os.getenv('TITLES_MAX_PAGE_SIZE', 100))
+REVIEWS_MAX_PAGE_SIZE = int(os.getenv('REVIEWS_MAX_PAGE_SIZE', 200))
+# Категорий и жанров немного, их можно получить одной страницей.
+CATALOG_MAX_PAGE_SIZE = int(os.getenv('CATALOG_MAX_PAGE_SIZE', 1000))
 
 # Internationalization
 
@@ -133,11 +253,15 @@ USE_TZ = False
 # Static files (CSS, JavaScript, Images)
 
 STATIC_URL = '/static/'
-STATIC_DIR = 'poject_static'
-STATIC_DIRS = [
-    STATIC_DIR,
-    '/app/' + STATIC_DIR,
-]
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'static'))
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'project_static')]
+# Имена с хешем содержимого и копии .gz/.br для nginx.
+STATICFILES_STORAGE = (
+    'api_yamdb.staticfiles.CompressedManifestStaticFilesStorage'
+)
+STATIC_COMPRESS_EXTENSIONS = (
+    '.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.yaml',
+)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -157,6 +281,30 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 EMAIL_FROM_DEFAULT = 'yandex_praktikum@yandex.ru'
 
+# Письма отправляются командой send_queued_mail.
+MAIL_QUEUE_BATCH_SIZE = int(os.getenv('MAIL_QUEUE_BATCH_SIZE', 100))
+MAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('MAIL_QUEUE_MAX_ATTEMPTS', 5))
+# Задержка перед повторной отправкой в секундах, удваивается с каждой попыткой.
+MAIL_QUEUE_RETRY_DELAY = int(os.getenv('MAIL_QUEUE_RETRY_DELAY', 60))
+
+# Leaderboards
+
+# Рейтинги пересчитываются командой refresh_leaderboards.
+LEADERBOARD_SIZE = int(os.getenv('LEADERBOARD_SIZE', 100))
+# Произведения с меньшим числом отзывов в рейтинги не попадают.
+LEADERBOARD_MIN_REVIEWS = int(os.getenv('LEADERBOARD_MIN_REVIEWS', 3))
+# Вес средней оценки по всем произведениям в байесовском рейтинге,
+# в отзывах: чем меньше отзывов у произведения, тем ближе его рейтинг
+# к средней.
+LEADERBOARD_PRIOR_REVIEWS = int(os.getenv('LEADERBOARD_PRIOR_REVIEWS', 10))
+# Периоды в днях, за которые считается рейтинг популярного.
+LEADERBOARD_TRENDING_DAYS = tuple(
+    int(days) for days in os.getenv('LEADERBOARD_TRENDING_DAYS', '7,30').split(',')
+)
+LEADERBOARD_REFRESH_INTERVAL = int(
+    os.getenv('LEADERBOARD_REFRESH_INTERVAL', 300)
+)
+
 # Model User
 
 NAME_LENGHT = 150
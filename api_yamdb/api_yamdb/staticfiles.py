@@ -0,0 +1,71 @@
+"""Статические файлы: имена с хешем содержимого и сжатые копии.
+
+collectstatic сохраняет рядом с каждым текстовым файлом копии .gz
+и .br (если установлен brotli), которые nginx отдаёт без сжатия
+на каждый запрос. Имена с хешем не меняются, пока не изменится
+содержимое, поэтому их можно кэшировать надолго.
+"""
+
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.apps import StaticFilesConfig
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from . import compression
+
+
+class StaticFilesAppConfig(StaticFilesConfig):
+    """Не собирает CSV-файлы для импорта из project_static/data."""
+
+    ignore_patterns = [*StaticFilesConfig.ignore_patterns, 'data']
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage, который сохраняет сжатые копии файлов.
+
+    Пока collectstatic не запускался, адреса строятся по исходным
+    именам: ManifestStaticFilesStorage в этом случае ищет файл
+    в STATIC_ROOT и бросает ValueError.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                names.add(name)
+                if hashed_name:
+                    names.add(hashed_name)
+            yield name, hashed_name, processed
+        if not dry_run:
+            for name in sorted(names):
+                self.compress(name)
+
+    def compress(self, name):
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in settings.STATIC_COMPRESS_EXTENSIONS:
+            return
+        with self.open(name) as file:
+            content = file.read()
+        if len(content) < settings.COMPRESSION_MIN_SIZE:
+            return
+        for encoding in compression.encodings():
+            compressed = compression.compress(
+                content, encoding, compression.BEST
+            )
+            if len(compressed) >= len(content):
+                continue
+            compressed_name = name + compression.EXTENSIONS[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
@@ -0,0 +1,152 @@
+"""Настройки gunicorn, читаются автоматически из рабочего каталога.
+
+Все параметры задаются переменными окружения GUNICORN_*.
+Без них число процессов и потоков подбирается по числу ядер
+и по числу соединений с базой, доступных приложению: каждый
+поток обработчика держит не больше одного соединения.
+
+Приложение выбирается при запуске (GUNICORN_APP в Dockerfile),
+для ASGI задаётся GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornH11Worker.
+В этом режиме соединения держат потоки пулов ASGI_READ_THREADS
+и ASGI_THREADS, и их размеры подбираются здесь же.
+"""
+
+import multiprocessing
+import os
+
+DEFAULT_DB_CONNECTIONS = 20
+# Соединения, которые остаются для миграций, команд и администратора БД.
+RESERVED_DB_CONNECTIONS = 5
+# Размеры пулов ASGI по умолчанию, как в settings.py.
+DEFAULT_ASGI_READ_THREADS = 16
+DEFAULT_ASGI_THREADS = 4
+
+
+def env_int(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def observed_db_connections():
+    """Сколько соединений с PostgreSQL ещё может открыть приложение.
+
+    Если база недоступна при запуске, используется значение
+    по умолчанию, чтобы не задерживать старт контейнера.
+    """
+
+    if os.getenv('DB_ENGINE', '').split('.')[-1] not in (
+            'postgresql', 'postgresql_psycopg2'):
+        return DEFAULT_DB_CONNECTIONS
+    try:
+        import psycopg2
+
+        connection = psycopg2.connect(
+            dbname=os.getenv('DB_NAME'),
+            user=os.getenv('POSTGRES_USER'),
+            password=os.getenv('POSTGRES_PASSWORD'),
+            host=os.getenv('DB_HOST'),
+            port=os.getenv('DB_PORT'),
+            connect_timeout=2,
+        )
+    except Exception:
+        return DEFAULT_DB_CONNECTIONS
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT current_setting('max_connections')::int "
+                '- (SELECT count(*) FROM pg_stat_activity)'
+            )
+            free = cursor.fetchone()[0]
+    finally:
+        connection.close()
+    return max(free - RESERVED_DB_CONNECTIONS, 1)
+
+
+def tune(cpu_count, db_connections):
+    """Процессы и потоки: 2 * ядра + 1, но не больше соединений с базой."""
+
+    workers = max(min(2 * cpu_count + 1, db_connections), 1)
+    threads = max(min(4, db_connections // workers), 1)
+    return workers, threads
+
+
+def tune_asgi(cpu_count, db_connections, read_threads=None, threads=None):
+    """Процессы и пулы потоков ASGI, не больше соединений с базой.
+
+    Каждый процесс держит read_threads + threads соединений.
+    Не заданные размеры пулов делят соединения процесса в той же
+    пропорции, что и значения по умолчанию, но не превышают их.
+    """
+
+    workers = max(min(2 * cpu_count + 1, db_connections // 2), 1)
+    per_process = max(db_connections // workers, 2)
+    threads = threads or max(min(DEFAULT_ASGI_THREADS, per_process // 5), 1)
+    read_threads = read_threads or max(
+        min(DEFAULT_ASGI_READ_THREADS, per_process - threads), 1
+    )
+    workers = max(min(workers, db_connections // (read_threads + threads)), 1)
+    return workers, read_threads, threads
+
+
+db_connections = (
+    env_int('GUNICORN_DB_CONNECTIONS') or observed_db_connections()
+)
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+asgi = worker_class.startswith('uvicorn.')
+if asgi:
+    auto_workers, asgi_read_threads, asgi_threads = tune_asgi(
+        multiprocessing.cpu_count(), db_connections,
+        env_int('ASGI_READ_THREADS'), env_int('ASGI_THREADS'),
+    )
+    auto_threads = 1
+    # settings.py читает размеры пулов при загрузке приложения,
+    # которая идёт после этого файла.
+    os.environ['ASGI_READ_THREADS'] = str(asgi_read_threads)
+    os.environ['ASGI_THREADS'] = str(asgi_threads)
+else:
+    auto_workers, auto_threads = tune(
+        multiprocessing.cpu_count(), db_connections
+    )
+workers = env_int('GUNICORN_WORKERS', auto_workers)
+# Для sync-обработчика больше одного потока включает gthread.
+threads = env_int('GUNICORN_THREADS', auto_threads)
+
+# Приложение загружается до fork, и процессы делят память
+# импортированного кода.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'True') == 'True'
+# Процесс перезапускается после стольких запросов, что ограничивает
+# рост памяти; разброс не даёт всем процессам уйти на перезапуск разом.
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+# Файлы сердцебиения в памяти, а не на диске контейнера.
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def pre_fork(server, worker):
+    # Соединения, открытые при загрузке приложения, нельзя делить
+    # между процессами.
+    if preload_app:
+        from django.db import connections
+
+        connections.close_all()
+
+
+def when_ready(server):
+    if asgi:
+        server.log.info(
+            'Процессов: %s, потоков ASGI: %s на чтение и %s на остальные '
+            'запросы, соединений с БД доступно: %s',
+            server.cfg.workers, asgi_read_threads, asgi_threads,
+            db_connections,
+        )
+        return
+    server.log.info(
+        'Процессов: %s, потоков: %s, соединений с БД доступно: %s',
+        server.cfg.workers, server.cfg.threads, db_connections,
+    )
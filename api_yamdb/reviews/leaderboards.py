@@ -0,0 +1,183 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Count, ExpressionWrapper, F, FloatField, Sum,
+                              Value)
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import (Category, Genre, Leaderboard, LeaderboardEntry, Review,
+                     Title)
+
+
+def prior_mean():
+    """Средняя оценка по всем отзывам по сохранённым суммам оценок."""
+
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), review_count=Sum('review_count')
+    )
+    if not totals['review_count']:
+        return 0.0
+    return totals['score_sum'] / totals['review_count']
+
+
+def weighted(score_sum, review_count, mean):
+    """Байесовский рейтинг: средняя оценка, сглаженная к общей средней.
+
+    (сумма оценок + m * C) / (число отзывов + m), где C - средняя
+    по всем произведениям, а m - LEADERBOARD_PRIOR_REVIEWS.
+    """
+
+    prior = settings.LEADERBOARD_PRIOR_REVIEWS
+    return ExpressionWrapper(
+        (Cast(score_sum, FloatField()) + Value(prior * mean))
+        / (review_count + Value(prior)),
+        output_field=FloatField(),
+    )
+
+
+def top_titles(titles, mean):
+    """Лучшие произведения queryset по сохранённым рейтингам."""
+
+    return (
+        titles
+        .filter(review_count__gte=settings.LEADERBOARD_MIN_REVIEWS)
+        .annotate(score=weighted(F('score_sum'), F('review_count'), mean))
+        .order_by('-score', '-review_count', 'pk')
+        .values_list('pk', 'score', 'rating', 'review_count')
+        [:settings.LEADERBOARD_SIZE]
+    )
+
+
+def trending_titles(days, mean, now):
+    """Лучшие произведения по отзывам за последние days дней."""
+
+    return (
+        Review.objects
+        .filter(pub_date__gte=now - timedelta(days=days))
+        .order_by()
+        .values('title')
+        .annotate(count=Count('pk'), total=Sum('score'))
+        .filter(count__gte=settings.LEADERBOARD_MIN_REVIEWS)
+        .annotate(
+            score=weighted(F('total'), F('count'), mean),
+            rating=ExpressionWrapper(
+                Cast(F('total'), FloatField()) / F('count'),
+                output_field=FloatField(),
+            ),
+        )
+        .order_by('-score', '-count', 'title')
+        .values_list('title', 'score', 'rating', 'count')
+        [:settings.LEADERBOARD_SIZE]
+    )
+
+
+def save_leaderboard(kind, scope, rows, refreshed_at):
+    """Заменяет записи рейтинга строками (id, балл, средняя, отзывы)."""
+
+    with transaction.atomic():
+        leaderboard, _ = Leaderboard.objects.update_or_create(
+            kind=kind, scope=scope,
+            defaults={'refreshed_at': refreshed_at},
+        )
+        leaderboard.entries.all().delete()
+        LeaderboardEntry.objects.bulk_create(
+            LeaderboardEntry(
+                leaderboard=leaderboard,
+                position=position,
+                title_id=title_id,
+                score=score,
+                rating=rating,
+                review_count=review_count,
+            )
+            for position, (title_id, score, rating, review_count)
+            in enumerate(rows, 1)
+        )
+
+
+def changed_scopes(since):
+    """Жанры и категории, рейтинги которых могли измениться после since.
+
+    Это области изменённых произведений и рейтинги, в которых
+    эти произведения сейчас стоят, на случай смены категории.
+    """
+
+    changed = Title.objects.filter(updated_at__gte=since).values('pk')
+    ranked = (
+        LeaderboardEntry.objects
+        .filter(title__in=changed)
+        .values_list('leaderboard__kind', 'leaderboard__scope')
+    )
+    scopes = {Leaderboard.CATEGORY: set(), Leaderboard.GENRE: set()}
+    for kind, scope in ranked:
+        if kind in scopes:
+            scopes[kind].add(scope)
+    scopes[Leaderboard.CATEGORY].update(
+        Title.objects
+        .filter(pk__in=changed, category__isnull=False)
+        .values_list('category', flat=True)
+    )
+    scopes[Leaderboard.GENRE].update(
+        Title.genre.through.objects
+        .filter(title__in=changed)
+        .values_list('genre', flat=True)
+    )
+    return scopes
+
+
+def all_scopes():
+    """Все жанры и категории; рейтинги удалённых удаляются."""
+
+    scopes = {
+        Leaderboard.CATEGORY: set(
+            Category.objects.values_list('pk', flat=True)
+        ),
+        Leaderboard.GENRE: set(Genre.objects.values_list('pk', flat=True)),
+    }
+    for kind, ids in scopes.items():
+        Leaderboard.objects.filter(kind=kind).exclude(scope__in=ids).delete()
+    return scopes
+
+
+def refresh_leaderboards(full=False):
+    """Пересчитывает рейтинги и возвращает количество обновлённых.
+
+    Общий рейтинг и рейтинги популярного пересчитываются всегда,
+    рейтинги жанров и категорий - только затронутые изменениями
+    произведений с прошлого обновления. При full=True, а также при
+    первом запуске пересчитываются все рейтинги. Смена жанров
+    произведения тоже обновляет его updated_at.
+    """
+
+    now = timezone.now()
+    mean = prior_mean()
+    last = (
+        Leaderboard.objects
+        .filter(kind=Leaderboard.GLOBAL)
+        .values_list('refreshed_at', flat=True)
+        .first()
+    )
+    scopes = all_scopes() if full or last is None else changed_scopes(last)
+
+    save_leaderboard(
+        Leaderboard.GLOBAL, 0, top_titles(Title.objects.all(), mean), now
+    )
+    for days in settings.LEADERBOARD_TRENDING_DAYS:
+        save_leaderboard(
+            Leaderboard.TRENDING, days, trending_titles(days, mean, now), now
+        )
+    for category in scopes[Leaderboard.CATEGORY]:
+        save_leaderboard(
+            Leaderboard.CATEGORY, category,
+            top_titles(Title.objects.filter(category=category), mean), now,
+        )
+    for genre in scopes[Leaderboard.GENRE]:
+        save_leaderboard(
+            Leaderboard.GENRE, genre,
+            top_titles(Title.objects.filter(genre=genre), mean), now,
+        )
+    return (
+        1 + len(settings.LEADERBOARD_TRENDING_DAYS)
+        + sum(len(ids) for ids in scopes.values())
+    )
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:25
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+
+    def aggregate(expression):
+        return Subquery(
+            Review.objects
+            .filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+            .annotate(value=expression)
+            .values('value')
+        )
+
+    Title.objects.update(
+        review_count=Coalesce(
+            aggregate(Count('pk')), 0, output_field=models.IntegerField()
+        ),
+        score_sum=Coalesce(
+            aggregate(Sum('score')), 0, output_field=models.IntegerField()
+        ),
+        rating=aggregate(Avg('score', output_field=models.FloatField())),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_auto_20221013_0305'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:34
+
+from django.db import DatabaseError, migrations, models, transaction
+
+NAME_INDEX = 'title_name_search_idx'
+
+
+def enable_trigram(schema_editor):
+    """Подключает pg_trgm, если это возможно.
+
+    CREATE EXTENSION требует права CREATE на базу данных (для
+    недоверенных расширений - суперпользователя). Без них миграция
+    не падает, а триграммный индекс не создаётся: администратор
+    может позже выполнить CREATE EXTENSION pg_trgm и создать индекс
+    запросом из create_name_index.
+    """
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            return True
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError:
+        return False
+    return True
+
+
+def create_name_index(apps, schema_editor):
+    # icontains на PostgreSQL строится как UPPER(name) LIKE UPPER(%s),
+    # поэтому триграммный индекс создаётся по тому же выражению.
+    # В SQLite инфиксный LIKE индексом не ускоряется, индекс
+    # без учёта регистра помогает поиску по префиксу и сортировке.
+    if schema_editor.connection.vendor == 'postgresql':
+        if not enable_trigram(schema_editor):
+            return
+        schema_editor.execute(
+            f'CREATE INDEX {NAME_INDEX} ON reviews_title '
+            'USING gin (UPPER("name"::text) gin_trgm_ops)'
+        )
+    elif schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE INDEX {NAME_INDEX} ON reviews_title '
+            '("name" COLLATE NOCASE)'
+        )
+
+
+def drop_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {NAME_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.RunPython(create_name_index, drop_name_index),
+    ]
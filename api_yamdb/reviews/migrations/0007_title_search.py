@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_TABLE = 'reviews_titlesearch'
+
+
+def create_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE TABLE {SEARCH_TABLE} ('
+            'title_id integer PRIMARY KEY REFERENCES reviews_title (id) '
+            'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+            'document tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX {SEARCH_TABLE}_document_idx '
+            f'ON {SEARCH_TABLE} USING gin (document)'
+        )
+        # Документы строятся с текущей TITLE_SEARCH_CONFIG; после её
+        # смены индекс нужно пересобрать командой rebuild_search_index.
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (title_id, document) '
+            "SELECT id, setweight(to_tsvector(%s, name), 'A') "
+            '|| setweight(to_tsvector(%s, '
+            "coalesce(description, '')), 'B') FROM reviews_title",
+            [settings.TITLE_SEARCH_CONFIG] * 2,
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {SEARCH_TABLE} '
+            'USING fts5(name, description, reviews)'
+        )
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description, reviews) '
+            "SELECT id, name, coalesce(description, ''), '' "
+            'FROM reviews_title'
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
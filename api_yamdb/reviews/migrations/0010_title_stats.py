@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def fill_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+
+    rows = (
+        Review.objects
+        .order_by()
+        .values('title_id')
+        .annotate(
+            review_count=Count('pk'),
+            latest_review_date=Max('pub_date'),
+            **{
+                f'score_{score}': Count('pk', filter=Q(score=score))
+                for score in range(1, 11)
+            },
+        )
+    )
+    TitleStats.objects.bulk_create(
+        (TitleStats(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title')),
+                ('score_1', models.PositiveIntegerField(default=0, verbose_name='Оценок 1')),
+                ('score_2', models.PositiveIntegerField(default=0, verbose_name='Оценок 2')),
+                ('score_3', models.PositiveIntegerField(default=0, verbose_name='Оценок 3')),
+                ('score_4', models.PositiveIntegerField(default=0, verbose_name='Оценок 4')),
+                ('score_5', models.PositiveIntegerField(default=0, verbose_name='Оценок 5')),
+                ('score_6', models.PositiveIntegerField(default=0, verbose_name='Оценок 6')),
+                ('score_7', models.PositiveIntegerField(default=0, verbose_name='Оценок 7')),
+                ('score_8', models.PositiveIntegerField(default=0, verbose_name='Оценок 8')),
+                ('score_9', models.PositiveIntegerField(default=0, verbose_name='Оценок 9')),
+                ('score_10', models.PositiveIntegerField(default=0, verbose_name='Оценок 10')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+                ('latest_review_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего отзыва')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Статистика отзывов',
+                'verbose_name_plural': 'Статистика отзывов',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
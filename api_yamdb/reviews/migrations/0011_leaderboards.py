@@ -0,0 +1,66 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('global', 'Все произведения'), ('genre', 'Жанр'), ('category', 'Категория'), ('trending', 'Популярное')], max_length=16, verbose_name='Вид')),
+                ('scope', models.PositiveIntegerField(default=0, verbose_name='Область')),
+                ('refreshed_at', models.DateTimeField(verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг произведений',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Взвешенный рейтинг')),
+                ('rating', models.FloatField(verbose_name='Средняя оценка')),
+                ('review_count', models.PositiveIntegerField(verbose_name='Количество отзывов')),
+            ],
+            options={
+                'ordering': ('position',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['pub_date'], name='review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['updated_at'], name='title_updated_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='leaderboard',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='reviews.Leaderboard'),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.Title'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('kind', 'scope'), name='unique_leaderboard'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('leaderboard', 'position'), name='unique_leaderboard_position'),
+        ),
+    ]
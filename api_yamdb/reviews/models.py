@@ -2,7 +2,8 @@ import uuid
 
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from api_yamdb.settings import USER_FIELDS_LENGHT as UFL
 
@@ -58,6 +59,13 @@ class User(AbstractUser):
         editable=False,
         unique=False,
     )
+    # Увеличивается при смене роли или блокировке, чтобы отозвать
+    # выданные токены с прежними правами.
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ('username',)
@@ -117,6 +125,32 @@ class Title(models.Model):
         null=True,
         blank=True
     )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        # Индекс для поиска по name без учёта регистра создаётся
+        # миграцией 0006 отдельно для PostgreSQL и SQLite.
+        indexes = (
+            models.Index(fields=('year',), name='title_year_idx'),
+            # Поиск изменившихся произведений при обновлении рейтингов.
+            models.Index(fields=('updated_at',), name='title_updated_at_idx'),
+        )
 
     def __str__(self):
         return self.name[:15]
@@ -130,6 +164,7 @@ class Review(models.Model):
         Title, on_delete=models.CASCADE, related_name='reviews')
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
     score = models.IntegerField(
         null=False,
         validators=[
@@ -147,10 +182,122 @@ class Review(models.Model):
                 name='unique_author_title'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            # Отзывы за последние дни для рейтинга популярного.
+            models.Index(fields=('pub_date',), name='review_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения пересчитывается в сигналах,
+        # поэтому сохранение отзыва и пересчёт выполняются атомарно.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class TitleStats(models.Model):
+    """Распределение оценок и сводка отзывов произведения.
+
+    Обновляется при изменении отзывов, см. reviews/stats.py.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    score_1 = models.PositiveIntegerField('Оценок 1', default=0)
+    score_2 = models.PositiveIntegerField('Оценок 2', default=0)
+    score_3 = models.PositiveIntegerField('Оценок 3', default=0)
+    score_4 = models.PositiveIntegerField('Оценок 4', default=0)
+    score_5 = models.PositiveIntegerField('Оценок 5', default=0)
+    score_6 = models.PositiveIntegerField('Оценок 6', default=0)
+    score_7 = models.PositiveIntegerField('Оценок 7', default=0)
+    score_8 = models.PositiveIntegerField('Оценок 8', default=0)
+    score_9 = models.PositiveIntegerField('Оценок 9', default=0)
+    score_10 = models.PositiveIntegerField('Оценок 10', default=0)
+    review_count = models.PositiveIntegerField(
+        'Количество отзывов', default=0
+    )
+    latest_review_date = models.DateTimeField(
+        'Дата последнего отзыва', null=True, blank=True
+    )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Статистика отзывов'
+        verbose_name_plural = 'Статистика отзывов'
+
+    def __str__(self):
+        return str(self.title_id)
+
+
+class Leaderboard(models.Model):
+    """Материализованный рейтинг произведений.
+
+    Пересчитывается командой refresh_leaderboards,
+    см. reviews/leaderboards.py.
+    """
+
+    GLOBAL = 'global'
+    GENRE = 'genre'
+    CATEGORY = 'category'
+    TRENDING = 'trending'
+    KINDS = (
+        (GLOBAL, 'Все произведения'),
+        (GENRE, 'Жанр'),
+        (CATEGORY, 'Категория'),
+        (TRENDING, 'Популярное'),
+    )
+
+    kind = models.CharField('Вид', max_length=16, choices=KINDS)
+    # id жанра или категории, число дней для популярного, 0 для общего.
+    scope = models.PositiveIntegerField('Область', default=0)
+    refreshed_at = models.DateTimeField('Дата обновления')
+
+    class Meta:
+        verbose_name = 'Рейтинг произведений'
+        verbose_name_plural = 'Рейтинги произведений'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('kind', 'scope'),
+                name='unique_leaderboard'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.kind}:{self.scope}'
+
+
+class LeaderboardEntry(models.Model):
+    leaderboard = models.ForeignKey(
+        Leaderboard, on_delete=models.CASCADE, related_name='entries')
+    position = models.PositiveIntegerField('Место')
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField('Взвешенный рейтинг')
+    rating = models.FloatField('Средняя оценка')
+    review_count = models.PositiveIntegerField('Количество отзывов')
+
+    class Meta:
+        ordering = ('position',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('leaderboard', 'position'),
+                name='unique_leaderboard_position'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.leaderboard}:{self.position}'
+
 
 class Comment(models.Model):
     text = models.TextField()
@@ -160,6 +307,45 @@ class Comment(models.Model):
         Review, on_delete=models.CASCADE, related_name='comments')
     pub_date = models.DateTimeField(
         'Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку командой send_queued_mail."""
+
+    subject = models.CharField('Тема', max_length=256)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    # Адреса получателей через запятую.
+    recipients = models.TextField('Получатели')
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    send_after = models.DateTimeField(
+        'Отправить не раньше', default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    sent_at = models.DateTimeField('Дата отправки', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'send_after'),
+                name='outgoing_email_pending_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.subject[:15]
@@ -0,0 +1,105 @@
+from django.db.models import (Avg, Count, F, FloatField, IntegerField,
+                              OuterRef, Subquery, Sum)
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import Review, Title
+
+# Отправляется после изменения сохранённого рейтинга.
+# title_ids - список изменённых произведений или None,
+# если пересчитывались произвольные произведения.
+rating_changed = Signal(providing_args=['title_ids'])
+
+
+def change_rating(title_id, score_delta, count_delta):
+    """Изменяет сохранённый рейтинг произведения на величину оценки.
+
+    Обновление выполняется одним запросом UPDATE без чтения строки,
+    поэтому конкурентные изменения отзывов не теряются.
+    """
+
+    score_sum = F('score_sum') + score_delta
+    review_count = F('review_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=Cast(score_sum, FloatField()) / NullIf(review_count, 0),
+        updated_at=timezone.now(),
+    )
+    rating_changed.send(sender=Title, title_ids=[title_id])
+
+
+def _review_aggregate(aggregate):
+    """Подзапрос агрегата отзывов для каждого произведения."""
+
+    return Subquery(
+        Review.objects
+        .filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+def recalculate_ratings(titles=None):
+    """Пересчитывает рейтинги произведений по таблице отзывов.
+
+    Возвращает количество обновлённых произведений.
+    """
+
+    if titles is None:
+        titles = Title.objects.all()
+
+    updated = titles.update(
+        review_count=Coalesce(
+            _review_aggregate(Count('pk')), 0,
+            output_field=IntegerField(),
+        ),
+        score_sum=Coalesce(
+            _review_aggregate(Sum('score')), 0,
+            output_field=IntegerField(),
+        ),
+        rating=_review_aggregate(Avg('score', output_field=FloatField())),
+        updated_at=timezone.now(),
+    )
+    if updated:
+        rating_changed.send(sender=Title, title_ids=None)
+    return updated
+
+
+def find_rating_mismatches(titles=None):
+    """Находит произведения, сохранённый рейтинг которых устарел.
+
+    Возвращает список кортежей
+    (id, сохранённые значения, фактические значения),
+    где значения - это пары (количество отзывов, сумма оценок).
+    """
+
+    if titles is None:
+        titles = Title.objects.all()
+
+    titles = titles.order_by('pk').annotate(
+        actual_count=Count('reviews'),
+        actual_sum=Coalesce(Sum('reviews__score'), 0),
+    )
+
+    mismatches = []
+    for title in titles.iterator():
+        stored = (title.review_count, title.score_sum)
+        actual = (title.actual_count, title.actual_sum)
+        expected_rating = (
+            title.actual_sum / title.actual_count
+            if title.actual_count else None
+        )
+        if stored != actual or not _same_rating(
+                title.rating, expected_rating):
+            mismatches.append((title.pk, stored, actual))
+    return mismatches
+
+
+def _same_rating(stored, expected):
+    if stored is None or expected is None:
+        return stored is expected
+    return abs(stored - expected) < 1e-6
@@ -0,0 +1,170 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+# Таблица документов создаётся миграцией 0007: на PostgreSQL это
+# tsvector с GIN-индексом, на SQLite - виртуальная таблица FTS5
+# с rowid, равным id произведения. На остальных СУБД поиск
+# выполняется по вхождению подстроки без ранжирования.
+SEARCH_TABLE = 'reviews_titlesearch'
+
+# Веса полей: название важнее описания, описание - текста отзывов.
+POSTGRES_DOCUMENT = """
+    setweight(to_tsvector(%s, t.name), 'A')
+    || setweight(to_tsvector(%s, coalesce(t.description, '')), 'B')
+    {reviews}
+"""
+POSTGRES_REVIEWS = """
+    || setweight(to_tsvector(%s, coalesce((
+        SELECT string_agg(r.text, ' ') FROM reviews_review r
+        WHERE r.title_id = t.id
+    ), '')), 'C')
+"""
+SQLITE_REVIEWS = """
+    coalesce((
+        SELECT group_concat(r.text, ' ') FROM reviews_review r
+        WHERE r.title_id = t.id
+    ), '')
+"""
+SQLITE_WEIGHTS = '10.0, 5.0, 1.0'
+
+_available = {}
+
+
+def is_available():
+    """Есть ли в текущей БД таблица поискового индекса."""
+
+    vendor = connection.vendor
+    if vendor not in _available:
+        _available[vendor] = (
+            vendor in ('postgresql', 'sqlite')
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _available[vendor]
+
+
+def include_reviews():
+    return settings.TITLE_SEARCH_INCLUDE_REVIEWS
+
+
+def _id_condition(title_ids):
+    if title_ids is None:
+        return '', []
+    title_ids = list(title_ids)
+    placeholders = ', '.join(['%s'] * len(title_ids))
+    return f'WHERE t.id IN ({placeholders})', title_ids
+
+
+def update_titles(title_ids=None):
+    """Пересобирает документы произведений, None - всех."""
+
+    if not is_available():
+        return
+    if title_ids is not None and not title_ids:
+        return
+
+    where, params = _id_condition(title_ids)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            document = POSTGRES_DOCUMENT.format(
+                reviews=POSTGRES_REVIEWS if include_reviews() else ''
+            )
+            # Каждый %s в документе - имя конфигурации текстового поиска.
+            config_count = document.count('%s')
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (title_id, document) '
+                f'SELECT t.id, {document} FROM reviews_title t {where} '
+                'ON CONFLICT (title_id) '
+                'DO UPDATE SET document = EXCLUDED.document',
+                [settings.TITLE_SEARCH_CONFIG] * config_count + params,
+            )
+        else:
+            delete_titles(title_ids)
+            reviews = SQLITE_REVIEWS if include_reviews() else "''"
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} '
+                '(rowid, name, description, reviews) '
+                "SELECT t.id, t.name, coalesce(t.description, ''), "
+                f'{reviews} FROM reviews_title t {where}',
+                params,
+            )
+
+
+def delete_titles(title_ids=None):
+    if not is_available():
+        return
+    if title_ids is None:
+        where, params = '', []
+    else:
+        title_ids = list(title_ids)
+        if not title_ids:
+            return
+        column = 'title_id' if connection.vendor == 'postgresql' else 'rowid'
+        placeholders = ', '.join(['%s'] * len(title_ids))
+        where, params = f'WHERE {column} IN ({placeholders})', title_ids
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} {where}', params)
+
+
+def rebuild():
+    delete_titles()
+    update_titles()
+
+
+def fts5_query(query):
+    """Запрос FTS5 из слов пользователя: все слова, по префиксу.
+
+    Слова берутся в кавычки, чтобы операторы FTS5 во вводе
+    не приводили к синтаксической ошибке.
+    """
+
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по запросу и сортирует по релевантности.
+
+    Релевантность доступна в аннотации search_rank:
+    чем больше значение, тем выше произведение в выдаче.
+    """
+
+    if not is_available():
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+
+    if connection.vendor == 'postgresql':
+        tsquery = 'plainto_tsquery(%s, %s)'
+        params = [settings.TITLE_SEARCH_CONFIG, query]
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[
+                f'{SEARCH_TABLE}.title_id = reviews_title.id',
+                f'{SEARCH_TABLE}.document @@ {tsquery}',
+            ],
+            params=params,
+            select={
+                'search_rank': f'ts_rank({SEARCH_TABLE}.document, {tsquery})'
+            },
+            select_params=params,
+            order_by=['-search_rank', 'id'],
+        )
+
+    match = fts5_query(query)
+    if not match:
+        return queryset.none()
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = reviews_title.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[match],
+        select={
+            'search_rank': f'-bm25({SEARCH_TABLE}, {SQLITE_WEIGHTS})'
+        },
+        order_by=['-search_rank', 'id'],
+    )
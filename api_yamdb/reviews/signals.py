@@ -0,0 +1,162 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import search
+from .models import Comment, Review, Title, User
+from .ratings import change_rating
+from .stats import change_stats
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    """Запоминает прежнюю оценку редактируемого отзыва."""
+
+    instance._previous_score = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_score = (
+        Review.objects
+        .filter(pk=instance.pk)
+        .values_list('title_id', 'score')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения."""
+
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        change_rating(instance.title_id, instance.score, 1)
+        return
+
+    previous_title_id, previous_score = previous
+    if previous_title_id != instance.title_id:
+        change_rating(previous_title_id, -previous_score, -1)
+        change_rating(instance.title_id, instance.score, 1)
+    elif previous_score != instance.score:
+        change_rating(instance.title_id, instance.score - previous_score, 0)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает оценку удалённого отзыва из рейтинга произведения."""
+
+    change_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(post_save, sender=Review)
+def update_stats_on_save(sender, instance, created, raw, **kwargs):
+    """Учитывает новую или изменённую оценку в статистике произведения."""
+
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous_score', None)
+    if previous is None:
+        change_stats(
+            instance.title_id, {instance.score: 1}, instance.pub_date
+        )
+        return
+
+    previous_title_id, previous_score = previous
+    if previous_title_id != instance.title_id:
+        change_stats(
+            previous_title_id, {previous_score: -1}, recompute_latest=True
+        )
+        change_stats(
+            instance.title_id, {instance.score: 1}, instance.pub_date
+        )
+    elif previous_score != instance.score:
+        change_stats(
+            instance.title_id, {previous_score: -1, instance.score: 1}
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_stats_on_delete(sender, instance, **kwargs):
+    change_stats(
+        instance.title_id, {instance.score: -1}, recompute_latest=True
+    )
+
+
+@receiver(post_save, sender=Title)
+def update_title_document(sender, instance, raw, **kwargs):
+    """Обновляет поисковый документ сохранённого произведения."""
+
+    if not raw:
+        search.update_titles([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def touch_title_on_genres_change(sender, instance, action, reverse, pk_set,
+                                 **kwargs):
+    """Обновляет updated_at произведений при смене их жанров.
+
+    По updated_at рейтинги находят произведения, изменившиеся
+    с прошлого обновления. Перед очисткой жанра от произведений
+    затронутые произведения ещё видны через связи.
+    """
+
+    if not reverse and action.startswith('post_'):
+        titles = Title.objects.filter(pk=instance.pk)
+    elif reverse and action in ('post_add', 'post_remove') and pk_set:
+        titles = Title.objects.filter(pk__in=pk_set)
+    elif reverse and action == 'pre_clear':
+        titles = Title.objects.filter(genre=instance)
+    else:
+        return
+    titles.update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Title)
+def delete_title_document(sender, instance, **kwargs):
+    search.delete_titles([instance.pk])
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_review_document(sender, instance, **kwargs):
+    """Обновляет документ произведения, если поиск включает отзывы."""
+
+    if search.include_reviews() and not kwargs.get('raw'):
+        search.update_titles([instance.title_id])
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields=None, **kwargs):
+    """Запоминает прежнее имя редактируемого пользователя."""
+
+    instance._previous_username = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    instance._previous_username = (
+        User.objects
+        .filter(pk=instance.pk)
+        .values_list('username', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+def touch_authored_on_rename(sender, instance, raw, **kwargs):
+    """Обновляет updated_at отзывов и комментариев переименованного автора.
+
+    Имя автора входит в ответы отзывов и комментариев, поэтому их
+    ETag и Last-Modified должны измениться вместе с ним.
+    """
+
+    previous = getattr(instance, '_previous_username', None)
+    if raw or previous is None or previous == instance.username:
+        return
+    now = timezone.now()
+    Review.objects.filter(author=instance).update(updated_at=now)
+    Comment.objects.filter(author=instance).update(updated_at=now)
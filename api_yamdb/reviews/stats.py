@@ -0,0 +1,120 @@
+from django.db import transaction
+from django.db.models import (Case, Count, F, Max, OuterRef, Q, Subquery,
+                              Value, When)
+from django.utils import timezone
+
+from .models import Review, Title, TitleStats
+
+SCORES = range(1, 11)
+DEFAULT_BATCH_SIZE = 1000
+
+
+def score_field(score):
+    return f'score_{score}'
+
+
+def change_stats(title_id, score_deltas, pub_date=None,
+                 recompute_latest=False):
+    """Изменяет статистику произведения на величину изменения отзывов.
+
+    score_deltas - словарь {оценка: изменение количества}, pub_date -
+    дата добавленного отзыва. После удаления отзыва дата последнего
+    отзыва выбирается заново по индексу (title, pub_date).
+    Обновление выполняется одним запросом UPDATE без чтения строки.
+    """
+
+    values = {
+        score_field(score): F(score_field(score)) + delta
+        for score, delta in score_deltas.items() if delta
+    }
+    count_delta = sum(score_deltas.values())
+    if count_delta:
+        values['review_count'] = F('review_count') + count_delta
+    if recompute_latest:
+        values['latest_review_date'] = Subquery(
+            Review.objects
+            .filter(title=OuterRef('title'))
+            .order_by('-pub_date')
+            .values('pub_date')[:1]
+        )
+    elif pub_date is not None:
+        values['latest_review_date'] = Case(
+            When(latest_review_date__gt=pub_date,
+                 then=F('latest_review_date')),
+            default=Value(pub_date),
+        )
+    if not values:
+        return
+
+    updated = TitleStats.objects.filter(title_id=title_id).update(
+        updated_at=timezone.now(), **values
+    )
+    # Строки ещё нет, если статистика не пересобиралась после
+    # появления произведения: она считается целиком по отзывам.
+    if not updated and count_delta > 0:
+        TitleStats.objects.bulk_create(
+            compute_stats([title_id]), ignore_conflicts=True
+        )
+
+
+def compute_stats(title_ids):
+    """Статистика произведений, посчитанная по таблице отзывов."""
+
+    aggregates = {
+        score_field(score): Count('pk', filter=Q(score=score))
+        for score in SCORES
+    }
+    rows = (
+        Review.objects
+        .filter(title_id__in=title_ids)
+        .order_by()
+        .values('title_id')
+        .annotate(
+            review_count=Count('pk'),
+            latest_review_date=Max('pub_date'),
+            **aggregates,
+        )
+    )
+    stats = {
+        title_id: TitleStats(title_id=title_id) for title_id in title_ids
+    }
+    for row in rows:
+        item = stats[row.pop('title_id')]
+        for name, value in row.items():
+            setattr(item, name, value)
+    return list(stats.values())
+
+
+def replace_stats(title_ids):
+    """Заменяет статистику произведений посчитанной заново."""
+
+    title_ids = list(title_ids)
+    with transaction.atomic():
+        TitleStats.objects.filter(title_id__in=title_ids).delete()
+        TitleStats.objects.bulk_create(compute_stats(title_ids))
+
+
+def rebuild_stats(titles=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Пересчитывает статистику произведений пачками по batch_size.
+
+    Произведения перебираются по первичному ключу, так что в памяти
+    одновременно находится только одна пачка, и каждая заменяется
+    в отдельной транзакции. Генератор выдаёт количество
+    обработанных в пачке произведений.
+    """
+
+    if titles is None:
+        titles = Title.objects.all()
+    title_ids = titles.order_by('pk').values_list('pk', flat=True)
+
+    last_id = None
+    while True:
+        batch = title_ids
+        if last_id is not None:
+            batch = batch.filter(pk__gt=last_id)
+        batch = list(batch[:batch_size])
+        if not batch:
+            return
+        replace_stats(batch)
+        last_id = batch[-1]
+        yield len(batch)
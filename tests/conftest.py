@@ -1,9 +1,38 @@
 import sys
 from os.path import abspath, dirname, join
 
+import pytest
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
 ]
+
+
+def get(url, params=None, status=200):
+    """GET-запрос анонимного клиента с проверкой статуса ответа."""
+
+    from rest_framework.test import APIClient
+
+    response = APIClient().get(url, params)
+    assert response.status_code == status, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус {status}'
+    )
+    return response
+
+
+def get_json(url, params=None, status=200):
+    return get(url, params, status).json()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from api import authentication
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    authentication._versions.clear()
@@ -0,0 +1,68 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def catalog(django_user_model):
+    """Каталог произведений с отзывами и комментариями."""
+
+    from reviews.models import Category, Comment, Genre, Review, Title
+
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(4)
+    ]
+    users = [
+        django_user_model.objects.create(
+            username=f'user{i}', email=f'user{i}@yamdb.fake'
+        )
+        for i in range(12)
+    ]
+
+    titles = []
+    for i in range(12):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i,
+            description='Описание',
+            category=categories[i % len(categories)],
+        )
+        title.genre.set(genres[:i % len(genres) + 1])
+        titles.append(title)
+
+    reviews = [
+        Review.objects.create(
+            text=f'Отзыв {i}',
+            author=user,
+            title=titles[0],
+            score=i % 10 + 1,
+        )
+        for i, user in enumerate(users)
+    ]
+    for i, user in enumerate(users):
+        Comment.objects.create(
+            text=f'Комментарий {i}',
+            author=user,
+            review=reviews[0],
+        )
+
+    return {
+        'titles': titles,
+        'reviews': reviews,
+        'users': users,
+    }
+
+
+@pytest.fixture
+def admin_client(django_user_model):
+    """Клиент, авторизованный как администратор."""
+
+    client = APIClient()
+    client.force_authenticate(django_user_model.objects.create(
+        username='boss', email='boss@yamdb.fake', role='admin'
+    ))
+    return client
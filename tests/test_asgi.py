@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import pytest
+
+
+def make_scope(path, method='GET', body=b'', query_string=b'',
+               root_path=''):
+    return {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'root_path': root_path,
+        'query_string': query_string,
+        'http_version': '1.1',
+        'headers': [
+            (b'host', b'localhost'),
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+    }
+
+
+def request(path, method='GET', body=b'', **kwargs):
+    from api_yamdb.asgi import application
+
+    scope = make_scope(path, method, body, **kwargs)
+    messages = [{'type': 'http.request', 'body': body}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return sent
+
+
+@pytest.mark.django_db(transaction=True)
+class TestASGI:
+
+    def test_hot_read_path(self):
+        start, body = request('/api/v1/titles/')
+        assert start['status'] == 200, (
+            'Проверьте, что ASGI-приложение отвечает на чтение списка'
+        )
+        assert (b'content-type', b'application/json') in start['headers']
+        assert json.loads(body['body'])['results'] == []
+
+    def test_other_requests(self):
+        start, body = request(
+            '/api/v1/auth/signup/', 'POST', b'{"username": "me"}'
+        )
+        assert start['status'] == 400, (
+            'Проверьте, что ASGI-приложение передаёт тело запроса'
+        )
+
+    def test_non_ascii_query_string(self):
+        start, body = request(
+            '/api/v1/titles/', query_string='name=Фильм'.encode()
+        )
+        assert start['status'] == 200, (
+            'Проверьте, что строка запроса с байтами вне ASCII '
+            'не приводит к ошибке'
+        )
+
+    def test_root_path(self):
+        from api_yamdb.asgi import build_environ, is_hot_read
+
+        scope = make_scope('/yamdb/api/v1/titles/', root_path='/yamdb')
+        assert is_hot_read(scope), (
+            'Проверьте, что префикс root_path не мешает распознать '
+            'частый запрос на чтение'
+        )
+        environ = build_environ(scope, None)
+        assert environ['SCRIPT_NAME'] == '/yamdb'
+        assert environ['PATH_INFO'] == '/api/v1/titles/', (
+            'Проверьте, что PATH_INFO не содержит префикс root_path'
+        )
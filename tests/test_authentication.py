@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def client_with_token(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestStatelessAuthentication:
+
+    @pytest.fixture
+    def admin(self, django_user_model):
+        return django_user_model.objects.create(
+            username='boss', email='boss@yamdb.fake', role='admin'
+        )
+
+    def get_token(self, user):
+        response = APIClient().post('/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': str(user.confirmation_code),
+        })
+        assert response.status_code == 200
+        return response.json()['token']
+
+    def test_permissions_checked_without_user_query(self, admin):
+        client = client_with_token(self.get_token(admin))
+        client.post('/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                '/api/v1/categories/', {'name': 'Фильм', 'slug': 'movie'}
+            )
+        assert response.status_code == 201, (
+            'Проверьте, что права администратора берутся из токена'
+        )
+        assert not user_queries(queries), (
+            'Проверьте, что при проверке токена не загружается пользователь'
+        )
+
+    def test_author_is_taken_from_token(self, admin, catalog):
+        from reviews.models import Review
+
+        title = catalog['titles'][1]
+        client = client_with_token(self.get_token(admin))
+        response = client.post(
+            f'/api/v1/titles/{title.id}/reviews/', {'text': 'Да', 'score': 7}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == admin.username
+        assert Review.objects.get(pk=response.json()['id']).author == admin
+
+    def test_role_change_revokes_token(self, admin):
+        client = client_with_token(self.get_token(admin))
+        assert client.get('/api/v1/users/').status_code == 200
+
+        admin.role = admin.USER
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что после смены роли старый токен отзывается'
+        )
+
+        client = client_with_token(self.get_token(admin))
+        assert client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что новый токен содержит новую роль'
+        )
+
+    def test_token_without_claims_is_accepted(self, admin):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        client = client_with_token(AccessToken.for_user(admin))
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что токены без claims роли проверяются по базе'
+        )
+
+    def test_revoked_elsewhere_after_local_expiry(self, admin):
+        from api import authentication
+        from django.db.models import F
+
+        client = client_with_token(self.get_token(admin))
+        assert client.get('/api/v1/users/').status_code == 200
+
+        # Роль сменил другой процесс: его сброс версии не дошёл
+        # до кэша в памяти этого процесса.
+        type(admin).objects.filter(pk=admin.pk).update(
+            role=admin.USER, token_version=F('token_version') + 1
+        )
+        authentication._versions.clear()
+
+        assert client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что после истечения версии в памяти процесса '
+            'отозванный токен не принимается по устаревшему кэшу'
+        )
@@ -0,0 +1,102 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+class TestPercentile:
+
+    def test_nearest_rank(self):
+        from api.management.commands._benchmark import percentile
+
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([7], 95) == 7
+        assert percentile([], 50) is None
+
+
+@pytest.mark.django_db
+class TestBenchmarkApi:
+
+    def test_benchmark_saves_result(self, catalog, tmp_path):
+        output = tmp_path / 'result.json'
+        call_command(
+            'benchmark_api', '--requests', '40', '--warmup', '0',
+            '--output', str(output), stdout=io.StringIO(),
+        )
+
+        result = json.loads(output.read_text(encoding='UTF-8'))
+        assert result['total']['requests'] == 40, (
+            'Проверьте, что в результат попадают все замеренные запросы'
+        )
+        assert result['total']['errors'] == 0, (
+            'Проверьте, что смесь нагрузки обращается к существующим адресам'
+        )
+        assert result['total']['queries_per_request'] is not None, (
+            'Проверьте, что в процессе считается число SQL-запросов'
+        )
+
+
+@pytest.mark.django_db
+class TestBenchmarkFieldsets:
+
+    def test_sparse_subsets_are_smaller(self, catalog, tmp_path):
+        output = tmp_path / 'result.json'
+        call_command(
+            'benchmark_fieldsets', '--requests', '3',
+            '--output', str(output), stdout=io.StringIO(),
+        )
+
+        endpoints = json.loads(output.read_text(encoding='UTF-8'))['endpoints']
+        assert all(
+            summary['errors'] == 0 for summary in endpoints.values()
+        ), 'Проверьте, что все наборы полей допустимы'
+        assert (
+            endpoints['titles:names']['bytes_per_request']
+            < endpoints['titles']['bytes_per_request']
+        ), 'Проверьте, что ?fields= уменьшает размер ответа'
+
+
+@pytest.mark.django_db
+class TestBenchmarkSerialization:
+
+    def test_paths_produce_same_payload(self, catalog, tmp_path):
+        output = tmp_path / 'result.json'
+        call_command(
+            'benchmark_serialization', '--repeat', '2',
+            '--output', str(output), stdout=io.StringIO(),
+        )
+
+        endpoints = json.loads(output.read_text(encoding='UTF-8'))['endpoints']
+        for listing in ('titles', 'reviews', 'comments'):
+            sizes = {
+                summary['bytes_per_request']
+                for name, summary in endpoints.items()
+                if name.startswith(f'{listing}:')
+            }
+            assert len(sizes) == 1, (
+                'Проверьте, что все варианты строят одинаковый ответ'
+            )
+
+
+@pytest.mark.django_db
+class TestBenchmarkCompression:
+
+    def test_compression_saves_bytes(self, catalog, tmp_path):
+        output = tmp_path / 'result.json'
+        call_command(
+            'benchmark_compression', '--requests', '2',
+            '--output', str(output), stdout=io.StringIO(),
+        )
+
+        result = json.loads(output.read_text(encoding='UTF-8'))
+        endpoints = result['endpoints']
+        assert (
+            endpoints['reviews:gzip']['bytes_per_request']
+            < endpoints['reviews:identity']['bytes_per_request']
+        ), 'Проверьте, что сжатый ответ меньше исходного'
+        assert result['static_bytes']['gzip'] < (
+            result['static_bytes']['identity']
+        )
@@ -0,0 +1,125 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def statuses(response):
+    return [item['status'] for item in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestBulkWrite:
+
+    def test_admin_only(self, catalog):
+        client = APIClient()
+        client.force_authenticate(catalog['users'][0])
+        response = client.post(
+            '/api/v1/genres/bulk/', [{'name': 'Жанр', 'slug': 'new'}],
+            format='json',
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что пакетная запись доступна только администратору'
+        )
+
+    def test_create_titles(self, catalog, admin_client):
+        from reviews.models import Title
+
+        items = [
+            {
+                'name': f'Пакет {i}',
+                'year': 2001,
+                'genre': ['genre-0', 'genre-1'],
+                'category': 'category-0',
+            }
+            for i in range(20)
+        ]
+        items.append({
+            'name': 'Ошибка', 'year': 2001,
+            'genre': ['missing'], 'category': 'category-0',
+        })
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', items, format='json'
+            )
+        assert response.status_code == 200
+        data = response.json()
+        assert data['created'] == 20 and data['errors'] == 1, (
+            'Проверьте, что возвращается результат для каждого элемента'
+        )
+        assert 'genre' in data['results'][-1]['errors']
+
+        slug_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_genre' in query['sql']
+            and 'reviews_title' not in query['sql']
+        ]
+        assert len(slug_queries) == 1, (
+            'Проверьте, что slug жанров и категорий находятся одним запросом'
+        )
+
+        title = Title.objects.get(pk=data['results'][0]['id'])
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'genre-0', 'genre-1',
+        ]
+        assert title.category.slug == 'category-0'
+
+    def test_update_and_upsert_titles(self, catalog, admin_client):
+        titles = catalog['titles']
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': titles[0].pk, 'name': 'Новое имя', 'genre': ['genre-3']},
+            {'id': 0, 'name': 'Нет такого'},
+            {'name': 'Без id'},
+        ], format='json')
+        assert statuses(response) == ['updated', 'error', 'error']
+        titles[0].refresh_from_db()
+        assert titles[0].name == 'Новое имя'
+        assert list(titles[0].genre.values_list('slug', flat=True)) == [
+            'genre-3'
+        ], 'Проверьте, что жанры произведения заменяются'
+
+        response = admin_client.put('/api/v1/titles/bulk/', [
+            {
+                'id': titles[1].pk, 'name': 'Изменено', 'year': 1999,
+                'genre': [], 'category': 'category-2',
+            },
+            {
+                'name': 'Создано', 'year': 1999,
+                'genre': ['genre-0'], 'category': 'category-2',
+            },
+        ], format='json')
+        assert statuses(response) == ['updated', 'created']
+        title = APIClient().get(f'/api/v1/titles/{titles[1].pk}/').json()
+        assert title['name'] == 'Изменено' and title['genre'] == [], (
+            'Проверьте, что после пакетной записи не отдаётся '
+            'устаревший ответ из кэша'
+        )
+
+    def test_genres_and_categories(self, catalog, admin_client):
+        from reviews.models import Category
+
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Новый', 'slug': 'new'},
+            {'name': 'Занят', 'slug': 'genre-0'},
+            {'name': 'Дубль', 'slug': 'twice'},
+            {'name': 'Дубль', 'slug': 'twice'},
+        ], format='json')
+        assert statuses(response) == ['created', 'error', 'error', 'error']
+
+        response = admin_client.put('/api/v1/categories/bulk/', [
+            {'name': 'Переименована', 'slug': 'category-0'},
+            {'name': 'Новая', 'slug': 'category-new'},
+        ], format='json')
+        assert statuses(response) == ['updated', 'created']
+        assert Category.objects.get(slug='category-0').name == 'Переименована'
+
+        response = admin_client.patch(
+            '/api/v1/categories/bulk/', [{'name': 'Нет', 'slug': 'none'}],
+            format='json',
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что пакет без успешных элементов возвращает 400'
+        )
+        assert admin_client.post(
+            '/api/v1/categories/bulk/', {}, format='json'
+        ).status_code == 400
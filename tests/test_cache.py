@@ -0,0 +1,106 @@
+import pytest
+
+from .conftest import get
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_repeated_request_is_served_from_cache(
+            self, catalog, django_assert_num_queries):
+        first = get('/api/v1/titles/', {'limit': 3})
+        with django_assert_num_queries(0):
+            second = get('/api/v1/titles/', {'limit': 3})
+
+        assert first['X-Cache'] == 'MISS' and second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный запрос обслуживается из кэша'
+        )
+        assert first.json() == second.json(), (
+            'Проверьте, что из кэша возвращается тот же ответ'
+        )
+
+    def test_query_params_are_part_of_key(self, catalog):
+        get('/api/v1/titles/', {'limit': 3})
+        response = get('/api/v1/titles/', {'limit': 3, 'year': 2001})
+
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что параметры фильтрации входят в ключ кэша'
+        )
+
+    def test_genre_change_invalidates_lists(self, catalog):
+        from reviews.models import Genre
+
+        get('/api/v1/genres/')
+        get('/api/v1/titles/')
+        Genre.objects.filter(slug='genre-0').get().delete()
+
+        genres = get('/api/v1/genres/')
+        titles = get('/api/v1/titles/')
+        assert genres['X-Cache'] == 'MISS' and titles['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение жанра сбрасывает кэш жанров '
+            'и произведений'
+        )
+
+    def test_review_invalidates_only_its_title(self, catalog):
+        from reviews.models import Review
+
+        rated, other = catalog['titles'][:2]
+        url = '/api/v1/titles/{}/'
+        get(url.format(rated.id))
+        get(url.format(other.id))
+        get('/api/v1/categories/')
+
+        Review.objects.create(
+            text='Новый отзыв',
+            author=catalog['users'][0],
+            title=other,
+            score=1,
+        )
+
+        response = get(url.format(other.id))
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что отзыв сбрасывает кэш своего произведения'
+        )
+        assert response.json()['rating'] == 1, (
+            'Проверьте, что после отзыва возвращается новый рейтинг'
+        )
+        assert get(url.format(rated.id))['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв не сбрасывает кэш других произведений'
+        )
+        assert get('/api/v1/categories/')['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв не сбрасывает кэш категорий'
+        )
+
+    def test_stats_are_counted(self, catalog):
+        from api import cache
+
+        before = cache.stats()
+        get('/api/v1/categories/')
+        get('/api/v1/categories/')
+        after = cache.stats()
+
+        assert after['hits'] - before['hits'] == 1, (
+            'Проверьте, что считаются попадания в кэш'
+        )
+        assert after['misses'] - before['misses'] == 1, (
+            'Проверьте, что считаются промахи кэша'
+        )
+
+    def test_process_local_backend_caps_timeouts(self, settings):
+        from api import cache
+
+        settings.API_LOCAL_CACHE_TIMEOUT = 5
+        assert not cache.is_shared()
+        assert cache.local_timeout(300) == 5, (
+            'Проверьте, что в кэше процесса ответы хранятся недолго: '
+            'другие процессы не видят сдвига версий'
+        )
+        assert cache.local_timeout(None) == 5
+
+        settings.CACHES = {settings.API_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        }}
+        assert cache.is_shared()
+        assert cache.local_timeout(300) == 300
+        assert cache.local_timeout(None) is None
@@ -0,0 +1,105 @@
+import gzip
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+
+    def test_large_json_is_compressed(self, catalog):
+        client = APIClient()
+        plain = client.get('/api/v1/titles/', {'limit': 12})
+        assert 'Content-Encoding' not in plain
+
+        response = client.get(
+            '/api/v1/titles/', {'limit': 12},
+            HTTP_ACCEPT_ENCODING='gzip, deflate',
+        )
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что большие ответы JSON сжимаются'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content)
+        assert gzip.decompress(response.content) == plain.content
+
+        response = client.get(
+            '/api/v1/titles/', {'limit': 12}, HTTP_ACCEPT_ENCODING='gzip;q=0',
+        )
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что учитывается запрет кодировки в Accept-Encoding'
+        )
+
+    def test_small_response_is_not_compressed(self, catalog):
+        title = catalog['titles'][0]
+        response = APIClient().get(
+            f'/api/v1/titles/{title.pk}/', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert 'Content-Encoding' not in response, (
+            'Проверьте, что ответы меньше порога не сжимаются'
+        )
+
+    def test_conditional_get_with_weak_etag(self, catalog):
+        client = APIClient()
+        response = client.get(
+            '/api/v1/titles/', {'limit': 12}, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        etag = response['ETag']
+        assert etag.startswith('W/'), (
+            'Проверьте, что ETag сжатого ответа становится слабым'
+        )
+        response = client.get(
+            '/api/v1/titles/', {'limit': 12},
+            HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag,
+        )
+        assert response.status_code == 304
+
+
+class TestNegotiate:
+
+    def test_negotiate(self):
+        from api_yamdb import compression
+
+        best = compression.encodings()[0]
+        assert compression.negotiate('gzip') == compression.GZIP
+        assert compression.negotiate('br, gzip') == best
+        assert compression.negotiate('*') == best
+        assert compression.negotiate('identity') is None
+        assert compression.negotiate('gzip;q=0, deflate') is None
+
+
+class TestStaticFiles:
+
+    def test_collectstatic_compresses(self, settings, tmp_path):
+        settings.STATIC_ROOT = str(tmp_path)
+        call_command('collectstatic', '--no-input', stdout=io.StringIO())
+
+        names = {path.name for path in tmp_path.iterdir()}
+        assert 'redoc.yaml.gz' in names, (
+            'Проверьте, что collectstatic сохраняет сжатые копии файлов'
+        )
+        assert any(
+            name.startswith('redoc.') and name.endswith('.yaml.gz')
+            and name != 'redoc.yaml.gz'
+            for name in names
+        ), 'Проверьте, что у файлов есть имена с хешем содержимого'
+        assert gzip.decompress(
+            (tmp_path / 'redoc.yaml.gz').read_bytes()
+        ) == (tmp_path / 'redoc.yaml').read_bytes()
+        assert not (tmp_path / 'data').exists(), (
+            'Проверьте, что CSV-файлы для импорта не попадают в статику'
+        )
+
+    def test_url_without_collectstatic(self, settings, tmp_path):
+        from api_yamdb.staticfiles import CompressedManifestStaticFilesStorage
+
+        settings.DEBUG = False
+        storage = CompressedManifestStaticFilesStorage(location=str(tmp_path))
+        assert storage.url('admin/css/base.css') == (
+            settings.STATIC_URL + 'admin/css/base.css'
+        ), (
+            'Проверьте, что без collectstatic адрес строится '
+            'по исходному имени файла'
+        )
@@ -0,0 +1,150 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def reviews_url(self, catalog):
+        return f'/api/v1/titles/{catalog["titles"][0].id}/reviews/'
+
+    def test_unchanged_reviews_return_304(
+            self, catalog, django_assert_max_num_queries):
+        client = APIClient()
+        url = self.reviews_url(catalog)
+        response = client.get(url)
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что список отзывов валидируется только по ETag'
+        )
+
+        with django_assert_max_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что для неизменившихся отзывов возвращается 304'
+        )
+        assert not response.content, (
+            'Проверьте, что ответ 304 не содержит тела'
+        )
+
+    def test_changed_review_returns_200(self, catalog):
+        client = APIClient()
+        url = self.reviews_url(catalog)
+        etag = client.get(url)['ETag']
+
+        review = catalog['reviews'][-1]
+        review.text = 'Изменённый отзыв'
+        review.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения отзыва список отдаётся заново'
+        )
+        assert response['ETag'] != etag, (
+            'Проверьте, что после изменения отзыва меняется ETag'
+        )
+
+    def test_deleted_comment_changes_etag(self, catalog):
+        client = APIClient()
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        etag = client.get(url)['ETag']
+
+        review.comments.order_by('pk').first().delete()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после удаления комментария список '
+            'отдаётся заново'
+        )
+
+    def test_deleted_comment_ignores_if_modified_since(self, catalog):
+        import time
+
+        from django.utils.http import http_date
+
+        client = APIClient()
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        client.get(url)
+
+        review.comments.order_by('pk').first().delete()
+
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что после удаления комментария запрос '
+            'с If-Modified-Since не получает 304'
+        )
+
+    def test_review_has_last_modified(self, catalog):
+        review = catalog['reviews'][0]
+        response = APIClient().get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        )
+        assert response.has_header('Last-Modified'), (
+            'Проверьте, что отзыв возвращает Last-Modified'
+        )
+
+    def test_cached_title_returns_304_without_queries(
+            self, catalog, django_assert_num_queries):
+        client = APIClient()
+        url = f'/api/v1/titles/{catalog["titles"][0].id}/'
+        etag = client.get(url)['ETag']
+
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Проверьте, что для неизменившегося произведения '
+            'возвращается 304'
+        )
+
+    def test_rating_change_changes_title_etag(self, catalog):
+        from reviews.models import Review
+
+        client = APIClient()
+        title = catalog['titles'][1]
+        url = f'/api/v1/titles/{title.id}/'
+        etag = client.get(url)['ETag']
+
+        Review.objects.create(
+            text='Отзыв', author=catalog['users'][0], title=title, score=5
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения рейтинга произведение '
+            'отдаётся заново'
+        )
+
+    def test_renamed_title_changes_reviews_etag(self, catalog):
+        client = APIClient()
+        url = self.reviews_url(catalog)
+        etag = client.get(url)['ETag']
+
+        title = catalog['titles'][0]
+        title.name = 'Новое название'
+        title.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после переименования произведения список '
+            'отзывов отдаётся заново'
+        )
+
+    def test_renamed_author_changes_comments_etag(self, catalog):
+        client = APIClient()
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        etag = client.get(url)['ETag']
+
+        author = review.comments.order_by('pk').first().author
+        author.username = 'renamed_author'
+        author.save()
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после смены имени автора список '
+            'комментариев отдаётся заново'
+        )
@@ -0,0 +1,108 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+class TestCsvToDb:
+
+    def load(self, *args):
+        call_command('csv_to_db', *args, stdout=io.StringIO())
+
+    def test_import_bundled_data(self):
+        from reviews.models import Comment, Review, Title
+        from reviews.ratings import find_rating_mismatches
+
+        self.load('--batch-size', '10')
+
+        assert Title.objects.count() == 32, (
+            'Проверьте, что импортированы все произведения'
+        )
+        assert Title.genre.through.objects.count() == 42, (
+            'Проверьте, что импортированы связи произведений и жанров'
+        )
+        assert Review.objects.count() == 72, (
+            'Проверьте, что импортированы все отзывы'
+        )
+        assert Comment.objects.count() == 3, (
+            'Проверьте, что импортированы все комментарии'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что при импорте сохраняется дата публикации'
+        )
+        assert not find_rating_mismatches(), (
+            'Проверьте, что после импорта отзывов пересчитан рейтинг'
+        )
+
+    def test_import_is_idempotent(self):
+        from reviews.models import Review, Title
+
+        self.load()
+        review_count = Title.objects.get(pk=1).review_count
+        self.load()
+
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный импорт не создаёт дубликаты'
+        )
+        assert Title.objects.get(pk=1).review_count == review_count, (
+            'Проверьте, что повторный импорт не искажает рейтинг'
+        )
+
+
+class TestRunOrdered:
+
+    def test_parents_are_loaded_first(self):
+        import threading
+        import time
+
+        from api.management.commands import _common
+
+        events = []
+        lock = threading.Lock()
+
+        def load(csv_file):
+            with lock:
+                events.append(('start', csv_file.name))
+            time.sleep(0.01)
+            with lock:
+                events.append(('finish', csv_file.name))
+            return csv_file.name
+
+        results = _common.run_ordered(_common.CSV_FILES, load, workers=3)
+
+        assert set(results) == {f.name for f in _common.CSV_FILES}, (
+            'Проверьте, что загружены все файлы'
+        )
+        graph = _common.dependencies(_common.CSV_FILES)
+        assert graph['comments'] == {'review', 'users'}, (
+            'Проверьте, что зависимости строятся по внешним ключам'
+        )
+        for name, parents in graph.items():
+            started = events.index(('start', name))
+            for parent in parents:
+                assert events.index(('finish', parent)) < started, (
+                    f'Проверьте, что {name} загружается после {parent}'
+                )
+        first_finish = next(
+            i for i, event in enumerate(events) if event[0] == 'finish'
+        )
+        assert first_finish >= 3, (
+            'Проверьте, что независимые файлы загружаются одновременно'
+        )
+
+    def test_error_stops_dependants(self):
+        from api.management.commands import _common
+
+        loaded = []
+
+        def load(csv_file):
+            if csv_file.name == 'titles':
+                raise ValueError(csv_file.name)
+            loaded.append(csv_file.name)
+
+        with pytest.raises(ValueError):
+            _common.run_ordered(_common.CSV_FILES, load, workers=2)
+        assert not {'genre_title', 'review', 'comments'} & set(loaded), (
+            'Проверьте, что после ошибки зависимые файлы не загружаются'
+        )
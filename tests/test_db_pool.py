@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+
+class Raw:
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def test_reuses_released_connection(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        pool = ConnectionPool(size=2, timeout=1)
+        first = pool.acquire(Raw)
+        pool.release(first)
+        assert pool.acquire(Raw) is first, (
+            'Проверьте, что пул выдаёт освобождённое соединение повторно'
+        )
+        stats = pool.stats()
+        assert stats['connects'] == 1
+        assert stats['open'] == stats['in_use'] == 1
+
+    def test_waits_and_times_out_when_exhausted(self):
+        from api_yamdb.db.pool import ConnectionPool, PoolTimeoutError
+
+        pool = ConnectionPool(size=1, timeout=0.05)
+        first = pool.acquire(Raw)
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(Raw)
+        stats = pool.stats()
+        assert stats['open'] == 1, (
+            'Проверьте, что пул не открывает соединений больше POOL_SIZE'
+        )
+        assert stats['waits'] == stats['timeouts'] == 1, (
+            'Проверьте, что пул считает ожидания и таймауты'
+        )
+
+        pool.timeout = 5
+        timer = threading.Timer(0.05, pool.release, (first,))
+        timer.start()
+        assert pool.acquire(Raw) is first, (
+            'Проверьте, что ожидающий поток получает освободившееся '
+            'соединение'
+        )
+        timer.join()
+        assert pool.stats()['waits'] == 2
+
+    def test_discards_broken_connection(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        pool = ConnectionPool(size=1, timeout=1)
+        broken = pool.acquire(Raw)
+        pool.release(broken)
+        fresh = pool.acquire(Raw, check=lambda raw: False)
+        assert fresh is not broken and broken.closed, (
+            'Проверьте, что соединение, не прошедшее проверку, закрывается'
+        )
+        assert pool.stats()['open'] == 1
+
+    def test_checks_only_idle_connections(self):
+        from api_yamdb.db.pool import ConnectionPool
+
+        checked = []
+        pool = ConnectionPool(size=1, timeout=1)
+        pool.release(pool.acquire(Raw))
+        pool.acquire(Raw, checked.append, check_after=60)
+        assert not checked, (
+            'Проверьте, что недавно возвращённое соединение не проверяется'
+        )
+
+
+class TestCheckConnections:
+
+    def test_pings_only_after_idle(self, monkeypatch):
+        from types import SimpleNamespace
+
+        from django.db import connections
+
+        from api_yamdb.db import health
+
+        connection = connections['default']
+        pings = []
+        monkeypatch.setitem(connection.settings_dict, 'PING_AFTER_IDLE', 30)
+        monkeypatch.setattr(connection, 'connection', object())
+        monkeypatch.setattr(
+            connection, 'is_usable', lambda: pings.append(1) or True
+        )
+        monkeypatch.setattr(connections, 'all', lambda: [connection])
+
+        monkeypatch.setattr(connection, 'idle_since', 100.0, raising=False)
+        monkeypatch.setattr(
+            health, 'time', SimpleNamespace(monotonic=lambda: 110.0)
+        )
+        health.check_connections()
+        assert not pings, (
+            'Проверьте, что недавно использованное соединение '
+            'не проверяется на каждом запросе'
+        )
+
+        monkeypatch.setattr(
+            health, 'time', SimpleNamespace(monotonic=lambda: 200.0)
+        )
+        health.check_connections()
+        assert pings, 'Проверьте, что простоявшее соединение проверяется'
+
+
+@pytest.mark.django_db
+class TestPooledBackend:
+
+    def test_returns_connection_to_pool(self, tmp_path):
+        from api_yamdb.db.pool import pools
+        from api_yamdb.db.sqlite3.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper({
+            'ENGINE': 'api_yamdb.db.sqlite3',
+            'NAME': str(tmp_path / 'pool.sqlite3'),
+            'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+            'OPTIONS': {}, 'TIME_ZONE': None, 'AUTOCOMMIT': True,
+            'CONN_MAX_AGE': 0, 'PING_AFTER_IDLE': 30,
+            'POOL_SIZE': 1, 'POOL_TIMEOUT': 1,
+        }, alias='pool-test')
+        try:
+            wrapper.ensure_connection()
+            raw = wrapper.connection
+            wrapper.close()
+            assert wrapper.pool.stats()['in_use'] == 0, (
+                'Проверьте, что закрытое соединение возвращается в пул'
+            )
+            wrapper.ensure_connection()
+            assert wrapper.connection is raw, (
+                'Проверьте, что бэкенд берёт соединение из пула'
+            )
+            wrapper.close()
+        finally:
+            pools.pop('pool-test', None)
@@ -0,0 +1,85 @@
+import os
+import re
+
+import pytest
+from rest_framework.test import APIClient
+
+from .conftest import infra_dir_path
+
+
+@pytest.mark.django_db
+class TestEdgeCacheHeaders:
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/',
+    ])
+    def test_anonymous_response(self, catalog, settings, url):
+        settings.EDGE_CACHE_TIMEOUT = 7
+        response = APIClient().get(url)
+        assert response['X-Accel-Expires'] == '7', (
+            'Проверьте, что срок хранения в nginx задаёт приложение'
+        )
+        assert 'public' in response['Cache-Control']
+        assert 'max-age=7' in response['Cache-Control']
+
+    def test_not_modified_keeps_headers(self, catalog):
+        client = APIClient()
+        title = catalog['titles'][0]
+        etag = client.get(f'/api/v1/titles/{title.pk}/')['ETag']
+        response = client.get(
+            f'/api/v1/titles/{title.pk}/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+        assert 'X-Accel-Expires' in response
+
+    def test_authenticated_response(self, catalog):
+        client = APIClient()
+        client.force_authenticate(catalog['users'][0])
+        response = client.get('/api/v1/titles/')
+        assert 'X-Accel-Expires' not in response, (
+            'Проверьте, что ответы пользователям с токеном не кэшируются'
+        )
+        assert 'private' in response['Cache-Control']
+
+    def test_disabled_and_other_endpoints(self, catalog, settings):
+        review = catalog['reviews'][0]
+        response = APIClient().get(
+            f'/api/v1/titles/{review.title_id}/reviews/'
+        )
+        assert 'X-Accel-Expires' not in response
+
+        settings.EDGE_CACHE_TIMEOUT = 0
+        response = APIClient().get('/api/v1/genres/')
+        assert 'X-Accel-Expires' not in response
+
+
+class TestNginxMicroCache:
+
+    def test_proxy_cache(self):
+        with open(os.path.join(infra_dir_path, 'nginx', 'default.conf')) as f:
+            config = f.read()
+
+        assert re.search(r'proxy_cache_path\s.*keys_zone=api:', config)
+        location = re.search(
+            r'location ~ \^/api/v1/\(titles\|genres\|categories\)[^{]*\{'
+            r'(?P<body>[^}]*)\}',
+            config,
+        )
+        assert location, (
+            'Проверьте, что для каталога настроен отдельный location'
+        )
+        body = location.group('body')
+        for directive in (
+            r'proxy_cache api;',
+            r'proxy_cache_bypass \$http_authorization;',
+            r'proxy_no_cache \$http_authorization;',
+            r'proxy_cache_lock on;',
+            r'proxy_cache_use_stale updating',
+            r'proxy_cache_background_update on;',
+        ):
+            assert re.search(directive, body), (
+                f'Проверьте, что в микрокэше nginx есть {directive}'
+            )
+        assert 'proxy_cache_valid' not in config, (
+            'Проверьте, что срок хранения задаётся только приложением'
+        )
@@ -0,0 +1,127 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+def content(response):
+    assert response.streaming, 'Проверьте, что выгрузка отдаётся потоком'
+    return b''.join(response.streaming_content)
+
+
+def snapshot():
+    from reviews.models import Comment, Review, Title
+
+    return (
+        list(Title.objects.order_by('pk').values(
+            'pk', 'name', 'year', 'category', 'rating', 'review_count'
+        )),
+        sorted(Title.genre.through.objects.values_list('title', 'genre')),
+        list(Review.objects.order_by('pk').values_list(
+            'pk', 'title', 'author', 'text', 'score', 'pub_date'
+        )),
+        list(Comment.objects.order_by('pk').values_list(
+            'pk', 'review', 'author', 'text', 'pub_date'
+        )),
+    )
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_admin_only(self, catalog):
+        client = APIClient()
+        assert client.get('/api/v1/export/titles.csv').status_code == 401
+        client.force_authenticate(catalog['users'][0])
+        assert client.get('/api/v1/export/titles.csv').status_code == 403, (
+            'Проверьте, что выгрузка доступна только администратору'
+        )
+
+    def test_unknown_dataset(self, admin_client):
+        assert admin_client.get(
+            '/api/v1/export/users.csv'
+        ).status_code == 404
+        assert admin_client.get(
+            '/api/v1/export/titles.xml'
+        ).status_code == 404
+
+    def test_titles_ndjson(self, catalog, admin_client, settings):
+        settings.EXPORT_CHUNK_SIZE = 5
+        response = admin_client.get('/api/v1/export/titles.ndjson')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        rows = [json.loads(line) for line in content(response).splitlines()]
+
+        titles = catalog['titles']
+        assert [row['id'] for row in rows] == [title.pk for title in titles]
+        assert rows[3]['genre'] == [
+            'genre-0', 'genre-1', 'genre-2', 'genre-3'
+        ], 'Проверьте, что в выгрузке есть slug жанров произведения'
+        assert rows[0]['category_slug'] == 'category-0'
+        titles[0].refresh_from_db()
+        assert rows[0]['rating'] == titles[0].rating, (
+            'Проверьте, что в выгрузке есть рейтинг произведения'
+        )
+        assert rows[0]['review_count'] == 12
+
+    def test_reviews_and_comments_csv(self, catalog, admin_client):
+        response = admin_client.get('/api/v1/export/reviews.csv')
+        assert 'attachment; filename="reviews.csv"' == (
+            response['Content-Disposition']
+        )
+        rows = list(csv.DictReader(io.StringIO(content(response).decode())))
+        assert len(rows) == len(catalog['reviews'])
+        assert rows[0]['author_username'] == 'user0'
+        assert rows[0]['score'] == '1'
+
+        response = admin_client.get('/api/v1/export/comments.csv')
+        assert response['Content-Type'] == 'text/csv; charset=cp1251'
+        rows = list(csv.DictReader(
+            io.StringIO(content(response).decode('cp1251')), delimiter=';'
+        ))
+        assert rows and rows[0]['text'].startswith('Комментарий'), (
+            'Проверьте, что комментарии выгружаются в формате csv_to_db'
+        )
+
+    def test_round_trip(self, tmp_path):
+        from reviews.models import Category, Genre, Title, User
+
+        call_command('csv_to_db', stdout=io.StringIO())
+        before = snapshot()
+
+        call_command(
+            'export_data', '--output-dir', str(tmp_path),
+            '--chunk-size', '7', stdout=io.StringIO(),
+        )
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        call_command(
+            'csv_to_db', '--data-dir', str(tmp_path), stdout=io.StringIO()
+        )
+        assert snapshot() == before, (
+            'Проверьте, что выгрузка загружается обратно командой csv_to_db'
+        )
+
+    def test_titles_without_reviews_keep_ratings_consistent(self, tmp_path):
+        from reviews.models import Category, Genre, Title, User
+        from reviews.ratings import find_rating_mismatches
+
+        call_command('csv_to_db', stdout=io.StringIO())
+        call_command(
+            'export_data', '--output-dir', str(tmp_path), stdout=io.StringIO()
+        )
+        for name in ('review.csv', 'comments.csv'):
+            (tmp_path / name).unlink()
+        for model in (Title, Category, Genre, User):
+            model.objects.all().delete()
+        call_command(
+            'csv_to_db', '--data-dir', str(tmp_path), stdout=io.StringIO()
+        )
+
+        assert not find_rating_mismatches(), (
+            'Проверьте, что рейтинги из файла пересчитываются по отзывам'
+        )
+        assert not Title.objects.filter(review_count__gt=0).exists()
@@ -0,0 +1,97 @@
+import datetime as dt
+from decimal import Decimal
+
+import pytest
+from rest_framework.test import APIClient
+
+from .conftest import get_json
+
+
+class TestFastJSONRenderer:
+
+    DATA = {
+        'text': 'Строка с разделителем',
+        'date': dt.datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=dt.timezone.utc),
+        'decimal': Decimal('1.50'),
+        'items': [1, 2.5, None, True],
+    }
+
+    def test_same_output_as_json_renderer(self):
+        from api.renderers import FastJSONRenderer, fast_json_enabled
+        from rest_framework.renderers import JSONRenderer
+
+        assert fast_json_enabled(), 'Проверьте, что orjson используется'
+        assert FastJSONRenderer().render(self.DATA) == (
+            JSONRenderer().render(self.DATA)
+        ), 'Проверьте, что ответ совпадает с ответом JSONRenderer'
+
+    def test_fallback(self, settings):
+        from api.renderers import FastJSONRenderer, fast_json_enabled
+        from rest_framework.renderers import JSONRenderer
+
+        settings.API_JSON_BACKEND = 'json'
+        assert not fast_json_enabled()
+        assert FastJSONRenderer().render(self.DATA) == (
+            JSONRenderer().render(self.DATA)
+        )
+
+    @pytest.mark.django_db
+    def test_parser(self, django_user_model):
+        client = APIClient()
+        client.force_authenticate(django_user_model.objects.create(
+            username='boss', email='boss@yamdb.fake', role='admin'
+        ))
+        response = client.post(
+            '/api/v1/genres/', '{"name": "Жанр", "slug": "genre"}',
+            content_type='application/json',
+        )
+        assert response.status_code == 201
+        response = client.post(
+            '/api/v1/genres/', '{"name": NaN}',
+            content_type='application/json',
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный JSON отклоняется'
+        )
+
+
+@pytest.mark.django_db
+class TestValuesList:
+
+    @pytest.fixture(autouse=True)
+    def no_cache(self, settings):
+        settings.API_CACHE_TIMEOUT = 0
+
+    def compare(self, settings, url, params=None):
+        settings.API_VALUES_LIST = False
+        expected = get_json(url, params)
+        settings.API_VALUES_LIST = True
+        assert get_json(url, params) == expected, (
+            f'Проверьте, что список `{url}` из .values() совпадает '
+            'с ответом сериализатора'
+        )
+
+    @pytest.mark.parametrize('params', [
+        {'limit': 20},
+        {'limit': 3, 'offset': 2, 'fields': 'id,genre,category'},
+        {'genre': 'genre-1', 'exclude': 'description'},
+        {'search': 'Произведение'},
+        {'pagination': 'cursor', 'limit': 4},
+    ])
+    def test_titles(self, catalog, settings, params):
+        from reviews.models import Title
+
+        Title.objects.filter(pk=catalog['titles'][2].pk).update(category=None)
+        self.compare(settings, '/api/v1/titles/', params)
+
+    def test_reviews_and_comments(self, catalog, settings):
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        self.compare(settings, url, {'limit': 20})
+        self.compare(settings, url, {'pagination': 'cursor', 'limit': 5})
+        self.compare(settings, f'{url}{review.pk}/comments/', {'limit': 20})
+
+    def test_titles_queries(self, catalog, django_assert_num_queries):
+        # Количество, страница и жанры страницы.
+        with django_assert_num_queries(3):
+            get_json('/api/v1/titles/', {'limit': 20})
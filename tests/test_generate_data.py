@@ -0,0 +1,74 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+SIZES = (
+    '--users', '10', '--titles', '20', '--genres', '4', '--categories', '2',
+    '--reviews', '100', '--comments', '50',
+)
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def generate(self, *args):
+        call_command(
+            'generate_data', *SIZES, *args,
+            stdout=io.StringIO(), stderr=io.StringIO(),
+        )
+
+    def test_generate_into_database(self):
+        from reviews.models import Comment, Review, Title, User
+        from reviews.ratings import find_rating_mismatches
+
+        self.generate()
+
+        assert User.objects.count() == 10, (
+            'Проверьте, что создано заданное количество пользователей'
+        )
+        assert Title.objects.count() == 20, (
+            'Проверьте, что создано заданное количество произведений'
+        )
+        assert Review.objects.count() == 100, (
+            'Проверьте, что создано заданное количество отзывов'
+        )
+        assert Comment.objects.count() == 50, (
+            'Проверьте, что создано заданное количество комментариев'
+        )
+        counts = sorted(
+            Title.objects.values_list('review_count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] > counts[-1], (
+            'Проверьте, что популярность произведений неравномерна'
+        )
+        assert not find_rating_mismatches(), (
+            'Проверьте, что рейтинг сгенерированных произведений пересчитан'
+        )
+
+    def test_generate_appends_to_existing_data(self):
+        from reviews.models import Title
+
+        self.generate()
+        self.generate()
+        assert Title.objects.count() == 40, (
+            'Проверьте, что повторная генерация добавляет новые записи'
+        )
+
+    def test_output_round_trips_through_csv_to_db(self, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        self.generate('--output-dir', str(tmp_path))
+        assert not Title.objects.exists(), (
+            'Проверьте, что с --output-dir данные не пишутся в базу'
+        )
+
+        call_command(
+            'csv_to_db', '--data-dir', str(tmp_path), stdout=io.StringIO()
+        )
+        assert Title.objects.count() == 20, (
+            'Проверьте, что сгенерированные файлы читаются командой csv_to_db'
+        )
+        assert Review.objects.count() == 100
+        assert Comment.objects.count() == 50
@@ -0,0 +1,65 @@
+import importlib.util
+import os
+
+import pytest
+
+from .conftest import root_dir
+
+
+def load_config(monkeypatch, **env):
+    # Файл настроек сам записывает размеры пулов ASGI в окружение.
+    monkeypatch.setattr(os, 'environ', dict(os.environ))
+    for name in ('GUNICORN_DB_CONNECTIONS', 'GUNICORN_WORKER_CLASS',
+                 'GUNICORN_WORKERS', 'ASGI_READ_THREADS', 'ASGI_THREADS'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    path = os.path.join(root_dir, 'api_yamdb', 'gunicorn.conf.py')
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestGunicornConf:
+
+    @pytest.mark.parametrize('cpu_count', [1, 2, 4, 16])
+    @pytest.mark.parametrize('db_connections', [1, 2, 20, 95, 500])
+    def test_asgi_pools_fit_db_connections(self, monkeypatch, cpu_count,
+                                           db_connections):
+        config = load_config(monkeypatch)
+        workers, read_threads, threads = config.tune_asgi(
+            cpu_count, db_connections
+        )
+        assert read_threads >= 1 and threads >= 1
+        assert read_threads <= config.DEFAULT_ASGI_READ_THREADS
+        assert threads <= config.DEFAULT_ASGI_THREADS
+        if db_connections >= 2:
+            assert workers * (read_threads + threads) <= db_connections, (
+                'Проверьте, что потоки пулов ASGI всех процессов '
+                'не превышают числа соединений с базой'
+            )
+
+    def test_explicit_asgi_pools_limit_workers(self, monkeypatch):
+        config = load_config(monkeypatch)
+        assert config.tune_asgi(8, 40, 16, 4) == (2, 16, 4)
+
+    def test_asgi_worker_exports_pool_sizes(self, monkeypatch):
+        config = load_config(
+            monkeypatch,
+            GUNICORN_WORKER_CLASS='uvicorn.workers.UvicornH11Worker',
+            GUNICORN_DB_CONNECTIONS='20',
+        )
+        read_threads = int(os.environ['ASGI_READ_THREADS'])
+        threads = int(os.environ['ASGI_THREADS'])
+        assert config.asgi
+        assert config.workers * (read_threads + threads) <= 20, (
+            'Проверьте, что gunicorn.conf.py передаёт приложению размеры '
+            'пулов ASGI, рассчитанные по соединениям с базой'
+        )
+
+    def test_sync_worker_keeps_threads(self, monkeypatch):
+        config = load_config(monkeypatch, GUNICORN_DB_CONNECTIONS='20')
+        assert not config.asgi
+        assert 'ASGI_THREADS' not in os.environ
+        assert config.workers * config.threads <= 20
@@ -0,0 +1,145 @@
+import io
+from datetime import timedelta
+
+import pytest
+
+from .conftest import get_json
+
+
+def add_reviews(title, users, scores):
+    from reviews.models import Review
+
+    for user, score in zip(users, scores):
+        Review.objects.create(
+            text='Отзыв', author=user, title=title, score=score
+        )
+
+
+@pytest.fixture
+def ranked(catalog, settings):
+    """Каталог, в котором отзывы есть у четырёх произведений."""
+
+    settings.LEADERBOARD_MIN_REVIEWS = 2
+    settings.LEADERBOARD_PRIOR_REVIEWS = 5
+    settings.LEADERBOARD_TRENDING_DAYS = (7, 30)
+    titles, users = catalog['titles'], catalog['users']
+    # У titles[0] уже 12 отзывов со средней 5.
+    add_reviews(titles[1], users, [10, 10])
+    add_reviews(titles[2], users, [9] * 10)
+    add_reviews(titles[3], users, [10])
+    return catalog
+
+
+def refresh(full=False):
+    from reviews.leaderboards import refresh_leaderboards
+
+    return refresh_leaderboards(full=full)
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_global_uses_bayesian_rating(
+            self, ranked, django_assert_num_queries):
+        refresh()
+        with django_assert_num_queries(1):
+            data = get_json('/api/v1/leaderboards/titles/')
+
+        titles = ranked['titles']
+        assert [item['title'] for item in data['results']] == [
+            titles[2].pk, titles[1].pk, titles[0].pk,
+        ], (
+            'Проверьте, что рейтинг учитывает число отзывов и отбрасывает '
+            'произведения с недостаточным числом отзывов'
+        )
+        assert [item['position'] for item in data['results']] == [1, 2, 3]
+        assert data['refreshed_at'] is not None
+        assert data['results'][1]['rating'] == 10
+
+        data = get_json('/api/v1/leaderboards/titles/', {'limit': 1})
+        assert len(data['results']) == 1
+        get_json('/api/v1/leaderboards/titles/', {'limit': 0}, status=400)
+
+    def test_genre_and_category(self, ranked):
+        refresh()
+        titles = ranked['titles']
+        category = titles[2].category
+        data = get_json(f'/api/v1/leaderboards/categories/{category.slug}/')
+        assert [item['title'] for item in data['results']] == [
+            titles[2].pk,
+        ], 'Проверьте рейтинг произведений категории'
+
+        genre = titles[0].genre.get()
+        data = get_json(f'/api/v1/leaderboards/genres/{genre.slug}/')
+        assert {item['title'] for item in data['results']} == {
+            titles[0].pk, titles[1].pk, titles[2].pk,
+        }, 'Проверьте рейтинг произведений жанра'
+
+        get_json('/api/v1/leaderboards/genres/unknown/', status=404)
+
+    def test_trending_counts_recent_reviews(self, ranked):
+        from django.utils import timezone
+        from reviews.models import Review
+
+        titles = ranked['titles']
+        Review.objects.filter(title=titles[2]).update(
+            pub_date=timezone.now() - timedelta(days=20)
+        )
+        refresh()
+
+        week = get_json('/api/v1/leaderboards/trending/')
+        assert titles[2].pk not in {
+            item['title'] for item in week['results']
+        }, 'Проверьте, что старые отзывы не учитываются в популярном'
+        month = get_json('/api/v1/leaderboards/trending/', {'days': 30})
+        assert month['results'][0]['title'] == titles[2].pk
+        get_json('/api/v1/leaderboards/trending/', {'days': 3}, status=400)
+
+    def test_incremental_refresh(self, ranked):
+        from django.core.management import call_command
+
+        titles, users = ranked['titles'], ranked['users']
+        assert refresh() > refresh(), (
+            'Проверьте, что повторный пересчёт затрагивает только '
+            'изменившиеся рейтинги'
+        )
+
+        add_reviews(titles[3], users[1:], [10])
+        refresh()
+        category = titles[3].category
+        data = get_json(f'/api/v1/leaderboards/categories/{category.slug}/')
+        assert data['results'][0]['title'] == titles[3].pk, (
+            'Проверьте, что рейтинг категории обновляется после '
+            'нового отзыва'
+        )
+
+        call_command('refresh_leaderboards', full=True, stdout=io.StringIO())
+        data = get_json('/api/v1/leaderboards/titles/')
+        assert data['results'][0]['title'] == titles[2].pk
+
+    def test_genre_change_refreshes_genre_boards(self, ranked):
+        from reviews.models import Genre
+
+        titles = ranked['titles']
+        old_genre = titles[2].genre.order_by('pk').first()
+        new_genre = Genre.objects.exclude(title=titles[2]).first()
+        refresh()
+
+        titles[2].genre.set([new_genre])
+        refresh()
+        data = get_json(f'/api/v1/leaderboards/genres/{new_genre.slug}/')
+        assert titles[2].pk in {item['title'] for item in data['results']}, (
+            'Проверьте, что произведение попадает в рейтинг нового жанра '
+            'без полного пересчёта'
+        )
+        data = get_json(f'/api/v1/leaderboards/genres/{old_genre.slug}/')
+        assert titles[2].pk not in {
+            item['title'] for item in data['results']
+        }, 'Проверьте, что произведение пропадает из рейтинга прежнего жанра'
+
+        new_genre.title_set.clear()
+        refresh()
+        data = get_json(f'/api/v1/leaderboards/genres/{new_genre.slug}/')
+        assert data['results'] == [], (
+            'Проверьте, что очистка жанра обновляет его рейтинг'
+        )
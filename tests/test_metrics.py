@@ -0,0 +1,84 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def metrics_registry():
+    from api.metrics import registry
+
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def get_metrics(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get('/api/v1/metrics/')
+
+    def test_metrics_are_admin_only(self, catalog):
+        user = catalog['users'][0]
+        assert self.get_metrics(user).status_code == 403, (
+            'Проверьте, что метрики недоступны обычному пользователю'
+        )
+        response = APIClient().get('/api/v1/metrics/')
+        assert response.status_code == 401, (
+            'Проверьте, что метрики недоступны анонимному пользователю'
+        )
+
+    def test_requests_are_recorded_per_route(self, catalog, metrics_registry):
+        user = catalog['users'][0]
+        user.role = user.ADMIN
+        user.save()
+        title = catalog['titles'][0]
+
+        client = APIClient()
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{title.id}/reviews/')
+        client.get(f'/api/v1/titles/{title.id + 1000}/reviews/')
+
+        response = self.get_metrics(user)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что метрики отдаются в текстовом формате Prometheus'
+        )
+        text = response.content.decode()
+        assert (
+            'yamdb_http_requests_total{route="api:title-list",'
+            'method="GET",status="200"} 1'
+        ) in text, 'Проверьте, что запросы считаются по имени маршрута'
+        assert (
+            'yamdb_http_requests_total{route="api:reviews-list",'
+            'method="GET",status="404"} 1'
+        ) in text, 'Проверьте, что учитывается статус ответа'
+        assert (
+            'yamdb_http_request_duration_seconds_count'
+            '{route="api:title-list",method="GET"} 1'
+        ) in text, 'Проверьте, что строится гистограмма задержек'
+        assert 'yamdb_db_queries_total{route="api:title-list"' in text
+        assert 'yamdb_http_response_bytes_total' in text
+
+    def test_repeated_queries_are_flagged(self, catalog, settings):
+        from api.metrics import Registry, RequestMetrics
+        from django.db import connection
+        from reviews.models import Title
+
+        settings.METRICS_REPEATED_QUERY_THRESHOLD = 3
+        request_metrics = RequestMetrics()
+        with connection.execute_wrapper(request_metrics):
+            for title in Title.objects.all()[:5]:
+                title.category.name
+
+        registry = Registry()
+        registry.observe('test', 'GET', 200, 0.01, 0, request_metrics)
+        text = registry.export()
+        assert (
+            'yamdb_repeated_query_requests_total'
+            '{route="test",method="GET"} 1'
+        ) in text, 'Проверьте, что запрос с N+1 отмечается в метриках'
+        assert 'FROM \\"reviews_category\\"' in text, (
+            'Проверьте, что в метриках виден повторяющийся запрос'
+        )
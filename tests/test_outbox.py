@@ -0,0 +1,93 @@
+import io
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+def send_queued_mail():
+    call_command(
+        'send_queued_mail', stdout=io.StringIO(), stderr=io.StringIO()
+    )
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    def signup(self, username):
+        return APIClient().post('/api/v1/auth/signup/', {
+            'username': username,
+            'email': f'{username}@yamdb.fake',
+        })
+
+    def test_signup_enqueues_mail(self):
+        from reviews.models import OutgoingEmail, User
+
+        assert self.signup('reader').status_code == 200
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется во время запроса'
+        )
+        email = OutgoingEmail.objects.get()
+        user = User.objects.get(username='reader')
+        assert email.body == str(user.confirmation_code), (
+            'Проверьте, что в очередь ставится письмо с кодом подтверждения'
+        )
+
+        send_queued_mail()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда send_queued_mail отправляет письма'
+        )
+        assert mail.outbox[0].to == ['reader@yamdb.fake']
+        email.refresh_from_db()
+        assert email.sent_at is not None
+
+        send_queued_mail()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    def test_sends_in_batches(self, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.MAIL_QUEUE_BATCH_SIZE = 2
+        for i in range(5):
+            self.signup(f'reader{i}')
+        send_queued_mail()
+        assert len(mail.outbox) == 5, (
+            'Проверьте, что очередь обрабатывается пачками до конца'
+        )
+        assert not OutgoingEmail.objects.filter(sent_at=None).exists()
+
+    def test_failed_mail_is_retried_later(self, monkeypatch):
+        from django.core.mail import EmailMessage
+        from django.utils import timezone
+        from reviews.models import OutgoingEmail
+
+        self.signup('reader')
+
+        def fail(self):
+            raise ConnectionError('нет связи')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailMessage, 'send', fail)
+            send_queued_mail()
+
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1, (
+            'Проверьте, что неудачная попытка отправки учитывается'
+        )
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается'
+        )
+
+        send_queued_mail()
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется до истечения задержки'
+        )
+        OutgoingEmail.objects.update(send_after=timezone.now())
+        send_queued_mail()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что отложенное письмо отправляется повторно'
+        )
@@ -0,0 +1,67 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+
+    def test_limit_offset_is_default(self, catalog):
+        title = catalog['titles'][0]
+        response = APIClient().get(
+            f'/api/v1/titles/{title.id}/reviews/', {'limit': 2, 'offset': 2}
+        )
+        data = response.json()
+        assert data['count'] == len(catalog['reviews']), (
+            'Проверьте, что по умолчанию используется limit/offset'
+        )
+        assert len(data['results']) == 2, (
+            'Проверьте, что параметр limit ограничивает размер страницы'
+        )
+
+    def test_cursor_walks_all_reviews(self, catalog):
+        client = APIClient()
+        title = catalog['titles'][0]
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor&limit=5'
+
+        ids = []
+        while url:
+            data = client.get(url).json()
+            assert 'count' not in data, (
+                'Проверьте, что курсорная пагинация не считает записи'
+            )
+            ids.extend(review['id'] for review in data['results'])
+            url = data['next']
+
+        expected = sorted(
+            catalog['reviews'], key=lambda review: (review.pub_date, review.id)
+        )
+        assert ids == [review.id for review in expected], (
+            'Проверьте, что курсор обходит отзывы по (pub_date, id) '
+            'без пропусков и повторов'
+        )
+
+    def test_cursor_page_skips_count_query(
+            self, catalog, django_assert_num_queries):
+        review = catalog['reviews'][0]
+        url = (
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        )
+        client = APIClient()
+        next_url = client.get(url, {'pagination': 'cursor', 'limit': 3})
+        next_url = next_url.json()['next']
+
+        # Родительский объект, валидаторы условного GET и страница.
+        with django_assert_num_queries(3):
+            response = client.get(next_url)
+        assert len(response.json()['results']) == 3, (
+            'Проверьте, что по ссылке next возвращается следующая страница'
+        )
+
+    def test_titles_cursor_by_id(self, catalog):
+        data = APIClient().get(
+            '/api/v1/titles/', {'pagination': 'cursor', 'limit': 4}
+        ).json()
+        ids = [title['id'] for title in data['results']]
+        assert ids == sorted(title.id for title in catalog['titles'])[:4], (
+            'Проверьте, что курсор по произведениям упорядочен по id'
+        )
@@ -0,0 +1,72 @@
+import pytest
+from rest_framework.test import APIClient
+
+# Родительский объект, валидаторы условного GET, COUNT и страница.
+MAX_LIST_QUERIES = 4
+PAGE_SIZES = (1, 5, 50)
+
+
+def get_list(url, limit, django_assert_max_num_queries):
+    client = APIClient()
+    with django_assert_max_num_queries(MAX_LIST_QUERIES) as context:
+        response = client.get(url, {'limit': limit})
+    assert response.status_code == 200, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает статус 200'
+    )
+    return response, len(context.captured_queries)
+
+
+@pytest.mark.django_db
+class TestQueryCount:
+
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_titles_list(self, catalog, limit,
+                         django_assert_max_num_queries):
+        response, _ = get_list(
+            '/api/v1/titles/', limit, django_assert_max_num_queries
+        )
+        result = response.json()['results'][0]
+        assert result['genre'] and result['category'], (
+            'Проверьте, что список произведений содержит '
+            'вложенные жанры и категорию'
+        )
+
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_reviews_list(self, catalog, limit,
+                          django_assert_max_num_queries):
+        title = catalog['titles'][0]
+        response, _ = get_list(
+            f'/api/v1/titles/{title.id}/reviews/',
+            limit,
+            django_assert_max_num_queries,
+        )
+        result = response.json()['results'][0]
+        assert result['author'] and result['title'] == title.name, (
+            'Проверьте, что отзыв содержит автора и название произведения'
+        )
+
+    @pytest.mark.parametrize('limit', PAGE_SIZES)
+    def test_comments_list(self, catalog, limit,
+                           django_assert_max_num_queries):
+        review = catalog['reviews'][0]
+        response, _ = get_list(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/',
+            limit,
+            django_assert_max_num_queries,
+        )
+        assert response.json()['results'][0]['author'], (
+            'Проверьте, что комментарий содержит автора'
+        )
+
+    def test_query_count_does_not_grow_with_page_size(
+            self, catalog, django_assert_max_num_queries):
+        title = catalog['titles'][0]
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{title.id}/reviews/'):
+            counts = {
+                get_list(url, limit, django_assert_max_num_queries)[1]
+                for limit in PAGE_SIZES
+            }
+            assert len(counts) == 1, (
+                f'Проверьте, что число запросов к БД для `{url}` '
+                'не зависит от размера страницы'
+            )
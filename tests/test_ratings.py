@@ -0,0 +1,75 @@
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+
+
+def stored(title):
+    title.refresh_from_db()
+    return title.review_count, title.score_sum, title.rating
+
+
+@pytest.mark.django_db
+class TestStoredRating:
+    # У titles[0] 12 отзывов с оценками 1..10, 1, 2: сумма 58.
+
+    def test_initial_rating(self, catalog):
+        assert stored(catalog['titles'][0]) == (12, 58, 58 / 12), (
+            'Проверьте, что новые отзывы учитываются в рейтинге'
+        )
+
+    def test_score_change(self, catalog):
+        review = catalog['reviews'][0]
+        review.score = 10
+        review.save()
+
+        assert stored(catalog['titles'][0]) == (12, 67, 67 / 12), (
+            'Проверьте, что изменение оценки пересчитывает рейтинг'
+        )
+
+    def test_review_delete(self, catalog):
+        catalog['reviews'][1].delete()
+
+        assert stored(catalog['titles'][0]) == (11, 56, 56 / 11), (
+            'Проверьте, что удаление отзыва пересчитывает рейтинг'
+        )
+
+    def test_review_moved_to_other_title(self, catalog):
+        source, target = catalog['titles'][:2]
+        review = catalog['reviews'][2]
+        review.title = target
+        review.save()
+
+        assert stored(source) == (11, 55, 5.0), (
+            'Проверьте, что отзыв исключается из рейтинга прежнего '
+            'произведения'
+        )
+        assert stored(target) == (1, 3, 3.0), (
+            'Проверьте, что отзыв учитывается в рейтинге нового '
+            'произведения'
+        )
+
+    def test_check_detects_and_repairs_drift(self, catalog):
+        from reviews.models import Title
+        from reviews.ratings import find_rating_mismatches
+
+        assert not find_rating_mismatches()
+        title = catalog['titles'][0]
+        Title.objects.filter(pk=title.pk).update(score_sum=0, rating=0)
+
+        with pytest.raises(CommandError):
+            call_command(
+                'recalculate_ratings', '--check',
+                stdout=io.StringIO(), stderr=io.StringIO(),
+            )
+        assert stored(title) == (12, 0, 0), (
+            'Проверьте, что --check не изменяет рейтинги'
+        )
+
+        call_command('recalculate_ratings', stdout=io.StringIO())
+        assert stored(title) == (12, 58, 58 / 12), (
+            'Проверьте, что команда восстанавливает рейтинг'
+        )
+        out = io.StringIO()
+        call_command('recalculate_ratings', '--check', stdout=out)
+        assert 'актуальны' in out.getvalue()
@@ -0,0 +1,63 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def search(query):
+    response = APIClient().get('/api/v1/titles/', {'search': query})
+    assert response.status_code == 200, (
+        'Проверьте, что поиск по произведениям возвращает статус 200'
+    )
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        return [
+            Title.objects.create(
+                name='Шоушенк', year=1994, description='Тюремная драма'
+            ),
+            Title.objects.create(
+                name='Зелёная миля', year=1999,
+                description='Снова тюремная история, Шоушенк упоминается',
+            ),
+            Title.objects.create(
+                name='Крёстный отец', year=1972, description='Мафия'
+            ),
+        ]
+
+    def test_name_match_ranks_first(self, titles):
+        assert search('шоушенк') == ['Шоушенк', 'Зелёная миля'], (
+            'Проверьте, что совпадение в названии ранжируется выше '
+            'совпадения в описании'
+        )
+
+    def test_prefix_and_case(self, titles):
+        assert search('КРЁСТ') == ['Крёстный отец'], (
+            'Проверьте, что поиск не зависит от регистра и ищет по префиксу'
+        )
+
+    def test_document_follows_writes(self, titles):
+        title = titles[2]
+        title.name = 'Лицо со шрамом'
+        title.save()
+        assert search('крёстный') == [], (
+            'Проверьте, что поисковый документ обновляется при изменении'
+        )
+        assert search('шрамом') == ['Лицо со шрамом'], (
+            'Проверьте, что новое название находится поиском'
+        )
+
+        title.delete()
+        assert search('шрамом') == [], (
+            'Проверьте, что удалённое произведение исключается из поиска'
+        )
+
+    def test_query_syntax_is_escaped(self, titles):
+        assert search('"мафия" -(*') == ['Крёстный отец'], (
+            'Проверьте, что операторы во вводе не ломают поиск'
+        )
@@ -0,0 +1,101 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .conftest import get_json
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields(self, catalog):
+        with CaptureQueriesContext(connection) as context:
+            data = get_json('/api/v1/titles/', {'fields': 'id,name,rating'})
+        assert set(data['results'][0]) == {'id', 'name', 'rating'}, (
+            'Проверьте, что ?fields= оставляет только перечисленные поля'
+        )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql, (
+            'Проверьте, что колонки незапрошенных полей не читаются из базы'
+        )
+        assert 'reviews_genre' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что жанры и категория загружаются, только если '
+            'они запрошены'
+        )
+
+    def test_titles_exclude(self, catalog):
+        title = catalog['titles'][1]
+        data = get_json(
+            f'/api/v1/titles/{title.pk}/', {'exclude': 'description,genre'}
+        )
+        assert set(data) == {'id', 'name', 'year', 'rating', 'category'}
+        assert data['category'] == {
+            'name': 'Категория 1', 'slug': 'category-1'
+        }
+
+        data = get_json('/api/v1/titles/', {'fields': 'genre', 'limit': 4})
+        assert data['results'][3] == {'genre': [
+            {'name': f'Жанр {i}', 'slug': f'genre-{i}'} for i in range(4)
+        ]}
+
+    def test_unknown_field(self, catalog):
+        data = get_json('/api/v1/titles/', {'fields': 'id,score'}, status=400)
+        assert 'fields' in data
+        get_json('/api/v1/genres/', {'exclude': 'id'}, status=400)
+
+    def test_reviews_and_comments(self, catalog):
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            data = get_json(url, {'fields': 'id,score'})
+        assert set(data['results'][0]) == {'id', 'score'}
+        assert not any(
+            'reviews_user' in query['sql']
+            for query in context.captured_queries
+        ), 'Проверьте, что автор не присоединяется, если он не запрошен'
+
+        data = get_json(f'{url}{review.pk}/comments/', {'exclude': 'text'})
+        assert set(data['results'][0]) == {'id', 'author', 'pub_date'}
+
+    def test_writes_return_all_fields(self, catalog):
+        client = APIClient()
+        client.force_authenticate(catalog['users'][0])
+        review = catalog['reviews'][0]
+        response = client.patch(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+            '?fields=id',
+            {'text': 'Новый текст'},
+        )
+        assert response.status_code == 200
+        assert response.json()['text'] == 'Новый текст', (
+            'Проверьте, что ?fields= не влияет на изменение объектов'
+        )
+
+
+@pytest.mark.django_db
+class TestMaxPageSize:
+
+    def test_limit_is_capped(self, catalog, monkeypatch):
+        from api.views import ReviewViewSet
+
+        monkeypatch.setattr(ReviewViewSet, 'max_page_size', 3)
+        review = catalog['reviews'][0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        data = get_json(url, {'limit': 10})
+        assert len(data['results']) == 3, (
+            'Проверьте, что limit ограничен max_page_size вьюсета'
+        )
+        data = get_json(url, {'limit': 10, 'pagination': 'cursor'})
+        assert len(data['results']) == 3, (
+            'Проверьте, что ограничение действует и для курсора'
+        )
+
+    def test_larger_pages(self, catalog):
+        from api.views import GenreViewSet, TitleViewSet
+
+        assert TitleViewSet.max_page_size < GenreViewSet.max_page_size
+        data = get_json('/api/v1/titles/', {'limit': 50, 'fields': 'id'})
+        assert len(data['results']) == len(catalog['titles']), (
+            'Проверьте, что размер страницы можно увеличить параметром limit'
+        )
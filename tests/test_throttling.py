@@ -0,0 +1,138 @@
+import uuid
+
+import pytest
+from rest_framework.test import APIClient
+
+SIGNUP = '/api/v1/auth/signup/'
+TOKEN = '/api/v1/auth/token/'
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'signup_ip': '5/min',
+            'signup': '2/min',
+            'token_ip': '5/min',
+            'token': '3/min',
+        },
+    }
+
+
+def signup(username, ip='10.0.0.1'):
+    return APIClient().post(
+        SIGNUP,
+        {'username': username, 'email': f'{username}@yamdb.fake'},
+        REMOTE_ADDR=ip,
+    )
+
+
+@pytest.mark.django_db
+class TestAuthThrottling:
+
+    def test_signup_per_username(self, rates, django_assert_num_queries):
+        assert signup('bingo').status_code == 200
+        assert signup('bingo').status_code == 200
+        with django_assert_num_queries(0):
+            response = signup('bingo')
+        assert response.status_code == 429, (
+            'Проверьте, что повторная регистрация ограничена по username '
+            'и отклоняется без обращений к базе'
+        )
+        assert int(response['Retry-After']) > 0
+
+        response = APIClient().post(
+            SIGNUP, {'username': 'other', 'email': 'BINGO@yamdb.fake '},
+            REMOTE_ADDR='10.0.0.2',
+        )
+        assert response.status_code == 429, (
+            'Проверьте, что счётчик email не зависит от регистра и адреса'
+        )
+
+    def test_bearer_token_is_not_checked(
+            self, rates, settings, django_user_model,
+            django_assert_num_queries):
+        from api.authentication import access_token_for_user
+
+        settings.TOKEN_VERSION_LOCAL_TIMEOUT = 0
+        user = django_user_model.objects.create(
+            username='bearer', email='bearer@yamdb.fake'
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {access_token_for_user(user)}'
+        )
+        data = {'username': 'bingo', 'email': 'bingo@yamdb.fake'}
+        client.post(SIGNUP, data)
+        client.post(SIGNUP, data)
+        with django_assert_num_queries(0):
+            response = client.post(SIGNUP, data)
+        assert response.status_code == 429, (
+            'Проверьте, что запрос с токеном отклоняется без обращений '
+            'к базе'
+        )
+
+    def test_signup_per_ip(self, rates):
+        statuses = [signup(f'user{i}').status_code for i in range(6)]
+        assert statuses == [200] * 5 + [429], (
+            'Проверьте, что регистрация ограничена по адресу клиента'
+        )
+        assert signup('user9', ip='10.0.0.2').status_code == 200
+
+    def test_token_per_username(self, rates, django_user_model):
+        django_user_model.objects.create(
+            username='bingo', email='bingo@yamdb.fake',
+            confirmation_code=uuid.uuid4(),
+        )
+        statuses = [
+            APIClient().post(
+                TOKEN, {'username': 'bingo', 'confirmation_code': 'wrong'},
+                REMOTE_ADDR=f'10.0.0.{i}',
+            ).status_code
+            for i in range(4)
+        ]
+        assert statuses == [400, 400, 400, 429], (
+            'Проверьте, что подбор кода ограничен по username'
+        )
+
+    def test_shared_cache(self, rates, settings, tmp_path):
+        settings.CACHES = {
+            **settings.CACHES,
+            'throttle': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': str(tmp_path),
+            },
+        }
+        settings.THROTTLE_CACHE_ALIAS = 'throttle'
+        statuses = [signup('bingo').status_code for _ in range(3)]
+        assert statuses == [200, 200, 429], (
+            'Проверьте, что счётчики работают на общем бэкенде кэша'
+        )
+
+
+class TestSlidingWindow:
+
+    def test_previous_window_is_weighted(self, settings):
+        from api.throttling import SignupThrottle
+        from django.core.cache import caches
+
+        settings.THROTTLE_CACHE_ALIAS = 'default'
+        caches['default'].clear()
+        throttle = SignupThrottle()
+        for _ in range(10):
+            throttle.hit('bingo', 10, 60, 600.0)
+        # Прошла четверть следующего окна: из предыдущих 10 запросов
+        # в скользящее окно попадают три четверти.
+        assert throttle.hit('bingo', 10, 60, 675.0) == pytest.approx(8.5)
+        assert throttle.hit('bingo', 10, 60, 725.0) == pytest.approx(
+            1 * 55 / 60 + 1
+        )
+        assert throttle.wait_seconds is None
+
+        for _ in range(10):
+            throttle.hit('bingo', 10, 60, 730.0)
+        assert throttle.wait_seconds > 0, (
+            'Проверьте, что для отклонённого запроса известно время ожидания'
+        )
@@ -0,0 +1,100 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+def get_stats(title_id):
+    response = APIClient().get(f'/api/v1/titles/{title_id}/stats/')
+    assert response.status_code == 200, (
+        'Проверьте, что GET-запрос к `/api/v1/titles/{id}/stats/` '
+        'возвращает статус 200'
+    )
+    return response.json()
+
+
+def stored_stats():
+    from reviews.models import TitleStats
+
+    return {
+        stats.pk: (
+            stats.review_count,
+            [getattr(stats, f'score_{score}') for score in range(1, 11)],
+            stats.latest_review_date,
+        )
+        for stats in TitleStats.objects.all()
+    }
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_histogram(self, catalog, django_assert_num_queries):
+        title = catalog['titles'][0]
+        with django_assert_num_queries(1):
+            data = get_stats(title.pk)
+
+        assert data['review_count'] == 12
+        assert data['scores'] == {
+            '1': 2, '2': 2, '3': 1, '4': 1, '5': 1,
+            '6': 1, '7': 1, '8': 1, '9': 1, '10': 1,
+        }, 'Проверьте распределение оценок произведения'
+        assert data['latest_review_date'] is not None
+
+    def test_title_without_reviews(self, catalog):
+        data = get_stats(catalog['titles'][1].pk)
+
+        assert data['review_count'] == 0
+        assert set(data['scores'].values()) == {0}
+        assert data['latest_review_date'] is None
+        assert APIClient().get(
+            '/api/v1/titles/0/stats/'
+        ).status_code == 404, (
+            'Проверьте, что для несуществующего произведения '
+            'возвращается статус 404'
+        )
+
+    def test_follows_review_changes(self, catalog):
+        from reviews.models import Review
+        from reviews.stats import replace_stats
+
+        title = catalog['titles'][0]
+        reviews = catalog['reviews']
+        reviews[0].score = 10
+        reviews[0].save()
+        reviews[-1].delete()
+        Review.objects.create(
+            text='Новый отзыв',
+            author=catalog['users'][0],
+            title=catalog['titles'][2],
+            score=7,
+        )
+
+        incremental = stored_stats()
+        replace_stats([title.pk, catalog['titles'][2].pk])
+        assert incremental == stored_stats(), (
+            'Проверьте, что статистика обновляется при изменении, '
+            'удалении и создании отзывов'
+        )
+        data = get_stats(title.pk)
+        assert data['review_count'] == 11
+        assert data['scores']['1'] == 1 and data['scores']['10'] == 2
+
+    def test_rebuild_command(self, catalog):
+        from reviews.models import TitleStats
+
+        expected = stored_stats()
+        TitleStats.objects.all().delete()
+        call_command(
+            'rebuild_title_stats', batch_size=5, stdout=io.StringIO()
+        )
+
+        actual = stored_stats()
+        assert len(actual) == len(catalog['titles']), (
+            'Проверьте, что команда rebuild_title_stats обрабатывает '
+            'все произведения'
+        )
+        assert {
+            pk: value for pk, value in actual.items() if value[0]
+        } == expected, 'Проверьте, что команда пересчитывает статистику'